@@ -2,9 +2,18 @@
 
 from fastapi import APIRouter, Depends
 import psutil
-from typing import Optional, List
+from typing import Any, Optional, List
 from core.model_manager import ModelManager
-from api.deps import get_model_manager
+from core.inference_executor import inference_executor
+from core.transcode_pool import transcode_pool
+from core.result_cache import result_cache
+from core.job_store import job_store
+from core.job_queue import job_queue
+from core.webhook import webhook_dispatcher
+from core.cancellation import cancel_stats
+from core.maintenance import maintenance
+from core.stream_vad import stream_vad_service
+from api.deps import get_model_manager, get_asr_system, get_batch_scheduler, get_punc_service, get_segment_scheduler
 from utils.config_loader import get_config
 from utils.response_builder import success_response, error_response
 
@@ -23,13 +32,36 @@ async def get_admin_config():
 
 
 @router.get("/status")
-async def get_status(manager: Optional[ModelManager] = Depends(get_model_manager)):
+async def get_status(
+    manager: Optional[ModelManager] = Depends(get_model_manager),
+    scheduler: Optional[Any] = Depends(get_batch_scheduler),
+    punc_service: Optional[Any] = Depends(get_punc_service),
+    segment_scheduler: Optional[Any] = Depends(get_segment_scheduler),
+    asr_system: Optional[Any] = Depends(get_asr_system),
+):
     """获取服务状态和资源使用情况"""
     try:
         models_status = manager.get_status() if manager else {"asr": "unloaded", "vad": "unloaded", "lid": "unloaded", "punc": "unloaded"}
         status = {
             "service": "running",
             "models": models_status,
+            "inference": inference_executor.get_status(),
+            "transcode": transcode_pool.get_status(),
+            "cache": result_cache.get_status(),
+            "jobs": job_store.get_status(),
+            "job_queue": job_queue.get_status(),
+            "webhooks": webhook_dispatcher.get_status(),
+            "cancellation": cancel_stats.get_status(),
+            "maintenance": maintenance.get_status(),
+            "batching": {"enabled": True, **scheduler.get_status()} if scheduler else {"enabled": False},
+            "punc": punc_service.get_status() if punc_service else None,
+            "stream_vad": stream_vad_service.get_status(),
+            "frontend": (
+                asr_system.shared_frontend.get_status() if getattr(asr_system, "shared_frontend", None) else None
+            ),
+            "stream_asr": (
+                {"enabled": True, **segment_scheduler.get_status()} if segment_scheduler else {"enabled": False}
+            ),
             "resources": {
                 "cpu_percent": psutil.cpu_percent(),
                 "memory_percent": psutil.virtual_memory().percent
@@ -40,14 +72,40 @@ async def get_status(manager: Optional[ModelManager] = Depends(get_model_manager
         return error_response(500, str(e))
 
 
+@router.get("/webhooks/dead-letters")
+async def get_webhook_dead_letters():
+    """查看投递失败（重试耗尽）的任务回调，最新的在前"""
+    try:
+        return success_response(webhook_dispatcher.dead_letters(), "查询成功")
+    except Exception as e:
+        return error_response(500, str(e))
+
+
+@router.post("/maintenance/run")
+async def run_maintenance():
+    """立即执行一次后台维护（TTL 清理任务、回收遗留的临时文件与结果文件），返回本次回收的数量与字节数"""
+    try:
+        return success_response(await maintenance.run_once(), "维护完成")
+    except Exception as e:
+        return error_response(500, str(e))
+
+
 @router.post("/reload")
-async def reload_models(modules: Optional[List[str]] = None, manager: Optional[ModelManager] = Depends(get_model_manager)):
+async def reload_models(
+    modules: Optional[List[str]] = None,
+    manager: Optional[ModelManager] = Depends(get_model_manager),
+    punc_service: Optional[Any] = Depends(get_punc_service),
+):
     """热重载指定模块"""
     try:
         if not manager:
             return error_response(500, "服务未就绪，模型管理器未初始化")
         modules = modules or ["asr", "vad", "lid", "punc"]
         result = manager.reload_modules(modules)
+        # 模型权重可能已更新，配置指纹不足以区分，整体清空结果缓存
+        result_cache.invalidate()
+        if punc_service:
+            punc_service.clear_cache()
         return success_response(result, "模块重载完成")
     except Exception as e:
         return error_response(500, str(e))
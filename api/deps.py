@@ -13,3 +13,18 @@ def get_model_manager(request: Request) -> Optional[ModelManager]:
 def get_asr_system(request: Request) -> Optional[Any]:
     """从 app.state 获取 FireRedAsr2System 一站式识别实例"""
     return getattr(request.app.state, "asr_system", None)
+
+
+def get_batch_scheduler(request: Request) -> Optional[Any]:
+    """从 app.state 获取一站式识别微批调度器（未启用 batching 时为 None）"""
+    return getattr(request.app.state, "batch_scheduler", None)
+
+
+def get_punc_service(request: Request) -> Optional[Any]:
+    """从 app.state 获取标点批处理服务"""
+    return getattr(request.app.state, "punc_service", None)
+
+
+def get_segment_scheduler(request: Request) -> Optional[Any]:
+    """从 app.state 获取流式识别分段调度器（未启用 stream_asr 时为 None）"""
+    return getattr(request.app.state, "segment_scheduler", None)
@@ -4,9 +4,10 @@ from fastapi import APIRouter, UploadFile, File, Form, Depends
 from typing import Dict, Any, Optional
 from core.model_manager import ModelManager
 from core.asr_processor import ASRProcessor
+from core.inference_executor import ExecutorBusyError
 from api.deps import get_model_manager
 from utils.audio_converter import SUPPORTED_AUDIO_EXTENSIONS
-from utils.response_builder import success_response, error_response
+from utils.response_builder import success_response, error_response, busy_response
 
 router = APIRouter(tags=["ASR"])
 VERSION = "1.0.0"
@@ -15,12 +16,12 @@ VERSION = "1.0.0"
 @router.post("/asr/transcribe")
 async def asr_batch_transcribe(
     audios: list[UploadFile] = File(..., description="多个音频文件"),
-    beam_size: int = Form(3, description="beam size"),
+    beam_size: Optional[int] = Form(None, description="beam size，不传时使用 models.asr.beam_size"),
     manager: Optional[ModelManager] = Depends(get_model_manager)
 ) -> Dict[str, Any]:
     """
     ASR批量转录接口
-    支持同时处理多个音频文件
+    支持同时处理多个音频文件，各文件并行转码后按批送入模型
     """
     try:
         if not manager:
@@ -33,6 +34,8 @@ async def asr_batch_transcribe(
         )
         
         return success_response(result, "批量转录完成")
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
     except Exception as e:
         return error_response(500, str(e))
 
@@ -4,10 +4,11 @@ from typing import Optional
 from fastapi import APIRouter, UploadFile, File, Depends
 from core.model_manager import ModelManager
 from core.lid_processor import LIDProcessor
+from core.inference_executor import ExecutorBusyError
 from api.deps import get_model_manager
-from utils.response_builder import success_response, error_response
+from utils.response_builder import success_response, error_response, busy_response
 
-router = APIRouter(prefix="/api/v1/modules/lid", tags=["LID"])
+router = APIRouter(prefix="/lid", tags=["LID"])
 
 
 @router.post("/detect")
@@ -20,5 +21,7 @@ async def lid_detect(
             return error_response(500, "服务未就绪，模型管理器未初始化")
         processor = LIDProcessor(manager, {})
         return success_response(await processor.detect(audio_file))
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
     except Exception as e:
         return error_response(500, str(e))
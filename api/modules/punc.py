@@ -1,14 +1,15 @@
 """Punc 模块路由"""
 
-from typing import List, Optional
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends
 from pydantic import BaseModel
 from core.model_manager import ModelManager
 from core.punc_processor import PuncProcessor
-from api.deps import get_model_manager
-from utils.response_builder import success_response, error_response
+from core.inference_executor import ExecutorBusyError
+from api.deps import get_model_manager, get_punc_service
+from utils.response_builder import success_response, error_response, busy_response
 
-router = APIRouter(prefix="/api/v1/modules/punc", tags=["Punc"])
+router = APIRouter(prefix="/punc", tags=["Punc"])
 
 
 class PuncRequest(BaseModel):
@@ -19,12 +20,15 @@ class PuncRequest(BaseModel):
 @router.post("/predict")
 async def punc_predict(
     req: PuncRequest,
-    manager: Optional[ModelManager] = Depends(get_model_manager)
+    manager: Optional[ModelManager] = Depends(get_model_manager),
+    punc_service: Optional[Any] = Depends(get_punc_service),
 ):
     try:
         if not manager:
             return error_response(500, "服务未就绪，模型管理器未初始化")
-        processor = PuncProcessor(manager)
+        processor = PuncProcessor(manager, punc_service)
         return success_response(await processor.predict(req.texts, req.uttids))
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
     except Exception as e:
         return error_response(500, str(e))
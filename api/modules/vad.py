@@ -1,13 +1,21 @@
 """VAD 模块路由"""
 
+from contextlib import suppress
 from typing import Optional
 from fastapi import APIRouter, UploadFile, File, WebSocket, WebSocketDisconnect, Depends
 from core.model_manager import ModelManager
 from core.vad_processor import VADProcessor
+from core.inference_executor import ExecutorBusyError
+from core.stream_vad import stream_vad_service
 from api.deps import get_model_manager
-from utils.response_builder import success_response, error_response
+from utils.audio_converter import pcm_to_int16
+from utils.error_codes import ErrorCode
+from utils.logger import get_logger
+from utils.response_builder import success_response, error_response, busy_response
 
-router = APIRouter(prefix="/api/v1/modules/vad", tags=["VAD"])
+logger = get_logger(__name__)
+
+router = APIRouter(prefix="/vad", tags=["VAD"])
 
 
 @router.post("/detect")
@@ -21,6 +29,8 @@ async def vad_detect(
             return error_response(500, "服务未就绪，模型管理器未初始化")
         processor = VADProcessor(manager, {})
         return success_response(await processor.detect(audio_file, speech_threshold))
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
     except Exception as e:
         return error_response(500, str(e))
 
@@ -35,16 +45,56 @@ async def aed_detect(
             return error_response(500, "服务未就绪，模型管理器未初始化")
         processor = VADProcessor(manager, {})
         return success_response(await processor.aed_detect(audio_file))
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
     except Exception as e:
         return error_response(500, str(e))
 
 
 @router.websocket("/stream")
-async def vad_stream(websocket: WebSocket):
+async def vad_stream(websocket: WebSocket, sample_format: str = "s16le"):
+    """
+    流式 VAD
+    客户端发送 16kHz 单声道原始 PCM 二进制帧（sample_format: s16le 或 f32le，帧长任意），
+    服务端在检测到语音起止时推送 {"event": "speech_start", "start_ms"} / {"event": "speech_end", "start_ms", "end_ms"}
+    （毫秒，相对流开始，10ms 帧粒度）；客户端发送文本 "end" 结束流，服务端补发进行中语音段的 speech_end
+    并发送 {"event": "end", "duration_ms"} 后关闭连接
+    """
     await websocket.accept()
+    try:
+        session = stream_vad_service.open_session()
+    except ExecutorBusyError as e:
+        await websocket.send_json({"event": "error", **error_response(ErrorCode.SERVICE_BUSY, str(e))})
+        await websocket.close(code=1013)
+        return
+    except RuntimeError as e:
+        await websocket.send_json({"event": "error", **error_response(ErrorCode.MODEL_NOT_LOADED, str(e))})
+        await websocket.close(code=1011)
+        return
     try:
         while True:
-            data = await websocket.receive_bytes()
-            await websocket.send_json({"is_speech": len(data) > 1000})
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                try:
+                    samples = pcm_to_int16(message["bytes"], sample_format)
+                except ValueError as e:
+                    await websocket.send_json({"event": "error", **error_response(ErrorCode.INVALID_PARAMS, str(e))})
+                    continue
+                for event in await session.feed(samples):
+                    await websocket.send_json(event)
+            elif (message.get("text") or "").strip().lower() == "end":
+                for event in session.finish():
+                    await websocket.send_json(event)
+                await websocket.send_json({"event": "end", "duration_ms": session.duration_ms})
+                await websocket.close()
+                return
     except WebSocketDisconnect:
         pass
+    except Exception as e:
+        logger.error(f"流式 VAD 处理失败: {e}")
+        with suppress(Exception):
+            await websocket.close(code=1011)
+    finally:
+        session.close()
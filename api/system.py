@@ -6,81 +6,326 @@
 支持两种模式：
 - 同步：POST /system/transcribe，等待识别完成后返回
 - 异步：POST /system/transcribe/submit 提交任务，轮询 status/result
+  任务进入有界优先级队列（core.job_queue），由固定数量的工作协程依次执行；
+  status/result 支持 wait 长轮询，GET /system/transcribe/events/{job_id} 以 SSE 推送状态变化
+- 原始 PCM：POST /system/transcribe/pcm 请求体为 16kHz mono PCM 样本，跳过 multipart 与转码
+- 流式：WebSocket /system/transcribe/stream 发送原始 PCM，流式 VAD 切出的语音段结束后立即识别并推送结果
+- 批量：POST /system/transcribe/batch 提交服务器本地音频清单（JSONL），
+  作为一个异步任务执行，结果通过 /system/transcribe/batch/{job_id}/results 分页或流式下载
 """
 
 import asyncio
-import tempfile
+import json
 import os
-from fastapi import APIRouter, UploadFile, File, Form, Depends, Request
+import time
+import uuid
+from contextlib import suppress
+from fastapi import APIRouter, UploadFile, File, Form, Depends, Request, Query, WebSocket, WebSocketDisconnect
+from fastapi.responses import FileResponse, StreamingResponse
 from typing import Dict, Any, Optional
 from core.model_manager import ModelManager
 from core.processor import RequestProcessor
-from core.job_store import job_store, STATUS_PENDING, STATUS_PROCESSING, STATUS_COMPLETED, STATUS_FAILED
-from api.deps import get_model_manager, get_asr_system
-from utils.response_builder import success_response, error_response
+from core.inference_executor import ExecutorBusyError
+from core.job_queue import job_queue
+from core.webhook import validate_callback_url, webhook_dispatcher
+from core.bulk import BulkTranscriber, bulk_config, parse_manifest, read_results, results_path
+from core.job_store import (
+    job_store, STATUS_PENDING, STATUS_PROCESSING, STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED, STATUS_EXPIRED,
+    FINISHED_STATUSES,
+)
+from core.cancellation import ClientDisconnected, DeadlineExceeded, cancel_stats, run_cancellable
+from core.stream_vad import stream_vad_service
+from core.stream_transcribe import open_transcribe_session
+from api.deps import get_model_manager, get_asr_system, get_batch_scheduler
+from utils.response_builder import success_response, error_response, busy_response
 from utils.error_codes import ErrorCode
+from utils.config_loader import get_config
+from utils.upload_reader import UploadGuard, UploadLimitRoute, spool_upload, upload_limits
+from utils.scratch import named_temp_file
+from utils.audio_converter import pcm_to_int16
+from utils.audio_validator import parse_pcm_headers
+from utils.logger import get_logger
 
-router = APIRouter(tags=["system"])
+logger = get_logger(__name__)
+
+# 上传接口在表单解析前按 Content-Length 拒绝超限请求体
+router = APIRouter(tags=["system"], route_class=UploadLimitRoute)
+
+# 长轮询 wait 参数上限（秒），可通过 jobs.max_wait_s 配置
+DEFAULT_MAX_WAIT_S = 60
+# SSE 心跳间隔（秒），避免代理因空闲断开连接
+SSE_HEARTBEAT_S = 15
 
 
 @router.post("/system/transcribe")
 async def system_transcribe(
+    request: Request,
     audio: UploadFile = File(..., description="音频文件"),
     uttid: str = Form(None, description="话语ID"),
+    deadline_ms: int = Form(None, ge=1, description="截止时间（毫秒），超过后取消识别并返回 4007"),
+    stream: bool = Form(False, description="增量返回：每个分段解码后立即输出分句（NDJSON，Accept: text/event-stream 时为 SSE）"),
     manager: Optional[ModelManager] = Depends(get_model_manager),
     asr_system: Optional[Any] = Depends(get_asr_system),
+    scheduler: Optional[Any] = Depends(get_batch_scheduler),
 ) -> Dict[str, Any]:
     """
     一站式语音识别接口
-    调用 FireRedAsr2System.process 执行 ASR、VAD、LID、标点预测的完整流水线
+    调用 FireRedAsr2System.process 执行 ASR、VAD、LID、标点预测的完整流水线；
+    客户端断开或超过 deadline_ms 时取消识别，尚未开始的推理不再执行。
+    stream=true 时以分块响应逐条返回 start / sentence / result 记录（见 _transcribe_stream_response）
     """
     try:
         if not asr_system:
             return error_response(500, "ASR System 未加载，请检查 config 中 asr.enabled")
         processor = RequestProcessor(manager, {})
-        result = await processor.transcribe(
-            audio_file=audio,
-            asr_system=asr_system,
-            uttid=uttid,
+        if stream:
+            records = processor.transcribe_stream(
+                audio_file=audio, asr_system=asr_system, uttid=uttid, deadline_ms=deadline_ms,
+            )
+            return await _transcribe_stream_response(records, request)
+        result = await run_cancellable(
+            processor.transcribe(
+                audio_file=audio,
+                asr_system=asr_system,
+                uttid=uttid,
+                scheduler=scheduler,
+            ),
+            request=request,
+            deadline_ms=deadline_ms,
+        )
+        return success_response(result, "识别成功")
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
+    except DeadlineExceeded as e:
+        return error_response(ErrorCode.DEADLINE_EXCEEDED, str(e))
+    except ClientDisconnected as e:
+        return error_response(ErrorCode.REQUEST_CANCELLED, str(e))
+    except Exception as e:
+        return error_response(500, str(e))
+
+
+@router.post("/system/transcribe/pcm")
+async def system_transcribe_pcm(
+    request: Request,
+    uttid: str = Query(None, description="话语ID"),
+    deadline_ms: int = Query(None, ge=1, description="截止时间（毫秒），超过后取消识别并返回 4007"),
+    manager: Optional[ModelManager] = Depends(get_model_manager),
+    asr_system: Optional[Any] = Depends(get_asr_system),
+    scheduler: Optional[Any] = Depends(get_batch_scheduler),
+) -> Dict[str, Any]:
+    """
+    原始 PCM 一站式识别
+    请求体为 16kHz 单声道 PCM 样本（Content-Type: audio/L16;rate=16000，或 X-Sample-Format: f32le 声明 32-bit 浮点），
+    样本直接送入识别流水线，跳过 multipart 解析、临时文件与 ffmpeg；响应与 /system/transcribe 相同
+    """
+    try:
+        if not asr_system:
+            return error_response(500, "ASR System 未加载，请检查 config 中 asr.enabled")
+        sample_format = parse_pcm_headers(request.headers)
+        processor = RequestProcessor(manager, {})
+        # 请求体由识别协程直接读取，不做断开轮询（is_disconnected 会消费请求体消息）
+        result = await run_cancellable(
+            processor.transcribe_pcm(
+                request.stream(),
+                sample_format,
+                asr_system=asr_system,
+                uttid=uttid,
+                scheduler=scheduler,
+            ),
+            deadline_ms=deadline_ms,
         )
         return success_response(result, "识别成功")
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
+    except DeadlineExceeded as e:
+        return error_response(ErrorCode.DEADLINE_EXCEEDED, str(e))
+    except ValueError as e:
+        return error_response(getattr(e, "error_code", ErrorCode.INVALID_PARAMS), str(e))
     except Exception as e:
         return error_response(500, str(e))
 
 
-async def _run_transcribe_job(job_id: str, app: Any) -> None:
-    """后台执行转录任务"""
+async def _transcribe_stream_response(records: Any, request: Request) -> Any:
+    """
+    增量识别的分块响应：默认 NDJSON（application/x-ndjson，每行一条记录，type 为 start / sentence / result），
+    Accept 含 text/event-stream 时为 SSE（event 为记录的 type）。
+    准入、音频解码与 VAD 在响应开始前完成，失败时仍返回普通错误响应；
+    之后的失败以 type=error 的记录结束响应（code/message 同错误响应）
+    """
+    sse = "text/event-stream" in request.headers.get("accept", "")
+
+    def encode(record: Dict[str, Any]) -> str:
+        if sse:
+            return _sse(record["type"], {k: v for k, v in record.items() if k != "type"})
+        return json.dumps(record, ensure_ascii=False) + "\n"
+
+    # 第一条记录（start）之前的错误由调用方按普通请求处理
+    first = await records.__anext__()
+
+    async def body():
+        try:
+            yield encode(first)
+            async for record in records:
+                yield encode(record)
+        except DeadlineExceeded as e:
+            yield encode({"type": "error", **error_response(ErrorCode.DEADLINE_EXCEEDED, str(e))})
+        except Exception as e:
+            yield encode({"type": "error", **error_response(500, str(e))})
+        finally:
+            await records.aclose()
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def run_transcribe_job(job_id: str, app: Any) -> None:
+    """执行单个转录任务（由任务队列的工作协程调用）"""
     from utils.logger import get_logger
     logger = get_logger(__name__)
     job = job_store.get_full(job_id)
-    if not job or job["status"] != STATUS_PENDING:
+    # 多进程共享模式下任务由队列领取时已置为 processing
+    if not job or job["status"] not in (STATUS_PENDING, STATUS_PROCESSING):
         return
+    params = job.get("params") or {}
+    timeout = None
+    if params.get("deadline_at"):
+        timeout = params["deadline_at"] - time.time()
+        if timeout <= 0:
+            # 当前即为该任务的执行协程，只标记过期并清理，不经任务队列取消自身
+            _mark_expired(job_id)
+            return
     job_store.set_processing(job_id)
     tmp_path = job.get("tmp_path")
     if not tmp_path or not os.path.exists(tmp_path):
         job_store.set_failed(job_id, "临时文件丢失")
+        notify_job(job_id)
         return
     manager = getattr(app.state, "model_manager", None)
     asr_system = getattr(app.state, "asr_system", None)
+    scheduler = getattr(app.state, "batch_scheduler", None)
     if not asr_system:
         job_store.set_failed(job_id, "ASR System 未加载")
         _cleanup_tmp(tmp_path)
+        notify_job(job_id)
         return
     try:
         processor = RequestProcessor(manager or {}, {})
-        result = await processor.transcribe_from_path(
-            file_path=tmp_path,
-            filename=job.get("filename", "audio.wav"),
-            asr_system=asr_system,
-            uttid=job.get("uttid"),
+        result = await asyncio.wait_for(
+            _execute_job(job_id, job, processor, asr_system, scheduler, tmp_path), timeout,
         )
-        job_store.set_completed(job_id, result)
+        await job_store.complete(job_id, result)
         logger.info(f"异步任务完成: job_id={job_id}")
+    except asyncio.TimeoutError:
+        # 执行中超过截止时间：wait_for 已取消识别，尚未开始的分段/条目不再执行
+        job_store.set_expired(job_id, "执行超过截止时间")
+        cancel_stats.record_expired("jobs")
+        cancel_stats.interrupted += 1
+        logger.info(f"异步任务过期: job_id={job_id}")
+    except asyncio.CancelledError:
+        job = job_store.get(job_id)
+        if job and job["status"] in (STATUS_CANCELLED, STATUS_EXPIRED):
+            # 客户端取消（DELETE）：回调已由取消接口发出
+            cancel_stats.interrupted += 1
+            logger.info(f"异步任务已中断: job_id={job_id}")
+        else:
+            # 服务关闭中断：保留临时文件，持久化任务存储重启后重新执行
+            tmp_path = None
+        raise
     except Exception as e:
         job_store.set_failed(job_id, str(e))
         logger.error(f"异步任务失败: job_id={job_id}, error={e}")
     finally:
         _cleanup_tmp(tmp_path)
+    notify_job(job_id)
+
+
+async def _execute_job(
+    job_id: str, job: Dict[str, Any], processor: RequestProcessor, asr_system: Any, scheduler: Any, tmp_path: str,
+) -> Dict[str, Any]:
+    """按任务类型（批量清单 / 长音频 / 普通）执行识别"""
+    params = job.get("params") or {}
+    if params.get("batch"):
+        bulk_cfg = bulk_config(get_config())
+        transcriber = BulkTranscriber(processor, asr_system, scheduler, bulk_cfg["read_ahead"])
+        return await transcriber.run(
+            manifest_path=tmp_path,
+            output_path=results_path(get_config(), job_id),
+            total=params.get("total", 0),
+            on_progress=lambda progress: job_store.set_progress(job_id, progress),
+        )
+    if params.get("long_form"):
+        return await processor.transcribe_long_form(
+            file_path=tmp_path,
+            filename=job.get("filename", "audio.wav"),
+            asr_system=asr_system,
+            uttid=job.get("uttid"),
+            on_progress=lambda progress: job_store.set_progress(job_id, progress),
+        )
+    return await processor.transcribe_from_path(
+        file_path=tmp_path,
+        filename=job.get("filename", "audio.wav"),
+        asr_system=asr_system,
+        uttid=job.get("uttid"),
+        scheduler=scheduler,
+    )
+
+
+def _schedule_expiry(job_id: str, deadline_at: Optional[float]) -> None:
+    """截止时间到达时任务仍在排队则立即丢弃（执行中的任务由 run_transcribe_job 的超时处理）"""
+    if deadline_at:
+        asyncio.get_running_loop().call_later(max(0.0, deadline_at - time.time()), _expire_pending, job_id)
+
+
+def _expire_pending(job_id: str) -> None:
+    """丢弃仍在排队的过期任务（重启后截止时间已过的任务在开始执行时丢弃）"""
+    job = job_store.get(job_id)
+    if job and job["status"] == STATUS_PENDING:
+        _expire_queued(job_id)
+
+
+def _expire_queued(job_id: str) -> None:
+    """将排队中的过期任务移出队列并标记过期（已开始执行的任务不取消，由其自身的超时处理）"""
+    job_queue.discard(job_id)
+    _mark_expired(job_id)
+
+
+def _mark_expired(job_id: str) -> None:
+    """标记任务过期，清理已落盘的音频并投递回调"""
+    job_store.set_expired(job_id, "排队超过截止时间")
+    cancel_stats.record_expired("jobs")
+    cancel_stats.dropped_queued += 1
+    _cleanup_tmp(job_store.pop_tmp_path(job_id))
+    notify_job(job_id)
+
+
+def notify_job(job_id: str) -> None:
+    """任务结束后向提交时指定的 callback_url 投递结果（后台执行，不阻塞队列）"""
+    job = job_store.get_full(job_id)
+    callback_url = job and (job.get("params") or {}).get("callback_url")
+    if not callback_url or job["status"] not in FINISHED_STATUSES:
+        return
+    payload = {"job_id": job_id, "status": job["status"]}
+    if job["status"] != STATUS_COMPLETED:
+        payload["error"] = job.get("error")
+    elif not job.get("result_ref"):
+        payload["result"] = job.get("result")
+    # 已落盘的结果在每次投递时从文件流式读取，不常驻内存
+    webhook_dispatcher.dispatch(callback_url, payload, result_ref=job.get("result_ref"))
+
+
+def _spool_manifest(src: Any, root: str, max_items: int):
+    """校验清单并将规范化条目写入临时文件，返回 (临时文件路径, 条目数)"""
+    with named_temp_file(suffix=".jsonl") as dst:
+        try:
+            total = parse_manifest(src, dst, root, max_items)
+        except BaseException:
+            dst.close()
+            _cleanup_tmp(dst.name)
+            raise
+    return dst.name, total
 
 
 def _cleanup_tmp(path: str) -> None:
@@ -91,64 +336,410 @@ def _cleanup_tmp(path: str) -> None:
             pass
 
 
+@router.websocket("/system/transcribe/stream")
+async def system_transcribe_stream(
+    websocket: WebSocket,
+    sample_format: str = "s16le",
+    punc: bool = True,
+    uttid: Optional[str] = None,
+):
+    """
+    流式语音识别
+    客户端发送 16kHz 单声道原始 PCM 二进制帧（sample_format: s16le 或 f32le），服务端以流式 VAD 检测端点：
+    推送 speech_start / speech_end 事件，语音段结束后送入识别（所有连接的语音段合并为批量推理），
+    完成后按语音段顺序推送 {"event": "result", "segment", "start_ms", "end_ms", "text", "words", ...}
+    （时间为相对流开始的毫秒数；punc=false 时不加标点）。客户端发送文本 "end" 结束流，
+    服务端推送剩余结果与 {"event": "end", "duration_ms", "segments"} 后关闭连接
+    """
+    await websocket.accept()
+    try:
+        session = open_transcribe_session(
+            stream_vad_service,
+            getattr(websocket.app.state, "segment_scheduler", None),
+            uttid or str(uuid.uuid4()),
+            punc,
+        )
+    except ExecutorBusyError as e:
+        await websocket.send_json({"event": "error", **error_response(ErrorCode.SERVICE_BUSY, str(e))})
+        await websocket.close(code=1013)
+        return
+    except RuntimeError as e:
+        await websocket.send_json({"event": "error", **error_response(ErrorCode.MODEL_NOT_LOADED, str(e))})
+        await websocket.close(code=1011)
+        return
+
+    # 事件与识别任务按产生顺序进入发送队列，由单个发送协程依次推送（识别结果按语音段顺序返回）
+    outbox: asyncio.Queue = asyncio.Queue()
+    pending = []
+
+    async def sender():
+        while True:
+            item = await outbox.get()
+            if item is None:
+                return
+            if isinstance(item, asyncio.Task):
+                # 只等待任务结束而不取其结果：发送协程自身被取消时照常退出，
+                # 单个分段任务被取消或失败时推送 error 事件后继续发送后续分段
+                await asyncio.wait({item})
+                if item.cancelled():
+                    logger.warning(f"流式识别分段已取消: uttid={session.uttid}")
+                    item = {"event": "error", **error_response(ErrorCode.MODEL_INFERENCE_ERROR, "分段识别已取消")}
+                elif item.exception() is not None:
+                    logger.error(f"流式识别分段失败: uttid={session.uttid}, error={item.exception()}")
+                    item = {
+                        "event": "error", **error_response(ErrorCode.MODEL_INFERENCE_ERROR, str(item.exception()))
+                    }
+                else:
+                    item = item.result()
+            await websocket.send_json(item)
+
+    def enqueue(paired):
+        pending[:] = [task for task in pending if not task.done()]
+        for event, task in paired:
+            outbox.put_nowait(event)
+            if task is not None:
+                outbox.put_nowait(task)
+                pending.append(task)
+
+    sender_task = asyncio.create_task(sender())
+    try:
+        while True:
+            receive = asyncio.create_task(websocket.receive())
+            done, _ = await asyncio.wait({receive, sender_task}, return_when=asyncio.FIRST_COMPLETED)
+            if sender_task in done:
+                receive.cancel()
+                sender_task.result()
+                return
+            message = receive.result()
+            if message["type"] == "websocket.disconnect":
+                return
+            if message.get("bytes") is not None:
+                try:
+                    samples = pcm_to_int16(message["bytes"], sample_format)
+                except ValueError as e:
+                    outbox.put_nowait({"event": "error", **error_response(ErrorCode.INVALID_PARAMS, str(e))})
+                    continue
+                enqueue(await session.feed(samples))
+            elif (message.get("text") or "").strip().lower() == "end":
+                enqueue(session.finish())
+                outbox.put_nowait({"event": "end", "duration_ms": session.duration_ms, "segments": session.segments})
+                outbox.put_nowait(None)
+                await sender_task
+                await websocket.close()
+                return
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"流式识别处理失败: {e}")
+        with suppress(Exception):
+            await websocket.close(code=1011)
+    finally:
+        sender_task.cancel()
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(sender_task, *pending, return_exceptions=True)
+        session.close()
+
+
 @router.post("/system/transcribe/submit")
 async def system_transcribe_submit(
     request: Request,
     audio: UploadFile = File(..., description="音频文件"),
     uttid: str = Form(None, description="话语ID"),
+    priority: int = Form(0, description="优先级，数值越大越先执行，同优先级按提交顺序"),
+    long_form: bool = Form(False, description="长音频模式：分段并行识别，使用 long_form 节的时长限制并报告进度"),
+    callback_url: str = Form(None, description="任务结束后以 POST 投递结果的回调地址（http/https）"),
+    deadline_ms: int = Form(None, ge=1, description="截止时间（毫秒，自提交起算），超过后任务置为 expired 并停止执行"),
     manager: Optional[ModelManager] = Depends(get_model_manager),
     asr_system: Optional[Any] = Depends(get_asr_system),
 ) -> Dict[str, Any]:
     """
     提交异步转录任务（适用于长时间音频）
-    立即返回 job_id，客户端轮询 /status/{job_id} 和 /result/{job_id} 获取进度和结果
+    立即返回 job_id 与排队位置，客户端轮询 /status/{job_id} 和 /result/{job_id} 获取进度和结果，
+    或指定 callback_url 在任务结束时接收回调；任务队列已满时返回 429
     """
     try:
         if not asr_system:
             return error_response(500, "ASR System 未加载，请检查 config 中 asr.enabled")
-        content = await audio.read()
+        params = {}
+        if callback_url:
+            params["callback_url"] = validate_callback_url(callback_url)
+        if deadline_ms:
+            params["deadline_at"] = time.time() + deadline_ms / 1000.0
+        job_queue.check_capacity()
         filename = audio.filename or "audio.wav"
         suffix = os.path.splitext(filename)[1] or ".wav"
-        with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-            tmp.write(content)
-            tmp_path = tmp.name
+        # 分块落盘并计算 SHA-256，超过大小或容器头时长限制时立即中止
+        max_file_size, max_duration = upload_limits(get_config(), long_form=long_form)
+        guard = UploadGuard(max_file_size, max_duration)
+        tmp_path = await spool_upload(audio, guard, suffix=suffix)
         job_id = job_store.create(
             tmp_path=tmp_path,
             filename=filename,
             uttid=uttid,
+            params={
+                "sha256": guard.sha256, "size": guard.size, "priority": priority, "long_form": long_form, **params,
+            },
         )
-        asyncio.create_task(_run_transcribe_job(job_id, request.app))
-        return success_response({"job_id": job_id}, "任务已提交，请轮询 /status/{job_id} 获取进度")
+        try:
+            await job_queue.put(job_id, priority)
+        except ExecutorBusyError:
+            # 上传期间队列被占满：撤销任务并清理已落盘的音频
+            job_store.set_failed(job_id, "任务队列已满")
+            _cleanup_tmp(job_store.pop_tmp_path(job_id))
+            raise
+        _schedule_expiry(job_id, params.get("deadline_at"))
+        return success_response(
+            {"job_id": job_id, **(job_queue.position(job_id) or {})},
+            "任务已提交，请轮询 /status/{job_id} 获取进度",
+        )
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
+    except ValueError as e:
+        return error_response(getattr(e, "error_code", ErrorCode.INVALID_PARAMS), str(e))
     except Exception as e:
         return error_response(500, str(e))
 
 
-@router.get("/system/transcribe/status/{job_id}")
-async def system_transcribe_status(job_id: str) -> Dict[str, Any]:
-    """查询转录任务状态"""
-    job = job_store.get(job_id)
-    if not job:
-        return error_response(ErrorCode.JOB_NOT_FOUND, f"任务 {job_id} 不存在或已过期")
+@router.post("/system/transcribe/batch")
+async def system_transcribe_batch(
+    manifest: UploadFile = File(..., description="JSONL 清单，每行 {\"path\": \"...\", \"uttid\": \"...\"}，uttid 可选"),
+    priority: int = Form(0, description="优先级，数值越大越先执行，同优先级按提交顺序"),
+    callback_url: str = Form(None, description="任务结束后以 POST 投递汇总的回调地址（http/https）"),
+    deadline_ms: int = Form(None, ge=1, description="截止时间（毫秒，自提交起算），超过后任务置为 expired 并停止执行"),
+    asr_system: Optional[Any] = Depends(get_asr_system),
+) -> Dict[str, Any]:
+    """
+    提交批量转录任务
+    清单中的路径为服务器本地路径（相对路径基于 bulk.root），解析后必须位于 bulk.root 之下；
+    音频不经上传，执行时按清单顺序以有界预读窗口逐条识别。
+    进度通过 /status/{job_id}（progress.items_done / items_total）查询，
+    结果通过 /batch/{job_id}/results 下载
+    """
+    try:
+        if not asr_system:
+            return error_response(500, "ASR System 未加载，请检查 config 中 asr.enabled")
+        bulk_cfg = bulk_config(get_config())
+        if not bulk_cfg["root"]:
+            return error_response(ErrorCode.INVALID_PARAMS, "批量接口未启用，请在 config 中配置 bulk.root")
+        params = {"batch": True, "priority": priority}
+        if callback_url:
+            params["callback_url"] = validate_callback_url(callback_url)
+        if deadline_ms:
+            params["deadline_at"] = time.time() + deadline_ms / 1000.0
+        job_queue.check_capacity()
+        tmp_path, total = await asyncio.to_thread(
+            _spool_manifest, manifest.file, bulk_cfg["root"], bulk_cfg["max_items"],
+        )
+        job_id = job_store.create(
+            tmp_path=tmp_path,
+            filename=manifest.filename or "manifest.jsonl",
+            uttid=None,
+            params={**params, "total": total},
+        )
+        try:
+            await job_queue.put(job_id, priority)
+        except ExecutorBusyError:
+            job_store.set_failed(job_id, "任务队列已满")
+            _cleanup_tmp(job_store.pop_tmp_path(job_id))
+            raise
+        _schedule_expiry(job_id, params.get("deadline_at"))
+        return success_response(
+            {"job_id": job_id, "total": total, **(job_queue.position(job_id) or {})},
+            "批量任务已提交，请轮询 /status/{job_id} 获取进度",
+        )
+    except ExecutorBusyError as e:
+        return busy_response(e.retry_after, str(e), e.status_code)
+    except ValueError as e:
+        return error_response(getattr(e, "error_code", ErrorCode.INVALID_PARAMS), str(e))
+    except Exception as e:
+        return error_response(500, str(e))
+
+
+@router.get("/system/transcribe/batch/{job_id}/results")
+async def system_transcribe_batch_results(
+    job_id: str,
+    offset: int = Query(0, ge=0, description="起始条目（清单顺序，0 起始）"),
+    limit: int = Query(100, ge=1, le=1000, description="每页条目数"),
+    format: str = Query("json", pattern="^(json|jsonl)$", description="json 分页返回；jsonl 流式下载全部已完成条目"),
+):
+    """
+    下载批量任务结果（按清单顺序，每条含 index/path/uttid 及 result 或 error）
+    任务执行中即可读取已完成的部分；next_offset 为 null 表示当前已无更多结果
+    """
+    job = job_store.get_full(job_id)
+    if not job or not (job.get("params") or {}).get("batch"):
+        return error_response(ErrorCode.JOB_NOT_FOUND, f"批量任务 {job_id} 不存在或已过期")
+    path = results_path(get_config(), job_id)
+    if format == "jsonl":
+        if not os.path.exists(path):
+            return error_response(ErrorCode.JOB_NOT_FOUND, f"批量任务 {job_id} 尚无结果")
+        return FileResponse(path, media_type="application/x-ndjson", filename=f"{job_id}.jsonl")
+    items, next_offset = await asyncio.to_thread(read_results, path, offset, limit)
     return success_response({
         "job_id": job_id,
         "status": job["status"],
-        "filename": job.get("filename"),
-        "created_at": job.get("created_at"),
+        "progress": job.get("progress"),
+        "summary": job.get("result"),
+        "offset": offset,
+        "items": items,
+        "next_offset": next_offset,
     })
 
 
+@router.get("/system/transcribe/status/{job_id}")
+async def system_transcribe_status(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="长轮询：最多等待的秒数，任务结束时立即返回"),
+) -> Dict[str, Any]:
+    """查询转录任务状态"""
+    job = await _get_job(job_id, wait)
+    if not job:
+        return error_response(ErrorCode.JOB_NOT_FOUND, f"任务 {job_id} 不存在或已过期")
+    return success_response(_status_data(job))
+
+
 @router.get("/system/transcribe/result/{job_id}")
-async def system_transcribe_result(job_id: str) -> Dict[str, Any]:
+async def system_transcribe_result(
+    job_id: str,
+    wait: float = Query(0, ge=0, description="长轮询：最多等待的秒数，任务结束时立即返回"),
+) -> Dict[str, Any]:
     """获取转录结果（仅当 status=completed 时返回结果，status=failed 时返回错误信息）"""
-    job = job_store.get(job_id)
+    job = await _get_job(job_id, wait)
     if not job:
         return error_response(ErrorCode.JOB_NOT_FOUND, f"任务 {job_id} 不存在或已过期")
     status = job["status"]
     if status == STATUS_COMPLETED:
+        job_store.mark_fetched(job_id)
+        if job.get("result_ref"):
+            # 已落盘的大结果：按块解压后包装为与 success_response 相同的响应体流式返回
+            envelope = json.dumps(success_response(None, "识别成功"), ensure_ascii=False)
+            prefix, suffix = envelope.rsplit("null", 1)
+            return StreamingResponse(
+                _stream_result(job, prefix.encode("utf-8"), suffix.encode("utf-8")),
+                media_type="application/json",
+            )
         return success_response(job["result"], "识别成功")
     if status == STATUS_FAILED:
+        job_store.mark_fetched(job_id)
         return error_response(500, job.get("error", "识别失败"))
+    if status in (STATUS_CANCELLED, STATUS_EXPIRED):
+        job_store.mark_fetched(job_id)
+        code = ErrorCode.REQUEST_CANCELLED if status == STATUS_CANCELLED else ErrorCode.DEADLINE_EXCEEDED
+        return error_response(code, job.get("error"))
     return success_response(
         {"status": status, "message": "任务尚未完成，请稍后重试"},
         "任务进行中",
     )
+
+
+@router.delete("/system/transcribe/{job_id}")
+async def system_transcribe_cancel(job_id: str) -> Dict[str, Any]:
+    """
+    取消异步任务
+    排队中的任务立即移出队列；执行中的任务停止后续识别（已在推理线程中的批次完成后丢弃结果，
+    长音频与批量任务在下一批分段/条目处停止）。多进程共享模式下由执行该任务的进程在轮询间隔内中断
+    """
+    job = job_store.get(job_id)
+    if not job:
+        return error_response(ErrorCode.JOB_NOT_FOUND, f"任务 {job_id} 不存在或已过期")
+    previous = job["status"]
+    if previous in FINISHED_STATUSES:
+        return error_response(ErrorCode.JOB_NOT_CANCELLABLE, f"任务 {job_id} 已结束（{previous}），无法取消")
+    job_store.set_cancelled(job_id, "任务已取消")
+    cancel_stats.record_cancelled("jobs")
+    if job_queue.cancel(job_id) == "dropped" or previous == STATUS_PENDING:
+        cancel_stats.dropped_queued += 1
+        _cleanup_tmp(job_store.pop_tmp_path(job_id))
+    notify_job(job_id)
+    return success_response(
+        {"job_id": job_id, "status": STATUS_CANCELLED, "previous_status": previous},
+        "任务已取消",
+    )
+
+
+@router.get("/system/transcribe/events/{job_id}")
+async def system_transcribe_events(job_id: str, request: Request):
+    """
+    以 Server-Sent Events 推送任务状态变化
+    每次状态或进度变化发送 event: status；结束时发送 event: completed（data 为识别结果）
+    或 event: failed / cancelled / expired（data 含 error），随后关闭连接
+    """
+    if not job_store.get(job_id):
+        return error_response(ErrorCode.JOB_NOT_FOUND, f"任务 {job_id} 不存在或已过期")
+
+    async def event_stream():
+        last_data = None
+        while True:
+            job = job_store.get(job_id)
+            if not job:
+                yield _sse("failed", {"job_id": job_id, "error": "任务不存在或已过期"})
+                return
+            if job["status"] == STATUS_COMPLETED:
+                job_store.mark_fetched(job_id)
+                if job.get("result_ref"):
+                    # 落盘结果为单行紧凑 JSON，可直接作为 data 行流式发送
+                    async for chunk in _stream_result(job, b"event: completed\ndata: ", b"\n\n"):
+                        yield chunk
+                else:
+                    yield _sse("completed", job["result"])
+                return
+            if job["status"] in (STATUS_FAILED, STATUS_CANCELLED, STATUS_EXPIRED):
+                job_store.mark_fetched(job_id)
+                yield _sse(job["status"], {"job_id": job_id, "error": job.get("error")})
+                return
+            data = _status_data(job)
+            if data != last_data:
+                last_data = data
+                yield _sse("status", data)
+            if not await job_store.wait_for_change(job_id, SSE_HEARTBEAT_S):
+                if await request.is_disconnected():
+                    return
+                yield ": ping\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _get_job(job_id: str, wait: float) -> Optional[Dict[str, Any]]:
+    """查询任务；wait > 0 且任务未结束时等待其结束（不超过 jobs.max_wait_s）"""
+    if wait <= 0:
+        return job_store.get(job_id)
+    max_wait = (get_config().get("jobs") or {}).get("max_wait_s", DEFAULT_MAX_WAIT_S)
+    return await job_store.wait_finished(job_id, min(wait, max_wait))
+
+
+def _status_data(job: Dict[str, Any]) -> Dict[str, Any]:
+    job_id = job["job_id"]
+    data = {
+        "job_id": job_id,
+        "status": job["status"],
+        "filename": job.get("filename"),
+        "created_at": job.get("created_at"),
+    }
+    if job["status"] == STATUS_PENDING:
+        # 排队位置（1 起始）与按平均任务耗时估算的开始等待秒数
+        data.update(job_queue.position(job_id) or {})
+    if job.get("progress"):
+        # 长音频模式：已完成/总分段数与当前实时率
+        data["progress"] = job["progress"]
+    return data
+
+
+async def _stream_result(job: Dict[str, Any], prefix: bytes, suffix: bytes):
+    """流式输出已落盘的结果：prefix + 结果 JSON（逐块解压，文件读取在线程中执行）+ suffix"""
+    yield prefix
+    chunks = job_store.iter_result(job)
+    while True:
+        chunk = await asyncio.to_thread(next, chunks, None)
+        if chunk is None:
+            break
+        yield chunk
+    yield suffix
+
+
+def _sse(event: str, data: Any) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
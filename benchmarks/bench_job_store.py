@@ -0,0 +1,89 @@
+"""
+任务存储基准：预先写入 N 个已完成任务（默认 10 万）后，测量各后端的单次操作耗时
+- submit+complete：create → set_processing → set_completed（存储已满时每次写入都会触发淘汰）
+- status：get
+- result：get_full + load_result
+后端：memory、sqlite、sqlite-shared（jobs.shared，多进程共享模式，每次淘汰检查读取库内任务总数），
+以及 sqlite-shared-scan：共享模式下以 SELECT COUNT(*) 全表统计代替 jobs_count 计数行（计数行引入前的做法），
+用于对比每次写入的淘汰检查开销。
+
+用法：python benchmarks/bench_job_store.py [--jobs 100000] [--ops 2000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.job_store import JobStore  # noqa: E402
+
+RESULT = {
+    "uttid": "bench", "text": "今天天气不错，我们去公园散步吧。", "dur_s": 3.2,
+    "sentences": [{"start_ms": 0, "end_ms": 3200, "text": "今天天气不错，我们去公园散步吧。", "asr_confidence": 0.95}],
+}
+
+
+def per_op_us(fn, ops):
+    start = time.perf_counter()
+    for _ in range(ops):
+        fn()
+    return (time.perf_counter() - start) / ops * 1e6
+
+
+def submit_and_complete(store):
+    job_id = store.create(tmp_path="", filename="bench.wav")
+    store.set_processing(job_id)
+    store.set_completed(job_id, RESULT)
+    return job_id
+
+
+def bench_backend(name, jobs_config, jobs, ops, scan_count=False):
+    store = JobStore()
+    store.configure({"jobs": {**jobs_config, "max_jobs": jobs}})
+    if scan_count:
+        backend = store._backend
+        backend._stored_count = lambda: backend._conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+    start = time.perf_counter()
+    ids = [submit_and_complete(store) for _ in range(jobs)]
+    fill_s = time.perf_counter() - start
+    submit_us = per_op_us(lambda: ids.append(submit_and_complete(store)), ops)
+    # 只查询仍保留的任务（淘汰从最老的开始）
+    alive = ids[-jobs:]
+    status_us = per_op_us(lambda: store.get(random.choice(alive)), ops)
+    result_us = per_op_us(lambda: store.load_result(store.get_full(random.choice(alive))), ops)
+    status = store.get_status()
+    store.close()
+    print(
+        f"{name:>18} fill={fill_s:6.1f}s submit+complete={submit_us:7.1f}us status={status_us:6.1f}us "
+        f"result={result_us:6.1f}us jobs={sum(status['jobs'].values())} evicted={status['evicted']}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jobs', type=int, default=100000)
+    parser.add_argument('--ops', type=int, default=2000)
+    args = parser.parse_args()
+    random.seed(0)
+    with tempfile.TemporaryDirectory() as directory:
+        results_dir = os.path.join(directory, "results")
+        bench_backend("memory", {"backend": "memory", "results_dir": results_dir}, args.jobs, args.ops)
+        for name, shared, scan_count in (
+            ("sqlite", False, False), ("sqlite-shared", True, False), ("sqlite-shared-scan", True, True),
+        ):
+            path = os.path.join(directory, f"{name}.db")
+            bench_backend(
+                name,
+                {"backend": "sqlite", "sqlite_path": path, "shared": shared, "results_dir": results_dir},
+                args.jobs,
+                args.ops,
+                scan_count,
+            )
+
+
+if __name__ == '__main__':
+    main()
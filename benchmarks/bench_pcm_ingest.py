@@ -0,0 +1,140 @@
+"""
+原始 PCM 上传与 multipart WAV 上传的服务端开销对比
+以近似零耗时的 ASR 桩替代模型，直接调用 ASGI 应用（不经网络与 HTTP 客户端），统计单请求
+墙钟时间、CPU 时间与 Python 分配峰值：
+- multipart：POST /system/transcribe（multipart 解析 → 临时文件 → WAV 头校验 → 读取）
+- pcm：POST /system/transcribe/pcm（请求体直接转为样本）
+
+用法：python benchmarks/bench_pcm_ingest.py [--durations 5 30 120] [--repeat 30]
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+import uuid
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi import FastAPI  # noqa: E402
+
+from api.system import router as system_router  # noqa: E402
+from core.inference_executor import inference_executor  # noqa: E402
+from core.pipeline import TranscribePipeline, load_wav_int16  # noqa: E402
+from utils.config_loader import load_config  # noqa: E402
+
+
+class ASR:
+    def transcribe(self, uttids, wavs):
+        return [{'text': '', 'confidence': 1.0} for _ in uttids]
+
+
+class System(SimpleNamespace):
+    """WAV 路径输入时与 FireRedAsr2System.process 一样先读取整段音频"""
+
+    def process(self, wav_path, uttid):
+        samples, sample_rate = load_wav_int16(wav_path)
+        return TranscribePipeline(self).process_batch([((sample_rate, samples), uttid)])[0]
+
+
+def make_app():
+    app = FastAPI()
+    app.include_router(system_router, prefix="/api/v1")
+    app.state.asr_system = System(
+        config=SimpleNamespace(asr_batch_size=8, punc_batch_size=8, enable_vad=False, enable_lid=False, enable_punc=False),
+        vad=None, lid=None, asr=ASR(), punc=None,
+    )
+    return app
+
+
+def make_requests(seconds):
+    samples = (np.random.RandomState(seconds).randn(16000 * seconds) * 3000).astype(np.int16)
+    buf = io.BytesIO()
+    with wave.open(buf, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    boundary = uuid.uuid4().hex
+    multipart = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"a.wav\"\r\n"
+        f"Content-Type: audio/wav\r\n\r\n"
+    ).encode() + buf.getvalue() + f"\r\n--{boundary}--\r\n".encode()
+    return {
+        'multipart': ("/api/v1/system/transcribe", f"multipart/form-data; boundary={boundary}", multipart),
+        'pcm': ("/api/v1/system/transcribe/pcm", "audio/L16;rate=16000", samples.tobytes()),
+    }
+
+
+async def call(app, path, content_type, body):
+    sent = False
+    chunks = []
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.body':
+            chunks.append(message.get('body', b''))
+
+    scope = {
+        'type': 'http', 'method': 'POST', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'headers': [(b'content-type', content_type.encode()), (b'content-length', str(len(body)).encode())],
+        'http_version': '1.1', 'scheme': 'http', 'server': ('bench', 80), 'client': ('bench', 1), 'root_path': '',
+    }
+    await app(scope, receive, send)
+    response = json.loads(b''.join(chunks))
+    if response.get('code') != 0:
+        raise RuntimeError(response)
+
+
+async def main(args):
+    app = make_app()
+    print(f"{'clip':>6} {'path':>9} {'wall_ms':>8} {'cpu_ms':>8} {'py_peak_MB':>11}")
+    for seconds in args.durations:
+        for name, (path, content_type, body) in make_requests(seconds).items():
+            wall, cpu = [], []
+            for _ in range(args.repeat):
+                start, start_cpu = time.perf_counter(), time.process_time()
+                await call(app, path, content_type, body)
+                wall.append((time.perf_counter() - start) * 1000)
+                cpu.append((time.process_time() - start_cpu) * 1000)
+            tracemalloc.start()
+            await call(app, path, content_type, body)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            warm = max(1, args.repeat // 6)
+            print(
+                f"{seconds:>5}s {name:>9} {statistics.median(wall[warm:]):>8.2f} "
+                f"{statistics.median(cpu[warm:]):>8.2f} {peak / 1e6:>11.1f}"
+            )
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--durations', type=int, nargs='+', default=[5, 30, 120])
+    parser.add_argument('--repeat', type=int, default=30)
+    args = parser.parse_args()
+    with tempfile.NamedTemporaryFile('w', suffix='.yaml', delete=False) as f:
+        f.write(f"processing:\n  max_file_size: 1073741824\n  max_audio_duration: {max(args.durations) + 1}\n")
+    try:
+        load_config(f.name)
+    finally:
+        os.unlink(f.name)
+    inference_executor.configure({'inference': {'asr': {'slots': 4}}})
+    asyncio.run(main(args))
+    inference_executor.shutdown()
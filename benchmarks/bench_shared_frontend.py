@@ -0,0 +1,148 @@
+"""
+共享前端 CPU 基准：30s / 5min 音频，独立计算 fbank（基线）与共享前端的单请求 CPU 耗时
+
+模块以桩对象代替，特征提取与 FireRedASR 的 KaldifeatFbank 相同（kaldi_native_fbank，80 维，dither=0），
+各模块 CMVN 参数不同；识别输出为桩，结果只反映前端（读音频 + fbank + CMVN）开销。
+
+用法：python benchmarks/bench_shared_frontend.py [--repeat 3]
+依赖：pip install kaldi_native_fbank
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.adapters import SharedFrontend  # noqa: E402
+from core.pipeline import TranscribePipeline, load_wav_int16  # noqa: E402
+
+
+class KaldifeatFbank:
+    def __init__(self):
+        import kaldi_native_fbank as knf
+        self._knf = knf
+        self.opts = knf.FbankOptions()
+        self.opts.frame_opts.dither = 0
+        self.opts.frame_opts.frame_shift_ms = 10
+        self.opts.frame_opts.frame_length_ms = 25
+        self.opts.frame_opts.samp_freq = 16000
+        self.opts.mel_opts.num_bins = 80
+
+    def __call__(self, wav, is_train=False):
+        sample_rate, samples = wav
+        fbank = self._knf.OnlineFbank(self.opts)
+        fbank.accept_waveform(sample_rate, samples.tolist())
+        fbank.input_finished()
+        if not fbank.num_frames_ready:
+            return np.zeros((0, 80), dtype=np.float32)
+        return np.vstack([fbank.get_frame(i) for i in range(fbank.num_frames_ready)])
+
+
+class FeatExtractor:
+    def __init__(self, seed):
+        rng = np.random.RandomState(seed)
+        self.fbank = KaldifeatFbank()
+        self.mean = rng.randn(80).astype(np.float32)
+        self.istd = np.abs(rng.randn(80)).astype(np.float32)
+
+    def __call__(self, wavs):
+        feats = []
+        for wav in wavs:
+            if isinstance(wav, str):
+                samples, sample_rate = load_wav_int16(wav)
+                wav = (sample_rate, samples)
+            feats.append((self.fbank(wav) - self.mean) * self.istd)
+        return feats
+
+
+class VAD:
+    """固定 4.57s 分段、0.44s 间隔"""
+
+    def __init__(self):
+        self.feat_extractor = FeatExtractor(1)
+
+    def detect(self, audio):
+        dur = len(self.feat_extractor([audio])[0]) / 100.0
+        timestamps, t = [], 0.13
+        while t + 4.57 < dur:
+            timestamps.append((round(t, 2), round(t + 4.57, 2)))
+            t += 5.01
+        return {'timestamps': timestamps}, None
+
+
+class LID:
+    def __init__(self):
+        self.feat_extractor = FeatExtractor(3)
+
+    def process(self, uttids, wavs):
+        self.feat_extractor(wavs)
+        return [{'lang': 'zh', 'confidence': 1.0} for _ in wavs]
+
+
+class ASR:
+    def __init__(self):
+        self.feat_extractor = FeatExtractor(2)
+
+    def transcribe(self, uttids, wavs):
+        return [{'text': f"{float(f.sum()):.2f}", 'confidence': 1.0} for f in self.feat_extractor(wavs)]
+
+
+def make_system(shared):
+    system = SimpleNamespace(
+        config=SimpleNamespace(asr_batch_size=8, punc_batch_size=8, enable_vad=True, enable_lid=True, enable_punc=False),
+        vad=VAD(), lid=LID(), asr=ASR(), punc=None,
+    )
+    if shared:
+        SharedFrontend.install(system)
+    return system
+
+
+def write_wav(seconds, directory):
+    samples = (np.random.RandomState(seconds).randn(16000 * seconds) * 3000).astype(np.int16)
+    path = os.path.join(directory, f"bench_{seconds}s.wav")
+    with wave.open(path, 'wb') as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(16000)
+        wav.writeframes(samples.tobytes())
+    return path
+
+
+def cpu_ms(system, path, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.process_time()
+        result = TranscribePipeline(system).process_batch([(path, 'bench')])[0]
+        times.append((time.process_time() - start) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    baseline, shared = make_system(False), make_system(True)
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'clip':>6} {'segments':>8} {'baseline_ms':>12} {'shared_ms':>10} {'saved':>8}  identical")
+        for seconds in (30, 300):
+            path = write_wav(seconds, directory)
+            base_ms, base_result = cpu_ms(baseline, path, args.repeat)
+            shared_ms, shared_result = cpu_ms(shared, path, args.repeat)
+            identical = [s['text'] for s in base_result['sentences']] == [s['text'] for s in shared_result['sentences']]
+            print(
+                f"{seconds:>5}s {len(base_result['sentences']):>8} {base_ms:>12.1f} {shared_ms:>10.1f} "
+                f"{(1 - shared_ms / base_ms) * 100:>7.1f}%  {identical}"
+            )
+    print(f"frontend: {shared.shared_frontend.get_status()}")
+
+
+if __name__ == '__main__':
+    main()
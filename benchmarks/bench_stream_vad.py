@@ -0,0 +1,113 @@
+"""
+流式 VAD 单帧延迟基准：N 个并发会话按 100ms 分块送入 PCM，统计每块 feed 的 p50/p99 延迟、
+单帧处理耗时（推理线程内，含特征、模型与端点判断）以及端点检测器本身的单帧耗时
+
+默认以能量检测器代替 FireRedStreamVad（只衡量会话、线程池与端点逻辑的开销）；
+指定 --model-dir 时加载真实流式 VAD 模型（需安装 fireredasr2s 与 torch）。
+
+用法：python benchmarks/bench_stream_vad.py [--sessions 1 50 200] [--seconds 5] [--model-dir DIR]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from core.adapters import StreamVADAdapter  # noqa: E402
+from core.inference_executor import inference_executor  # noqa: E402
+from core.stream_vad import SpeechEndpointer, StreamVadService  # noqa: E402
+
+SAMPLE_RATE = 16000
+CHUNK = SAMPLE_RATE // 10
+
+
+class EnergyDetector:
+    """按帧能量给出语音概率，与流式检测器一样缓存不足一帧的样本"""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self._rest = np.zeros(0, dtype=np.int16)
+
+    def detect_chunk(self, samples):
+        x = np.concatenate([self._rest, samples])
+        n = len(x) // 160
+        self._rest = x[n * 160:]
+        frames = x[:n * 160].reshape(n, 160).astype(np.float32)
+        energy = np.sqrt((frames ** 2).mean(axis=1)) / 32768
+        return [{'raw_prob': float(min(1.0, v * 20))} for v in energy]
+
+
+class EnergyAdapter(StreamVADAdapter):
+    def new_state(self):
+        return EnergyDetector()
+
+
+def make_audio():
+    """1s 静音 + 2s 正弦 + 1s 静音 + 0.5s 正弦，循环使用"""
+    t = np.arange(2 * SAMPLE_RATE) / SAMPLE_RATE
+    tone = (0.3 * 32767 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    silence = np.zeros(SAMPLE_RATE, dtype=np.int16)
+    return np.concatenate([silence, tone, silence, tone[:SAMPLE_RATE // 2]])
+
+
+async def bench(service, audio, sessions, seconds):
+    latencies = []
+
+    async def run(session):
+        for i in range(0, seconds * SAMPLE_RATE, CHUNK):
+            offset = i % (len(audio) - CHUNK)
+            start = time.perf_counter()
+            await session.feed(audio[offset:offset + CHUNK])
+            latencies.append(time.perf_counter() - start)
+
+    opened = [service.open_session() for _ in range(sessions)]
+    start = time.perf_counter()
+    await asyncio.gather(*(run(session) for session in opened))
+    wall = time.perf_counter() - start
+    for session in opened:
+        session.close()
+    latencies.sort()
+    frames = sessions * seconds * 1000 // StreamVADAdapter.FRAME_SHIFT_MS
+    print(
+        f"sessions={sessions:>4} chunks={len(latencies):>6} "
+        f"p50={latencies[len(latencies) // 2] * 1e3:.2f}ms p99={latencies[int(len(latencies) * 0.99)] * 1e3:.2f}ms "
+        f"wall={wall:.2f}s wall_per_frame={wall / frames * 1e6:.1f}us in_thread_frame={service.avg_frame_us:.1f}us"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 50, 200])
+    parser.add_argument('--seconds', type=int, default=5)
+    parser.add_argument('--slots', type=int, default=2, help="inference.vad_stream.slots")
+    parser.add_argument('--model-dir', default=None)
+    args = parser.parse_args()
+
+    inference_executor.configure({'inference': {'vad_stream': {'slots': args.slots}}})
+    service = StreamVadService()
+    service.max_connections = max(args.sessions)
+    if args.model_dir:
+        service._adapter = StreamVADAdapter(StreamVadService._load(args.model_dir, {}))
+    else:
+        service._adapter = EnergyAdapter(None)
+    audio = make_audio()
+    for sessions in args.sessions:
+        asyncio.run(bench(service, audio, sessions, args.seconds))
+
+    endpointer = SpeechEndpointer()
+    probs = list(np.random.RandomState(0).rand(100000))
+    start = time.perf_counter()
+    endpointer.push(probs)
+    print(f"endpointer={(time.perf_counter() - start) / len(probs) * 1e6:.2f}us/frame")
+    inference_executor.shutdown()
+
+
+if __name__ == '__main__':
+    main()
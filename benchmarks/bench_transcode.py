@@ -0,0 +1,122 @@
+"""
+转码基准：mp3 / m4a / opus 上传转为 16kHz mono PCM 的耗时
+- probe+transcode：先 ffprobe 取时长再 ffmpeg 转码（两次子进程，单次探测前的旧流程）
+- single-pass：ffmpeg 一次转码，-t 截断到时长上限，由输出时长判断是否超限（utils.audio_converter.transcode_to_wav）
+- pipe：音频字节经 stdin/stdout 管道解码，不落盘（utils.audio_converter.decode_to_pcm）
+- in-process：soundfile / PyAV 进程内解码（utils.audio_converter.decode_in_process，未安装时跳过）
+
+测试音频由 ffmpeg 生成；未安装 ffmpeg 或 ffmpeg-python 时直接退出。
+
+用法：python benchmarks/bench_transcode.py [--durations 5 30 300] [--repeat 5] [--max-duration 600]
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.audio_converter import (  # noqa: E402
+    decode_in_process,
+    decode_to_pcm,
+    get_audio_duration_ffprobe,
+    transcode_to_wav,
+)
+
+FORMATS = {
+    'mp3': ['-c:a', 'libmp3lame', '-b:a', '64k'],
+    'm4a': ['-c:a', 'aac', '-b:a', '64k'],
+    'opus': ['-c:a', 'libopus', '-b:a', '32k'],
+}
+
+
+def make_fixture(directory, fmt, seconds):
+    """44.1kHz 双声道的语音频段噪声 + 正弦，编码为目标格式"""
+    path = os.path.join(directory, f"bench_{seconds}s.{fmt}")
+    subprocess.run(
+        [
+            'ffmpeg', '-v', 'error', '-y',
+            '-f', 'lavfi', '-i', f"anoisesrc=d={seconds}:c=pink:r=44100:a=0.1",
+            '-f', 'lavfi', '-i', f"sine=f=220:d={seconds}:r=44100",
+            '-filter_complex', 'amix=inputs=2,aformat=channel_layouts=stereo',
+            *FORMATS[fmt], path,
+        ],
+        check=True,
+    )
+    return path
+
+
+def probe_then_transcode(path, max_duration):
+    if get_audio_duration_ffprobe(path) > max_duration:
+        raise ValueError("超过时长上限")
+    os.unlink(transcode_to_wav(path))
+
+
+def single_pass(path, max_duration):
+    os.unlink(transcode_to_wav(path, max_duration=max_duration + 1))
+
+
+def pipe(path, max_duration):
+    with open(path, 'rb') as f:
+        decode_to_pcm(f.read(), max_duration=max_duration + 1)
+
+
+def in_process(path, max_duration):
+    if decode_in_process(path, max_duration + 1) is None:
+        raise RuntimeError("进程内解码不可用")
+
+
+METHODS = {
+    'probe+transcode': probe_then_transcode,
+    'single-pass': single_pass,
+    'pipe': pipe,
+    'in-process': in_process,
+}
+
+
+def measure(method, path, max_duration, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        method(path, max_duration)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--durations', type=int, nargs='+', default=[5, 30, 300])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-duration', type=float, default=600)
+    args = parser.parse_args()
+    if not shutil.which('ffmpeg') or not shutil.which('ffprobe'):
+        print("未找到 ffmpeg / ffprobe，跳过转码基准")
+        return
+    try:
+        import ffmpeg  # noqa: F401
+    except ImportError:
+        print("未安装 ffmpeg-python，跳过转码基准")
+        return
+
+    with tempfile.TemporaryDirectory() as directory:
+        print(f"{'format':>6} {'clip':>6} " + " ".join(f"{name:>16}" for name in METHODS))
+        for fmt in FORMATS:
+            for seconds in args.durations:
+                path = make_fixture(directory, fmt, seconds)
+                cells = []
+                for name, method in METHODS.items():
+                    try:
+                        cells.append(f"{measure(method, path, args.max_duration, args.repeat):>14.1f}ms")
+                    except Exception as e:
+                        cells.append(f"{'n/a':>16}")
+                        print(f"  {fmt} {seconds}s {name}: {e}", file=sys.stderr)
+                print(f"{fmt:>6} {seconds:>5}s " + " ".join(cells))
+
+
+if __name__ == '__main__':
+    main()
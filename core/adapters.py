@@ -1,8 +1,14 @@
 """
 适配器层 - 将 FireRedAsr2System 内部模型封装为与 ASRModel/VADModel/LIDModel/PuncModel 相同的接口
+音频参数可以是 WAV 路径，也可以是内存中的 (sample_rate, samples)（processing.in_memory_decode）
+SharedFrontend 让 VAD/LID/ASR 共用同一份 fbank 特征（见 TranscribePipeline）
 """
 
-from typing import Dict, Any, List, Optional
+import threading
+from contextlib import contextmanager
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+import numpy as np
 
 from utils.logger import get_logger
 
@@ -10,23 +16,107 @@ logger = get_logger(__name__)
 
 
 class ASRAdapter:
-    """封装 FireRedAsr2.asr，暴露 transcribe 接口"""
+    """封装 FireRedAsr2.asr，暴露 transcribe / transcribe_batch 接口"""
 
     def __init__(self, asr_model: Any):
         self._model = asr_model
 
     def transcribe(self, audio_path: str, **kwargs) -> Dict[str, Any]:
         uttid = kwargs.get('uttid', 'tmp')
-        batch_uttid = [uttid]
-        batch_wav_path = [audio_path]
-        results = self._model.transcribe(batch_uttid, batch_wav_path)
-        result = results[0]
-        return {
-            'text': result.get('text', ''),
-            'confidence': result.get('confidence', 0.0),
-            'duration': result.get('dur_s', 0.0),
-            'timestamp': result.get('timestamp', [])
-        }
+        return self.transcribe_batch([audio_path], [uttid], beam_size=kwargs.get('beam_size'))[0]
+
+    def transcribe_batch(
+        self,
+        audio_paths: List[str],
+        uttids: Optional[List[str]] = None,
+        beam_size: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """单次调用底层 transcribe(batch_uttid, batch_wav_path) 完成整批识别"""
+        if uttids is None:
+            uttids = [f"utt_{i}" for i in range(len(audio_paths))]
+        if len(audio_paths) != len(uttids):
+            raise ValueError("audio_paths 和 uttids 长度不一致")
+        with beam_size_scope(self._model, beam_size):
+            results = self._model.transcribe(list(uttids), list(audio_paths))
+        return [
+            {
+                'text': result.get('text', ''),
+                'confidence': result.get('confidence', 0.0),
+                'duration': result.get('dur_s', 0.0),
+                'timestamp': result.get('timestamp', [])
+            }
+            for result in results
+        ]
+
+
+class _ReadWriteLock:
+    """读写锁：读者可并发，写者独占；有写者等待时新读者让行，避免写者饥饿"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._cond:
+            while self._writer or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+# beam_size 存放在模型共享的 config 上：所有读取它的解码持有共享锁，按请求覆盖时持有独占锁
+_beam_size_lock = _ReadWriteLock()
+
+
+@contextmanager
+def beam_size_scope(model: Any, beam_size: Optional[int] = None) -> Iterator[None]:
+    """
+    ASR 解码的 beam_size 作用域：未指定或与模型默认值相同时与其他默认解码并发执行，
+    否则独占模型，临时覆盖 config.beam_size，结束后恢复
+    """
+    model_config = getattr(model, 'config', None)
+    if model_config is None or not hasattr(model_config, 'beam_size'):
+        yield
+        return
+    # 共享锁下没有进行中的覆盖，读到的是模型默认值
+    with _beam_size_lock.shared():
+        default = model_config.beam_size
+    if not beam_size or beam_size == default:
+        with _beam_size_lock.shared():
+            yield
+        return
+    with _beam_size_lock.exclusive():
+        model_config.beam_size = beam_size
+        try:
+            yield
+        finally:
+            model_config.beam_size = default
 
 
 class VADAdapter:
@@ -47,6 +137,49 @@ class VADAdapter:
         return False
 
 
+class StreamVADAdapter:
+    """
+    封装 FireRedStreamVad（models.vad.stream_model_dir），暴露逐帧语音概率接口
+    流式检测器自身带有状态（特征缓存、模型缓存），每个连接通过 new_state() 获得独立副本，
+    副本共享模型权重（torch.nn.Module 不复制），仅复制状态对象
+    """
+
+    # 帧移 10ms（16kHz 下 160 个样本）
+    FRAME_SHIFT_MS = 10
+
+    def __init__(self, stream_vad: Any):
+        self._model = stream_vad
+
+    def new_state(self) -> Any:
+        import copy
+        import torch
+        detector = copy.copy(self._model)
+        for name, value in vars(self._model).items():
+            if isinstance(value, torch.nn.Module):
+                continue
+            try:
+                setattr(detector, name, copy.deepcopy(value))
+            except Exception:
+                # 不可复制的对象（如原生扩展的特征提取器配置）为无状态对象，直接共享
+                pass
+        if hasattr(detector, 'reset'):
+            detector.reset()
+        return detector
+
+    def frame_probs(self, state: Any, samples: Any) -> List[float]:
+        """送入一段 int16 样本，返回本段新产生的各帧语音概率（不足一帧的样本由检测器缓存到下一段）"""
+        return [_frame_prob(frame) for frame in state.detect_chunk(samples)]
+
+
+def _frame_prob(frame: Any) -> float:
+    """逐帧结果中的原始语音概率（未平滑，平滑与端点判断由 core.stream_vad 按配置执行）"""
+    for name in ('raw_prob', 'speech_prob', 'prob'):
+        value = frame.get(name) if isinstance(frame, dict) else getattr(frame, name, None)
+        if value is not None:
+            return float(value)
+    return float(frame)
+
+
 class LIDAdapter:
     """封装 FireRedAsr2System.lid，暴露 detect 接口"""
 
@@ -86,3 +219,204 @@ class PuncAdapter:
             }
             for r in results
         ]
+
+
+# Kaldi fbank 帧参数（16kHz：帧长 25ms、帧移 10ms，snip_edges）；安装时用探测信号验证各模块与之一致
+FBANK_FRAME_LENGTH = 400
+FBANK_FRAME_SHIFT = 160
+# 在模块自身及这些属性上查找 fbank 计算对象（FireRedASR 系列的特征提取器以 fbank 属性持有 Kaldi fbank）
+FBANK_OWNER_ATTRS = ('feat_extractor', 'audio_feat', 'feat', 'frontend')
+
+
+def _fbank_frames(num_samples: int) -> int:
+    if num_samples < FBANK_FRAME_LENGTH:
+        return 0
+    return 1 + (num_samples - FBANK_FRAME_LENGTH) // FBANK_FRAME_SHIFT
+
+
+def _view_offset(base: np.ndarray, wav: Any) -> Optional[int]:
+    """wav 是 base 的连续切片视图时返回其起始样本序号"""
+    if not isinstance(wav, np.ndarray) or wav.ndim != 1 or wav.dtype != base.dtype:
+        return None
+    if wav.strides != base.strides or not len(wav):
+        return None
+    delta = wav.__array_interface__['data'][0] - base.__array_interface__['data'][0]
+    if delta < 0 or delta % base.itemsize:
+        return None
+    offset = delta // base.itemsize
+    return offset if offset + len(wav) <= len(base) else None
+
+
+class FbankCache:
+    """一条音频的原始 fbank（CMVN 之前），VAD/LID/ASR 按分段的帧偏移切片"""
+
+    def __init__(self, samples: np.ndarray, sample_rate: int, feats: np.ndarray):
+        self.samples = samples
+        self.sample_rate = sample_rate
+        self.feats = feats
+
+    def lookup(self, wav: Any) -> Optional[np.ndarray]:
+        """
+        wav 是本条音频样本的视图时返回对应帧的特征切片。
+        模块复制过的样本不做内容匹配（相同长度、相同首尾的不同音频会取到错误特征），交由模块自行计算
+        """
+        offset = _view_offset(self.samples, wav)
+        # 起点不在帧边界上时切片与重新计算的帧不对齐，交由模块自行计算
+        if offset is None or offset % FBANK_FRAME_SHIFT:
+            return None
+        first, count = offset // FBANK_FRAME_SHIFT, _fbank_frames(len(wav))
+        if not count or first + count > len(self.feats):
+            return None
+        return self.feats[first:first + count].copy()
+
+
+class _SharedFbank:
+    """替换模块特征提取器的 fbank：命中当前线程激活的 FbankCache 时返回切片，否则调用原 fbank"""
+
+    def __init__(self, frontend: "SharedFrontend", fbank: Any):
+        self._frontend = frontend
+        self._fbank = fbank
+
+    def __call__(self, wav: Any, *args, **kwargs) -> Any:
+        if isinstance(wav, tuple) and len(wav) == 2 and not args and not kwargs.get('is_train'):
+            feats = self._frontend.lookup(wav[0], wav[1])
+            if feats is not None:
+                return feats
+        self._frontend.record(misses=1)
+        return self._fbank(wav, *args, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._fbank, name)
+
+
+class SharedFrontend:
+    """
+    共享前端：每条音频只计算一次 fbank，VAD/LID/ASR 的特征提取按帧偏移切片复用。
+    安装时在各模块上查找 fbank 计算对象，用探测信号验证：
+    - 帧数符合 25ms/10ms snip_edges 规则，且帧边界对齐的子段特征与整段特征切片一致；
+    - 与首个模块的输出一致（各模块的 CMVN 在 fbank 之后各自执行，不受影响）。
+    未通过验证的模块保持原样自行计算。
+    特征缓存只对调用 activate() 的线程可见（调用模块期间），并发请求之间互不可见。
+    """
+
+    def __init__(self, fbank: Any, modules: List[str]):
+        self._fbank = fbank
+        self.modules = modules
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.active = 0
+        self.hits = 0
+        self.misses = 0
+        self.computed_frames = 0
+        self.reused_frames = 0
+
+    @classmethod
+    def install(cls, asr_system: Any) -> Optional["SharedFrontend"]:
+        """在 asr_system 的 vad/lid/asr 上安装共享 fbank，成功时设置 asr_system.shared_frontend 并返回"""
+        probe = (np.random.RandomState(0).randn(2 * 16000) * 3000).astype(np.int16)
+        reference = None
+        found: List[Tuple[str, Any, Any]] = []
+        for name in ('vad', 'lid', 'asr'):
+            owner = _find_fbank_owner(getattr(asr_system, name, None))
+            if owner is None:
+                continue
+            fbank = owner.fbank
+            if isinstance(fbank, _SharedFbank):
+                fbank = fbank._fbank
+            try:
+                feats = _probe_fbank(fbank, probe)
+            except Exception as e:
+                logger.info(f"共享前端：{name} 的 fbank 探测失败，保持独立计算: {e}")
+                continue
+            if feats is None:
+                logger.info(f"共享前端：{name} 的 fbank 帧参数不符合，保持独立计算")
+                continue
+            if reference is None:
+                reference = feats
+            elif reference.shape != feats.shape or not np.allclose(reference, feats, rtol=1e-5, atol=1e-4):
+                logger.info(f"共享前端：{name} 的 fbank 配置与其他模块不同，保持独立计算")
+                continue
+            found.append((name, owner, fbank))
+        if not found:
+            logger.info("共享前端：未找到可共享的 fbank，各模块独立计算特征")
+            return None
+        frontend = cls(found[0][2], [name for name, _, _ in found])
+        for _, owner, fbank in found:
+            owner.fbank = _SharedFbank(frontend, fbank)
+        asr_system.shared_frontend = frontend
+        logger.info(f"共享前端已安装: modules={frontend.modules}")
+        return frontend
+
+    def compute(self, samples: np.ndarray, sample_rate: int) -> Optional[FbankCache]:
+        """计算整段音频的 fbank；音频短于一帧时返回 None"""
+        if _fbank_frames(len(samples)) == 0:
+            return None
+        feats = self._fbank((sample_rate, samples))
+        self.record(computed_frames=len(feats))
+        return FbankCache(samples, sample_rate, feats)
+
+    @contextmanager
+    def activate(self, caches: List[Optional[FbankCache]]) -> Iterator[None]:
+        """在当前线程内（调用 VAD/LID/ASR 期间）使 caches 可被各模块的 fbank 查找"""
+        caches = [cache for cache in caches if cache is not None]
+        previous = getattr(self._local, 'caches', ())
+        self._local.caches = tuple(previous) + tuple(caches)
+        with self._lock:
+            self.active += len(caches)
+        try:
+            yield
+        finally:
+            self._local.caches = previous
+            with self._lock:
+                self.active -= len(caches)
+
+    def lookup(self, sample_rate: int, wav: Any) -> Optional[np.ndarray]:
+        for cache in getattr(self._local, 'caches', ()):
+            if cache.sample_rate != sample_rate:
+                continue
+            feats = cache.lookup(wav)
+            if feats is not None:
+                self.record(hits=1, reused_frames=len(feats))
+                return feats
+        return None
+
+    def record(self, hits: int = 0, misses: int = 0, computed_frames: int = 0, reused_frames: int = 0) -> None:
+        with self._lock:
+            self.hits += hits
+            self.misses += misses
+            self.computed_frames += computed_frames
+            self.reused_frames += reused_frames
+
+    def get_status(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "modules": self.modules,
+                "active": self.active,
+                "hits": self.hits,
+                "misses": self.misses,
+                "computed_frames": self.computed_frames,
+                "reused_frames": self.reused_frames,
+            }
+
+
+def _find_fbank_owner(module: Any) -> Optional[Any]:
+    if module is None:
+        return None
+    for owner in [module] + [getattr(module, attr, None) for attr in FBANK_OWNER_ATTRS]:
+        if owner is not None and callable(getattr(owner, 'fbank', None)):
+            return owner
+    return None
+
+
+def _probe_fbank(fbank: Any, probe: np.ndarray) -> Optional[np.ndarray]:
+    """验证帧数规则与切片一致性，返回整段探测信号的特征；不符合时返回 None"""
+    full = fbank((16000, probe))
+    if not isinstance(full, np.ndarray) or full.ndim != 2 or len(full) != _fbank_frames(len(probe)):
+        return None
+    for start, n in ((37 * FBANK_FRAME_SHIFT, 9999), (3 * FBANK_FRAME_SHIFT, 4000)):
+        part = np.asarray(fbank((16000, probe[start:start + n])))
+        first = start // FBANK_FRAME_SHIFT
+        expected = full[first:first + _fbank_frames(n)]
+        if part.shape != expected.shape or not np.allclose(part, expected, rtol=1e-5, atol=1e-4):
+            return None
+    return full
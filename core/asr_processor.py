@@ -1,11 +1,12 @@
 """ASR 批量转录处理器"""
 
-import os
+import asyncio
 import time
 from fastapi import UploadFile
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from core.inference_executor import inference_executor
 from utils.logger import get_logger
-from utils.audio_validator import prepare_audio_for_asr
+from utils.audio_validator import load_audio_for_inference, release_audio
 from utils.config_loader import get_config
 from utils.response_builder import error_response
 
@@ -22,42 +23,76 @@ class ASRProcessor:
         self,
         audio_files: List[UploadFile],
         uttids: List[str] = None,
-        beam_size: int = 3,
+        beam_size: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """批量语音识别"""
-        results = []
+        """
+        批量语音识别
+        各文件并行转码（不阻塞事件循环），随后按时长排序、以 models.asr.batch_size 为批大小
+        调用底层 transcribe(batch_uttid, batch_wav_path)。beam_size 为 None 时使用模型配置。
+        """
         total_start = time.time()
         asr_model = self.model_manager.get_model('asr')
-        
+
         if not asr_model:
             return error_response(500, "ASR 模型未加载")
-        
-        for idx, file in enumerate(audio_files):
-            wav_path = None
-            try:
-                audio_info, wav_path = prepare_audio_for_asr(file, self.config)
-                start = time.time()
-                result = asr_model.transcribe(
-                    wav_path,
-                    beam_size=beam_size,
-                )
-                results.append({
-                    'uttid': uttids[idx] if uttids else f'utt_{idx}',
-                    'text': result.get('text', ''),
-                    'processing_time_ms': int((time.time() - start) * 1000),
-                    'audio_info': audio_info
-                })
-            except Exception as e:
-                logger.error(f"转录失败 {file.filename}: {e}")
-                results.append({'error': str(e), 'uttid': uttids[idx] if uttids else f'utt_{idx}'})
-            finally:
-                if wav_path and os.path.exists(wav_path):
+
+        names = [uttids[idx] if uttids else f'utt_{idx}' for idx in range(len(audio_files))]
+        results: List[Optional[Dict[str, Any]]] = [None] * len(audio_files)
+
+        inference_executor.check_capacity('asr')
+        prepared = await asyncio.gather(
+            *[asyncio.to_thread(load_audio_for_inference, file, self.config) for file in audio_files],
+            return_exceptions=True,
+        )
+        try:
+            ready = []
+            for idx, (file, item) in enumerate(zip(audio_files, prepared)):
+                if isinstance(item, Exception):
+                    logger.error(f"转录失败 {file.filename}: {item}")
+                    results[idx] = {'error': str(item), 'uttid': names[idx]}
+                else:
+                    ready.append(idx)
+
+            # 按时长排序，减少批内 padding
+            ready.sort(key=lambda i: prepared[i][0]['duration'])
+            # 转码不占用 asr 槽位，全部解码完成后再进入推理队列
+            async with inference_executor.slot('asr'):
+                batch_size = self._batch_size()
+                for b in range(0, len(ready), batch_size):
+                    batch = ready[b:b + batch_size]
+                    start = time.time()
                     try:
-                        os.unlink(wav_path)
-                    except OSError:
-                        pass
-        
+                        outputs = await inference_executor.run(
+                            'asr',
+                            asr_model.transcribe_batch,
+                            [prepared[i][1] for i in batch],
+                            uttids=[names[i] for i in batch],
+                            beam_size=beam_size,
+                        )
+                    except Exception as e:
+                        logger.error(f"批量转录失败 {[names[i] for i in batch]}: {e}")
+                        for i in batch:
+                            results[i] = {'error': str(e), 'uttid': names[i]}
+                        continue
+                    elapsed_ms = int((time.time() - start) * 1000)
+                    for i, output in zip(batch, outputs):
+                        results[i] = {
+                            'uttid': names[i],
+                            'text': output.get('text', ''),
+                            'processing_time_ms': elapsed_ms,
+                            'audio_info': prepared[i][0]
+                        }
+        finally:
+            for item in prepared:
+                if not isinstance(item, Exception):
+                    release_audio(item[1])
+
         return {
             'results': results,
             'total_processing_time_ms': int((time.time() - total_start) * 1000)
         }
+
+    def _batch_size(self) -> int:
+        """ASR 批大小，取自 config.yaml 的 models.asr.batch_size"""
+        asr_cfg = (self.config.get('models') or {}).get('asr') or {}
+        return max(1, int(asr_cfg.get('batch_size', 1) or 1))
@@ -26,6 +26,7 @@ def summarize_models_config(models_config: Dict[str, Any]) -> Dict[str, Any]:
             "use_gpu": asr_cfg.get("use_gpu", True),
             "use_half": asr_cfg.get("use_half", False),
             "beam_size": asr_cfg.get("beam_size", 5),
+            "batch_size": asr_cfg.get("batch_size", 1),
         },
         "vad": {
             "enabled": vad_cfg.get("enabled", True),
@@ -43,6 +44,7 @@ def summarize_models_config(models_config: Dict[str, Any]) -> Dict[str, Any]:
             "enabled": punc_cfg.get("enabled", True),
             "model_dir": punc_cfg.get("model_dir", "pretrained_models/FireRedPunc"),
             "use_gpu": punc_cfg.get("use_gpu", True),
+            "batch_size": punc_cfg.get("batch_size", 1),
         },
     }
 
@@ -65,6 +67,8 @@ def summarize_asr_system_config(config: "FireRedAsr2SystemConfig") -> Dict[str,
         "lid_use_gpu": config.lid_config.use_gpu,
         "lid_use_half": config.lid_config.use_half,
         "punc_use_gpu": config.punc_config.use_gpu,
+        "asr_batch_size": config.asr_batch_size,
+        "punc_batch_size": config.punc_batch_size,
     }
 
 
@@ -134,8 +138,8 @@ def build_asr_system_config(models_config: Dict[str, Any]) -> "FireRedAsr2System
         lid_config=lid_config,
         asr_config=asr_config,
         punc_config=punc_config,
-        asr_batch_size=1,
-        punc_batch_size=1,
+        asr_batch_size=_get(asr_cfg, "batch_size", 1),
+        punc_batch_size=_get(punc_cfg, "batch_size", 1),
         enable_vad=_get(vad_cfg, "enabled", True),
         enable_lid=_get(lid_cfg, "enabled", True),
         enable_punc=_get(punc_cfg, "enabled", True),
@@ -153,4 +157,7 @@ def create_asr_system(models_config: Dict[str, Any]) -> "FireRedAsr2System":
     logger.info("正在创建 FireRedAsr2System，构建后的配置摘要: %s", summarize_asr_system_config(config))
     system = FireRedAsr2System(config)
     logger.info("FireRedAsr2System 创建完成")
+    if models_config.get("shared_frontend", False):
+        from core.adapters import SharedFrontend
+        SharedFrontend.install(system)
     return system
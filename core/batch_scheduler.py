@@ -0,0 +1,281 @@
+"""
+动态微批调度器 - 在时间窗口内收集并发请求，合并为一次批量推理
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from core.inference_executor import inference_executor
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 未指定时同时在途的批次数
+DEFAULT_CONCURRENT_BATCHES = 2
+
+
+class MicroBatchScheduler:
+    """
+    通用微批调度器
+    收集到 max_batch_size 个请求或等待超过 max_wait_ms 后，将整批交给 handler 处理。
+    handler 在线程中运行（指定 executor_module 时使用推理执行器的对应模块线程池），
+    返回与输入一一对应的结果列表；某项结果为 Exception 时仅该请求失败。
+    同时在途的批次数不超过 max_concurrent_batches（默认为 executor_module 线程池的槽位数，未指定模块时为 2），
+    前一批推理期间到达的请求在下一批中合并。
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 10,
+        name: str = "batch",
+        executor_module: Optional[str] = None,
+        max_concurrent_batches: Optional[int] = None,
+    ):
+        self._handler = handler
+        self.max_batch_size = max(1, int(max_batch_size))
+        self.max_wait_ms = max(0.0, float(max_wait_ms))
+        self.name = name
+        self.executor_module = executor_module
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._max_concurrent = max_concurrent_batches
+        self._batch_slots: Optional[asyncio.Semaphore] = None
+        self._inflight: Set[asyncio.Task] = set()
+        self.batches = 0
+        self.items = 0
+
+    async def start(self) -> None:
+        """启动后台收集协程"""
+        if self._task is not None:
+            return
+        concurrent = self._max_concurrent
+        if not concurrent:
+            concurrent = inference_executor.slots(self.executor_module) if self.executor_module else DEFAULT_CONCURRENT_BATCHES
+        self._queue = asyncio.Queue()
+        self._batch_slots = asyncio.Semaphore(max(1, int(concurrent)))
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"微批调度器已启动: name={self.name}, max_batch_size={self.max_batch_size}, "
+            f"max_wait_ms={self.max_wait_ms}, max_concurrent_batches={concurrent}"
+        )
+
+    async def stop(self) -> None:
+        """停止调度器：等待在途批次完成，队列中未处理的请求以异常结束"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight, return_exceptions=True)
+        while self._queue and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("调度器已停止"))
+
+    async def submit(self, item: Any) -> Any:
+        """提交单个请求并等待其结果"""
+        if self._task is None:
+            raise RuntimeError("调度器未启动")
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((item, future))
+        return await future
+
+    def get_status(self) -> Dict[str, Any]:
+        """调度器运行统计"""
+        return {
+            "pending": self._queue.qsize() if self._queue else 0,
+            "inflight_batches": len(self._inflight),
+            "batches": self.batches,
+            "items": self.items,
+            "avg_batch_size": round(self.items / self.batches, 2) if self.batches else 0.0,
+        }
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            # 在途批次已满时暂停收集，期间到达的请求留在队列中合并为下一批
+            await self._batch_slots.acquire()
+            batch: List[Tuple[Any, asyncio.Future]] = []
+            try:
+                batch.append(await self._queue.get())
+                deadline = loop.time() + self.max_wait_ms / 1000.0
+                while len(batch) < self.max_batch_size:
+                    # 上一批推理期间已排队的请求直接并入，不再等待窗口
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+                    timeout = deadline - loop.time()
+                    if timeout <= 0:
+                        break
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                    except asyncio.TimeoutError:
+                        break
+            except asyncio.CancelledError:
+                # 已取出的请求放回队列，由 stop() 统一以异常结束
+                for entry in batch:
+                    self._queue.put_nowait(entry)
+                self._batch_slots.release()
+                raise
+            task = asyncio.create_task(self._dispatch(batch))
+            self._inflight.add(task)
+            task.add_done_callback(self._inflight.discard)
+
+    async def _dispatch(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        try:
+            await self._process(batch)
+        finally:
+            self._batch_slots.release()
+            # 处理过程中异常退出（含取消）时，未完成的请求不能一直挂起
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(RuntimeError("批量推理未返回结果"))
+
+    async def _process(self, batch: List[Tuple[Any, asyncio.Future]]) -> None:
+        # 等待期间已被取消的请求（客户端断开、超过截止时间）直接丢弃，不占用推理
+        batch = [(item, future) for item, future in batch if not future.done()]
+        if not batch:
+            return
+        items = [item for item, _ in batch]
+        self.batches += 1
+        self.items += len(items)
+        try:
+            if self.executor_module:
+                results = await inference_executor.run(self.executor_module, self._handler, items)
+            else:
+                results = await asyncio.to_thread(self._handler, items)
+        except Exception as e:
+            logger.error(f"批量推理失败: name={self.name}, size={len(items)}, error={e}")
+            results = [e] * len(items)
+        if len(results) != len(items):
+            logger.error(
+                f"批量推理结果数与请求数不一致: name={self.name}, size={len(items)}, results={len(results)}"
+            )
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+        for _, future in batch[len(results):]:
+            if not future.done():
+                future.set_exception(RuntimeError("批量推理结果缺失"))
+
+
+class TranscribeBatchHandler:
+    """FireRedAsr2System 一站式识别的批处理函数，按调用时的 asr_system 执行（兼容热重载）"""
+
+    def __init__(self, get_asr_system: Callable[[], Any]):
+        self._get_asr_system = get_asr_system
+
+    def __call__(self, items: List[Tuple[Any, str]]) -> List[Any]:
+        from core.pipeline import TranscribePipeline, transcribe_audio
+
+        asr_system = self._get_asr_system()
+        if not asr_system:
+            raise RuntimeError("ASR System 未加载")
+        if len(items) == 1:
+            audio, uttid = items[0]
+            return [transcribe_audio(asr_system, audio, uttid)]
+        try:
+            return TranscribePipeline(asr_system).process_batch(items)
+        except Exception as e:
+            # 批量路径失败时逐条回退，保证每个请求拿到各自的结果或错误
+            logger.warning(f"批量识别失败，回退逐条处理: size={len(items)}, error={e}")
+            results = []
+            for audio, uttid in items:
+                try:
+                    results.append(transcribe_audio(asr_system, audio, uttid))
+                except Exception as ex:
+                    results.append(ex)
+            return results
+
+
+def create_transcribe_scheduler(
+    config: Dict[str, Any],
+    get_asr_system: Callable[[], Any],
+) -> Optional[MicroBatchScheduler]:
+    """根据 config.yaml 的 batching 节创建一站式识别调度器，未启用时返回 None"""
+    batching_cfg = config.get("batching") or {}
+    if not batching_cfg.get("enabled", False):
+        return None
+    return MicroBatchScheduler(
+        handler=TranscribeBatchHandler(get_asr_system),
+        max_batch_size=batching_cfg.get("max_batch_size", 8),
+        max_wait_ms=batching_cfg.get("max_wait_ms", 10),
+        name="transcribe",
+        max_concurrent_batches=batching_cfg.get("max_concurrent_batches"),
+        executor_module="asr",
+    )
+
+
+class SegmentBatchHandler:
+    """
+    已切分语音段的批处理函数（流式识别）：跳过 VAD，直接批量 ASR（及 LID），
+    对要求标点的分段批量加标点。items 为 [(audio, uttid, punc), ...]，返回 [{'asr', 'lid', 'punc'}, ...]
+    """
+
+    def __init__(self, get_asr_system: Callable[[], Any]):
+        self._get_asr_system = get_asr_system
+
+    def __call__(self, items: List[Tuple[Any, str, bool]]) -> List[Any]:
+        from core.pipeline import TranscribePipeline
+
+        asr_system = self._get_asr_system()
+        if not asr_system:
+            raise RuntimeError("ASR System 未加载")
+        pipeline = TranscribePipeline(asr_system)
+        try:
+            return self._process(pipeline, items)
+        except Exception as e:
+            logger.warning(f"分段批量识别失败，回退逐条处理: size={len(items)}, error={e}")
+            results = []
+            for item in items:
+                try:
+                    results.extend(self._process(pipeline, [item]))
+                except Exception as ex:
+                    results.append(ex)
+            return results
+
+    @staticmethod
+    def _process(pipeline: Any, items: List[Tuple[Any, str, bool]]) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = [{} for _ in items]
+        # 按时长排序后分批，减少批内 padding
+        order = sorted(range(len(items)), key=lambda i: len(items[i][0][1]))
+        for b in range(0, len(order), pipeline.asr_batch_size):
+            batch_idx = order[b:b + pipeline.asr_batch_size]
+            decoded = pipeline.decode_segments([items[i][1] for i in batch_idx], [items[i][0] for i in batch_idx])
+            for i, r in zip(batch_idx, decoded):
+                results[i] = r
+        punc_idx = [i for i, item in enumerate(items) if item[2]]
+        if pipeline.enable_punc and punc_idx:
+            punc_results = [results[i] for i in punc_idx]
+            pipeline.punctuate(punc_results, [items[i][1] for i in punc_idx])
+        return results
+
+
+def create_segment_scheduler(
+    config: Dict[str, Any],
+    get_asr_system: Callable[[], Any],
+) -> Optional[MicroBatchScheduler]:
+    """
+    根据 config.yaml 的 stream_asr 节创建流式识别分段调度器（/system/transcribe/stream），
+    所有连接的语音段在同一时间窗口内合并为批量推理；未启用时返回 None
+    """
+    stream_cfg = config.get("stream_asr") or {}
+    if not stream_cfg.get("enabled", True):
+        return None
+    return MicroBatchScheduler(
+        handler=SegmentBatchHandler(get_asr_system),
+        max_batch_size=stream_cfg.get("max_batch_size", 8),
+        max_wait_ms=stream_cfg.get("max_wait_ms", 20),
+        name="stream_segments",
+        executor_module="asr",
+    )
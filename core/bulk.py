@@ -0,0 +1,194 @@
+"""
+批量清单任务 - 识别服务器本地（白名单目录下）的一批音频
+清单为 JSONL，每行 {"path": "...", "uttid": "..."}（uttid 可选）。
+执行时以有界预读窗口逐条读取音频并送入一站式识别（启用 batching 时由微批调度器合并），
+结果按清单顺序逐行写入 JSONL 结果文件，可在执行过程中分页读取。
+"""
+
+import asyncio
+import itertools
+import json
+import os
+from collections import deque
+from typing import Any, BinaryIO, Callable, Deque, Dict, List, Optional, TextIO, Tuple
+
+from utils.error_codes import ErrorCode
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_ITEMS = 100000
+DEFAULT_READ_AHEAD = 8
+DEFAULT_RESULTS_DIR = "data/bulk"
+
+
+def bulk_config(config: Dict[str, Any]) -> Dict[str, Any]:
+    """config.yaml 的 bulk 节（补齐默认值）"""
+    bulk_cfg = config.get("bulk") or {}
+    return {
+        "root": bulk_cfg.get("root") or "",
+        "max_items": int(bulk_cfg.get("max_items", DEFAULT_MAX_ITEMS)),
+        "read_ahead": max(1, int(bulk_cfg.get("read_ahead", DEFAULT_READ_AHEAD))),
+        "results_dir": bulk_cfg.get("results_dir") or DEFAULT_RESULTS_DIR,
+    }
+
+
+def results_path(config: Dict[str, Any], job_id: str) -> str:
+    """批量任务结果文件路径"""
+    return os.path.join(bulk_config(config)["results_dir"], f"{job_id}.jsonl")
+
+
+def _invalid(message: str) -> ValueError:
+    error = ValueError(message)
+    error.error_code = ErrorCode.INVALID_PARAMS
+    return error
+
+
+def resolve_path(root: str, path: str) -> str:
+    """将清单中的路径解析为绝对路径（相对路径基于 root），解析符号链接后必须仍位于 root 之下"""
+    real_root = os.path.realpath(root)
+    real_path = os.path.realpath(os.path.join(real_root, path))
+    if os.path.commonpath([real_root, real_path]) != real_root:
+        raise _invalid(f"路径不在允许的目录下: {path}")
+    return real_path
+
+
+def parse_manifest(src: BinaryIO, dst: BinaryIO, root: str, max_items: int) -> int:
+    """
+    逐行校验清单并将规范化后的条目写入 dst（同步，供线程中调用）
+    Returns:
+        条目数
+    Raises:
+        ValueError（error_code=INVALID_PARAMS），消息中包含出错行号
+    """
+    count = 0
+    for line_no, raw in enumerate(src, start=1):
+        line = raw.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            raise _invalid(f"清单第 {line_no} 行不是合法的 JSON")
+        if not isinstance(entry, dict) or not isinstance(entry.get("path"), str) or not entry["path"]:
+            raise _invalid(f"清单第 {line_no} 行缺少 path")
+        uttid = entry.get("uttid")
+        if uttid is not None and not isinstance(uttid, str):
+            raise _invalid(f"清单第 {line_no} 行 uttid 必须为字符串")
+        try:
+            path = resolve_path(root, entry["path"])
+        except ValueError as e:
+            raise _invalid(f"清单第 {line_no} 行: {e}")
+        count += 1
+        if count > max_items:
+            raise _invalid(f"清单条目数超过上限 {max_items}")
+        record = {"path": path, "uttid": uttid or os.path.splitext(os.path.basename(path))[0]}
+        dst.write((json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8"))
+    if count == 0:
+        raise _invalid("清单为空")
+    return count
+
+
+def read_entries(manifest: TextIO, count: int) -> List[Dict[str, Any]]:
+    """从已打开的规范化清单中读取至多 count 条（同步，供线程中调用）"""
+    return [json.loads(line) for line in itertools.islice(manifest, count) if line.strip()]
+
+
+def _write_records(out: TextIO, records: List[Dict[str, Any]]) -> None:
+    out.write("".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records))
+    out.flush()
+
+
+def _close_all(*files: Any) -> None:
+    for f in files:
+        if f is not None:
+            f.close()
+
+
+def read_results(path: str, offset: int, limit: int) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+    """读取结果文件的一页，返回 (条目列表, 下一页 offset；已无更多已写入结果时为 None)"""
+    if not os.path.exists(path):
+        return [], None
+    with open(path, "r", encoding="utf-8") as f:
+        lines = list(itertools.islice(f, offset, offset + limit + 1))
+    # 执行中的任务最后一行可能尚未写完整
+    items = [json.loads(line) for line in lines[:limit] if line.endswith("\n")]
+    next_offset = offset + len(items) if len(lines) > limit else None
+    return items, next_offset
+
+
+class BulkTranscriber:
+    """按清单顺序识别，预读窗口内最多 read_ahead 条同时在处理中"""
+
+    def __init__(self, processor: Any, asr_system: Any, scheduler: Any = None, read_ahead: int = DEFAULT_READ_AHEAD):
+        self._processor = processor
+        self._asr_system = asr_system
+        self._scheduler = scheduler
+        self.read_ahead = max(1, int(read_ahead))
+
+    async def run(
+        self,
+        manifest_path: str,
+        output_path: str,
+        total: int,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """执行整个清单，返回汇总 {'total', 'succeeded', 'failed'}"""
+        progress = {"items_done": 0, "items_total": total, "failed": 0}
+        window: Deque[asyncio.Task] = deque()
+        manifest = out = None
+        try:
+            # 清单读取与结果写入均在线程中分批进行，不阻塞事件循环
+            await asyncio.to_thread(os.makedirs, os.path.dirname(os.path.abspath(output_path)), exist_ok=True)
+            manifest = await asyncio.to_thread(open, manifest_path, "r", encoding="utf-8")
+            out = await asyncio.to_thread(open, output_path, "w", encoding="utf-8")
+            index = 0
+            while True:
+                entries = await asyncio.to_thread(read_entries, manifest, self.read_ahead)
+                if not entries:
+                    break
+                for entry in entries:
+                    window.append(asyncio.create_task(self._transcribe_one(index, entry)))
+                    index += 1
+                    if len(window) >= self.read_ahead:
+                        await self._write_ready(window, out, progress, on_progress)
+            while window:
+                await self._write_ready(window, out, progress, on_progress)
+        finally:
+            for task in window:
+                task.cancel()
+            await asyncio.to_thread(_close_all, manifest, out)
+        return {
+            "total": total,
+            "succeeded": progress["items_done"] - progress["failed"],
+            "failed": progress["failed"],
+        }
+
+    async def _transcribe_one(self, index: int, entry: Dict[str, Any]) -> Dict[str, Any]:
+        record = {"index": index, "path": entry["path"], "uttid": entry["uttid"]}
+        try:
+            record["result"] = await self._processor.transcribe_local_file(
+                entry["path"], self._asr_system, uttid=entry["uttid"], scheduler=self._scheduler,
+            )
+        except Exception as e:
+            logger.warning(f"批量任务条目失败: index={index}, path={entry['path']}, error={e}")
+            record["error"] = str(e)
+        return record
+
+    @staticmethod
+    async def _write_ready(
+        window: Deque[asyncio.Task],
+        out: TextIO,
+        progress: Dict[str, Any],
+        on_progress: Optional[Callable[[Dict[str, Any]], None]],
+    ) -> None:
+        """等待最早的条目完成，连同其后已完成的条目按清单顺序一次写入结果文件"""
+        await asyncio.wait([window[0]])
+        records = []
+        while window and window[0].done():
+            records.append(window.popleft().result())
+        await asyncio.to_thread(_write_records, out, records)
+        progress["items_done"] += len(records)
+        progress["failed"] += sum(1 for record in records if "error" in record)
+        if on_progress:
+            on_progress(dict(progress))
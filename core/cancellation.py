@@ -0,0 +1,88 @@
+"""
+请求取消与截止时间
+- 同步请求：识别协程作为独立任务运行，期间定期检测客户端是否断开，断开或超过 deadline_ms 时取消该任务
+- 取消会沿 await 链传递：尚未开始执行的推理（线程池队列、微批调度器中的请求）直接丢弃，
+  已在线程中执行的推理无法中断，完成后结果被丢弃；长音频任务在下一批分段处停止
+- cancel_stats 统计取消/过期次数，见 /admin/status 的 cancellation 字段
+"""
+
+import asyncio
+from typing import Any, Awaitable, Dict, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+# 同步请求检测客户端断开的间隔（秒）
+DISCONNECT_POLL_S = 0.5
+
+
+class ClientDisconnected(Exception):
+    """客户端已断开连接"""
+
+
+class DeadlineExceeded(Exception):
+    """超过请求截止时间"""
+
+
+class CancellationStats:
+    """取消与过期计数"""
+
+    def __init__(self):
+        self.cancelled: Dict[str, int] = {"client_disconnect": 0, "jobs": 0}
+        self.expired: Dict[str, int] = {"sync": 0, "jobs": 0}
+        # 被取消/过期的任务中：尚未开始即丢弃的数量，与执行中被中断的数量
+        self.dropped_queued = 0
+        self.interrupted = 0
+
+    def record_cancelled(self, source: str) -> None:
+        self.cancelled[source] = self.cancelled.get(source, 0) + 1
+
+    def record_expired(self, source: str) -> None:
+        self.expired[source] = self.expired.get(source, 0) + 1
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "cancelled": dict(self.cancelled),
+            "expired": dict(self.expired),
+            "dropped_queued": self.dropped_queued,
+            "interrupted": self.interrupted,
+        }
+
+
+async def run_cancellable(
+    coro: Awaitable[Any],
+    request: Optional[Any] = None,
+    deadline_ms: Optional[int] = None,
+) -> Any:
+    """
+    运行识别协程，客户端断开（request.is_disconnected）或超过 deadline_ms 时取消
+    Raises:
+        ClientDisconnected / DeadlineExceeded
+    """
+    task = asyncio.ensure_future(coro)
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + deadline_ms / 1000.0 if deadline_ms else None
+    try:
+        while True:
+            timeout = DISCONNECT_POLL_S if request is not None else None
+            if deadline is not None:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    cancel_stats.record_expired("sync")
+                    raise DeadlineExceeded(f"超过截止时间 {deadline_ms}ms")
+                timeout = remaining if timeout is None else min(timeout, remaining)
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                return task.result()
+            if request is not None and await request.is_disconnected():
+                cancel_stats.record_cancelled("client_disconnect")
+                logger.info("客户端已断开，取消识别")
+                raise ClientDisconnected("客户端已断开连接")
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+# 全局单例
+cancel_stats = CancellationStats()
@@ -0,0 +1,169 @@
+"""
+推理执行器 - 按模块（asr/vad/lid/punc，及流式 VAD 的 vad_stream）划分的专用线程池
+每个模块有固定的推理槽位和有界等待队列，队列满时快速拒绝（429 + Retry-After）
+"""
+
+import asyncio
+import functools
+import math
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, Callable, Dict
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+MODULES = ("asr", "vad", "lid", "punc", "vad_stream")
+
+# 默认槽位与等待队列长度
+DEFAULT_SLOTS = 1
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_RETRY_AFTER_S = 1
+
+
+class ExecutorBusyError(RuntimeError):
+    """推理队列已满（status_code=429）或执行器不可用（status_code=503）"""
+
+    def __init__(self, module: str, retry_after: int, status_code: int = 429):
+        reason = "推理队列已满" if status_code == 429 else "推理服务不可用"
+        super().__init__(f"{module} {reason}，请 {retry_after}s 后重试")
+        self.module = module
+        self.retry_after = retry_after
+        self.status_code = status_code
+
+
+class _ModuleLane:
+    """单个模块的线程池与计数"""
+
+    def __init__(self, module: str, slots: int, max_queue: int):
+        self.module = module
+        self.slots = max(1, int(slots))
+        self.max_queue = max(0, int(max_queue))
+        self.pool = ThreadPoolExecutor(max_workers=self.slots, thread_name_prefix=f"infer-{module}")
+        self.inflight = 0  # 已接纳的请求数（排队 + 执行中），仅在事件循环线程修改
+        self.running = 0   # 正在线程中执行的任务数
+        self.rejected = 0
+        self.completed = 0
+        self.avg_latency_s = 0.0  # 单次执行耗时的指数滑动平均
+        self._lock = threading.Lock()
+
+    def execute(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.running += 1
+        start = time.time()
+        try:
+            return fn()
+        finally:
+            elapsed = time.time() - start
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self.avg_latency_s = elapsed if self.completed == 1 else 0.8 * self.avg_latency_s + 0.2 * elapsed
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "slots": self.slots,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queue_depth": max(0, self.inflight - self.running),
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "avg_latency_ms": int(self.avg_latency_s * 1000),
+        }
+
+
+class InferenceExecutor:
+    """按模块隔离的推理执行器"""
+
+    def __init__(self):
+        self._config: Dict[str, Any] = {}
+        self._lanes: Dict[str, _ModuleLane] = {}
+        self._retry_after_s = DEFAULT_RETRY_AFTER_S
+        self._accepting = True
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """根据 config.yaml 的 inference 节重建线程池"""
+        self.shutdown()
+        self._config = config.get("inference") or {}
+        self._retry_after_s = int(self._config.get("retry_after_s", DEFAULT_RETRY_AFTER_S))
+        self._accepting = True
+        for module in MODULES:
+            self._lane(module)
+        logger.info(f"推理执行器已配置: {self.get_status()}")
+
+    def shutdown(self) -> None:
+        """关闭所有线程池，此后新请求返回 503"""
+        self._accepting = False
+        for lane in self._lanes.values():
+            lane.pool.shutdown(wait=False)
+        self._lanes = {}
+
+    def check_capacity(self, module: str) -> None:
+        """等待队列已满时抛出 ExecutorBusyError"""
+        if not self._accepting:
+            raise ExecutorBusyError(module, self._retry_after_s, status_code=503)
+        lane = self._lane(module)
+        if lane.inflight >= lane.slots + lane.max_queue:
+            lane.rejected += 1
+            raise ExecutorBusyError(module, self._retry_after(lane))
+
+    @asynccontextmanager
+    async def slot(self, module: str, reject: bool = True):
+        """
+        接纳一个请求进入模块队列；reject=True 时队列满立即拒绝，
+        reject=False（后台任务）时不拒绝但仍计入队列深度
+        """
+        if reject:
+            self.check_capacity(module)
+        lane = self._lane(module)
+        lane.inflight += 1
+        try:
+            yield
+        finally:
+            lane.inflight -= 1
+
+    async def run(self, module: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """在模块专用线程池中执行 fn（不做准入检查，调用方应已持有 slot）"""
+        lane = self._lane(module)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(lane.pool, lane.execute, functools.partial(fn, *args, **kwargs))
+
+    async def call(self, module: str, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """准入检查 + 执行"""
+        async with self.slot(module):
+            return await self.run(module, fn, *args, **kwargs)
+
+    def slots(self, module: str) -> int:
+        """模块线程池的并发槽位数"""
+        return self._lane(module).slots
+
+    def get_status(self) -> Dict[str, Any]:
+        """各模块槽位、执行中数量与队列深度"""
+        return {module: lane.get_status() for module, lane in self._lanes.items()}
+
+    def _lane(self, module: str) -> _ModuleLane:
+        lane = self._lanes.get(module)
+        if lane is None:
+            if not self._accepting:
+                # 关闭后不再按需重建线程池：关闭期间迟到的请求返回 503，不会启动无人回收的线程
+                raise ExecutorBusyError(module, self._retry_after_s, status_code=503)
+            module_cfg = self._config.get(module) or {}
+            lane = _ModuleLane(
+                module,
+                slots=module_cfg.get("slots", DEFAULT_SLOTS),
+                max_queue=module_cfg.get("max_queue", DEFAULT_MAX_QUEUE),
+            )
+            self._lanes[module] = lane
+        return lane
+
+    def _retry_after(self, lane: _ModuleLane) -> int:
+        """按平均耗时估算排空当前队列所需秒数"""
+        estimate = lane.avg_latency_s * (lane.inflight + 1) / lane.slots
+        return max(self._retry_after_s, math.ceil(estimate))
+
+
+# 全局单例
+inference_executor = InferenceExecutor()
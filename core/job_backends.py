@@ -0,0 +1,411 @@
+"""
+异步转录任务存储后端
+- MemoryJobBackend：进程内字典，完成顺序链表（OrderedDict）实现 O(1) 淘汰
+- SQLiteJobBackend：SQLite（WAL 模式）持久化，status/created_at 建索引，结果以压缩 JSON 存储
+
+后端只负责记录的读写与淘汰，状态流转逻辑由 core.job_store.JobStore 负责；
+容量淘汰时调用 on_evict(job_id, result_ref)，供任务存储清理落盘的结果文件。
+SQLite 后端另支持多进程共享模式（uvicorn --workers N）：任务通过 claim() 原子领取，
+领取后持有租约（worker_id, lease_until），进程退出后租约过期的任务可被其他进程接管。
+任务记录字段：job_id, status, created_at, updated_at, finished_at, fetched,
+filename, uttid, tmp_path, params, progress, result, result_ref, error, priority, worker_id, lease_until
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter, OrderedDict
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+FINISHED_STATUSES = ("completed", "failed", "cancelled", "expired")
+
+
+class MemoryJobBackend:
+    """
+    进程内内存后端
+    已结束的任务按「已取回 / 未取回」分别记录在两个 OrderedDict 中（按结束时间排序），
+    超出容量时先淘汰最老的已取回任务，再淘汰最老的未取回任务，每次淘汰 O(1)。
+    """
+
+    name = "memory"
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max(1, int(max_jobs))
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._fetched: "OrderedDict[str, None]" = OrderedDict()
+        self._unfetched: "OrderedDict[str, None]" = OrderedDict()
+        self._counts: Counter = Counter()
+        self.evicted = 0
+        self.on_evict: Optional[Callable[[str, Optional[Dict[str, Any]]], None]] = None
+
+    def insert(self, job: Dict[str, Any]) -> None:
+        self._jobs[job["job_id"]] = job
+        self._counts[job["status"]] += 1
+        self._evict()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job else None
+
+    def update(self, job_id: str, **fields) -> bool:
+        job = self._jobs.get(job_id)
+        if not job:
+            return False
+        if "status" in fields and fields["status"] != job["status"]:
+            self._counts[job["status"]] -= 1
+            self._counts[fields["status"]] += 1
+        job.update(fields)
+        self._index_finished(job)
+        return True
+
+    def delete(self, job_id: str) -> bool:
+        job = self._jobs.pop(job_id, None)
+        if not job:
+            return False
+        self._counts[job["status"]] -= 1
+        self._fetched.pop(job_id, None)
+        self._unfetched.pop(job_id, None)
+        return True
+
+    def list_by_status(self, status: str) -> List[Dict[str, Any]]:
+        jobs = [dict(job) for job in self._jobs.values() if job["status"] == status]
+        return sorted(jobs, key=lambda job: job["created_at"])
+
+    def list_finished_before(self, status: str, before: float, limit: int) -> List[Dict[str, Any]]:
+        jobs = [
+            dict(job) for job in self._jobs.values()
+            if job["status"] == status and job["finished_at"] is not None and job["finished_at"] < before
+        ]
+        return sorted(jobs, key=lambda job: job["finished_at"])[:limit]
+
+    def count_by_status(self) -> Dict[str, int]:
+        return {status: count for status, count in self._counts.items() if count}
+
+    def close(self) -> None:
+        pass
+
+    def _index_finished(self, job: Dict[str, Any]) -> None:
+        job_id = job["job_id"]
+        if job["status"] not in FINISHED_STATUSES:
+            return
+        if job.get("fetched"):
+            self._unfetched.pop(job_id, None)
+            self._fetched[job_id] = None
+        elif job_id not in self._fetched:
+            self._unfetched[job_id] = None
+        self._evict()
+
+    def _evict(self) -> None:
+        while len(self._jobs) > self.max_jobs:
+            if self._fetched:
+                job_id, _ = self._fetched.popitem(last=False)
+            elif self._unfetched:
+                job_id, _ = self._unfetched.popitem(last=False)
+            else:
+                return  # 均为未结束任务，不淘汰
+            job = self._jobs.pop(job_id, None)
+            if job:
+                self._counts[job["status"]] -= 1
+                self.evicted += 1
+                if self.on_evict:
+                    self.on_evict(job_id, job.get("result_ref"))
+
+
+class SQLiteJobBackend:
+    """
+    SQLite 持久化后端（WAL 模式，服务重启后任务与结果仍可查询）
+    结果以 zlib 压缩的 JSON 存为 BLOB；任务总数在内存中计数（共享模式读取触发器维护的 jobs_count 行），
+    超出容量时通过 (fetched, finished_at) 索引按「已取回优先、结束时间最早」淘汰，无需全表扫描。
+    """
+
+    name = "sqlite"
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS jobs (
+        job_id TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        created_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        finished_at REAL,
+        fetched INTEGER NOT NULL DEFAULT 0,
+        filename TEXT,
+        uttid TEXT,
+        tmp_path TEXT,
+        params TEXT,
+        progress TEXT,
+        result BLOB,
+        result_ref TEXT,
+        error TEXT,
+        priority INTEGER NOT NULL DEFAULT 0,
+        worker_id TEXT,
+        lease_until REAL
+    );
+    """
+
+    # 在补齐列之后创建（旧版本数据库可能缺少索引引用的列）
+    _INDEXES = """
+    CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+    CREATE INDEX IF NOT EXISTS idx_jobs_created_at ON jobs(created_at);
+    CREATE INDEX IF NOT EXISTS idx_jobs_eviction ON jobs(fetched DESC, finished_at) WHERE finished_at IS NOT NULL;
+    CREATE INDEX IF NOT EXISTS idx_jobs_queue ON jobs(status, priority DESC, created_at);
+    CREATE INDEX IF NOT EXISTS idx_jobs_ttl ON jobs(status, finished_at);
+    """
+
+    # 任务总数由触发器在库内维护，多进程共享时淘汰检查只需读取一行，无需 COUNT(*) 全表统计
+    _COUNTER = (
+        "CREATE TABLE IF NOT EXISTS jobs_count (id INTEGER PRIMARY KEY CHECK (id = 0), n INTEGER NOT NULL)",
+        "CREATE TRIGGER IF NOT EXISTS jobs_count_insert AFTER INSERT ON jobs"
+        " BEGIN UPDATE jobs_count SET n = n + 1 WHERE id = 0; END",
+        "CREATE TRIGGER IF NOT EXISTS jobs_count_delete AFTER DELETE ON jobs"
+        " BEGIN UPDATE jobs_count SET n = n - 1 WHERE id = 0; END",
+        "INSERT OR IGNORE INTO jobs_count (id, n) SELECT 0, COUNT(*) FROM jobs",
+    )
+
+    _COLUMNS = (
+        "job_id", "status", "created_at", "updated_at", "finished_at", "fetched",
+        "filename", "uttid", "tmp_path", "params", "progress", "result", "result_ref", "error",
+        "priority", "worker_id", "lease_until",
+    )
+
+    def __init__(self, path: str, max_jobs: int):
+        self.path = path
+        self.max_jobs = max(1, int(max_jobs))
+        self.evicted = 0
+        self.on_evict: Optional[Callable[[str, Optional[Dict[str, Any]]], None]] = None
+        # 多进程共享同一数据库时，淘汰前从 jobs_count 读取包含其他进程写入的任务总数
+        self.shared = False
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # 多个进程同时写入时等待写锁，而不是立即报 database is locked
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(self._SCHEMA)
+        self._migrate()
+        self._conn.executescript(self._INDEXES)
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            for statement in self._COUNTER:
+                self._conn.execute(statement)
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+        self._count = self._stored_count()
+        logger.info(f"SQLite 任务存储已打开: path={path}, jobs={self._count}")
+
+    def insert(self, job: Dict[str, Any]) -> None:
+        row = self._encode(job)
+        placeholders = ", ".join("?" for _ in self._COLUMNS)
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO jobs ({', '.join(self._COLUMNS)}) VALUES ({placeholders})",
+                [row.get(col) for col in self._COLUMNS],
+            )
+            self._count += 1
+            self._evict()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            cur = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE job_id = ?", (job_id,)
+            )
+            row = cur.fetchone()
+        return self._decode(row) if row else None
+
+    def update(self, job_id: str, **fields) -> bool:
+        if not fields:
+            return True
+        row = self._encode(fields)
+        assignments = ", ".join(f"{col} = ?" for col in row)
+        with self._lock:
+            cur = self._conn.execute(
+                f"UPDATE jobs SET {assignments} WHERE job_id = ?", [*row.values(), job_id]
+            )
+            if fields.get("status") in FINISHED_STATUSES:
+                self._evict()
+        return cur.rowcount > 0
+
+    def delete(self, job_id: str) -> bool:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM jobs WHERE job_id = ?", (job_id,))
+            self._count -= cur.rowcount
+        return cur.rowcount > 0
+
+    def list_by_status(self, status: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE status = ? ORDER BY created_at", (status,)
+            ).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def list_finished_before(self, status: str, before: float, limit: int) -> List[Dict[str, Any]]:
+        """结束时间早于 before 的指定状态任务（按结束时间，最多 limit 个）"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self._COLUMNS)} FROM jobs WHERE status = ? AND finished_at < ?"
+                " ORDER BY finished_at LIMIT ?",
+                (status, before, limit),
+            ).fetchall()
+        return [self._decode(row) for row in rows]
+
+    def count_by_status(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def claim(self, worker_id: str, lease_s: float) -> Optional[str]:
+        """
+        原子地领取一个待执行任务（多进程共享模式）：优先接管租约已过期的处理中任务
+        （其所属进程已退出），其次按优先级、创建时间取最早的待处理任务。
+        领取后状态置为 processing 并记录 worker_id 与租约到期时间，返回 job_id；无任务时返回 None
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = 'processing' AND lease_until < ?"
+                    " ORDER BY lease_until LIMIT 1",
+                    (now,),
+                ).fetchone() or self._conn.execute(
+                    "SELECT job_id FROM jobs WHERE status = 'pending'"
+                    " ORDER BY priority DESC, created_at LIMIT 1"
+                ).fetchone()
+                if row:
+                    self._conn.execute(
+                        "UPDATE jobs SET status = 'processing', worker_id = ?, lease_until = ?, updated_at = ?"
+                        " WHERE job_id = ?",
+                        (worker_id, now + lease_s, now, row[0]),
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return row[0] if row else None
+
+    def renew(self, job_ids: List[str], worker_id: str, lease_s: float) -> None:
+        """续期本进程正在执行的任务的租约"""
+        if not job_ids:
+            return
+        with self._lock:
+            self._conn.execute(
+                f"UPDATE jobs SET lease_until = ? WHERE worker_id = ? AND status = 'processing'"
+                f" AND job_id IN ({', '.join('?' for _ in job_ids)})",
+                [time.time() + lease_s, worker_id, *job_ids],
+            )
+
+    def release(self, job_id: str, worker_id: str) -> bool:
+        """放弃领取（进程关闭时），任务重新变为待处理"""
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE jobs SET status = 'pending', worker_id = NULL, lease_until = NULL, updated_at = ?"
+                " WHERE job_id = ? AND worker_id = ? AND status = 'processing'",
+                (time.time(), job_id, worker_id),
+            )
+        return cur.rowcount > 0
+
+    def count_pending(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'pending'").fetchone()[0]
+
+    def pending_ahead(self, job_id: str) -> Optional[int]:
+        """排在该待处理任务之前的待处理任务数（任务不在待处理状态时返回 None）"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT priority, created_at FROM jobs WHERE job_id = ? AND status = 'pending'", (job_id,)
+            ).fetchone()
+            if not row:
+                return None
+            priority, created_at = row
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM jobs WHERE status = 'pending'"
+                " AND (priority > ? OR (priority = ? AND created_at < ?))",
+                (priority, priority, created_at),
+            ).fetchone()[0]
+
+    def _migrate(self) -> None:
+        """为旧版本创建的数据库补齐新增列"""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+        for column in self._COLUMNS:
+            if column not in existing:
+                self._conn.execute(f"ALTER TABLE jobs ADD COLUMN {column}")
+                logger.info(f"SQLite 任务存储新增列: {column}")
+
+    def _stored_count(self) -> int:
+        """触发器维护的任务总数（含其他进程的写入）"""
+        return self._conn.execute("SELECT n FROM jobs_count WHERE id = 0").fetchone()[0]
+
+    def _evict(self) -> None:
+        """超出容量时删除多余的已结束任务（需持有锁）"""
+        if self.shared:
+            self._count = self._stored_count()
+        excess = self._count - self.max_jobs
+        if excess <= 0:
+            return
+        rows = self._conn.execute(
+            "SELECT job_id, result_ref FROM jobs WHERE finished_at IS NOT NULL"
+            " ORDER BY fetched DESC, finished_at LIMIT ?",
+            (excess,),
+        ).fetchall()
+        if not rows:
+            return
+        cur = self._conn.execute(
+            f"DELETE FROM jobs WHERE job_id IN ({', '.join('?' for _ in rows)})",
+            [job_id for job_id, _ in rows],
+        )
+        self._count -= cur.rowcount
+        self.evicted += cur.rowcount
+        if self.on_evict:
+            for job_id, result_ref in rows:
+                self.on_evict(job_id, json.loads(result_ref) if result_ref else None)
+
+    @staticmethod
+    def _encode(fields: Dict[str, Any]) -> Dict[str, Any]:
+        row = dict(fields)
+        if "params" in row:
+            row["params"] = json.dumps(row["params"] or {}, ensure_ascii=False)
+        for column in ("progress", "result_ref"):
+            if column in row and row[column] is not None:
+                row[column] = json.dumps(row[column], ensure_ascii=False)
+        if "result" in row and row["result"] is not None:
+            payload = json.dumps(row["result"], ensure_ascii=False, separators=(",", ":"))
+            row["result"] = zlib.compress(payload.encode("utf-8"))
+        if "fetched" in row:
+            row["fetched"] = int(bool(row["fetched"]))
+        return row
+
+    @classmethod
+    def _decode(cls, row: tuple) -> Dict[str, Any]:
+        job = dict(zip(cls._COLUMNS, row))
+        job["params"] = json.loads(job["params"]) if job["params"] else {}
+        job["progress"] = json.loads(job["progress"]) if job["progress"] else None
+        job["result_ref"] = json.loads(job["result_ref"]) if job["result_ref"] else None
+        if job["result"] is not None:
+            job["result"] = json.loads(zlib.decompress(job["result"]).decode("utf-8"))
+        job["fetched"] = bool(job["fetched"])
+        return job
+
+
+def create_job_backend(jobs_config: Dict[str, Any], default_max_jobs: int):
+    """根据 config.yaml 的 jobs 节创建后端"""
+    backend = (jobs_config.get("backend") or "memory").lower()
+    max_jobs = jobs_config.get("max_jobs", default_max_jobs)
+    if backend == "sqlite":
+        return SQLiteJobBackend(jobs_config.get("sqlite_path", "data/jobs.db"), max_jobs)
+    if backend != "memory":
+        raise ValueError(f"未知的任务存储后端: {backend}")
+    return MemoryJobBackend(max_jobs)
@@ -0,0 +1,239 @@
+"""
+异步转录任务队列 - 有界优先级队列 + 固定数量的工作协程
+任务按优先级（数值越大越先执行）、同优先级按提交顺序（FIFO）出队；
+队列已满时拒绝新提交（429 + Retry-After），避免数百个任务同时争抢模型
+
+多进程共享模式（jobs.shared，uvicorn --workers N）下不使用进程内堆：
+待处理任务保存在共享的 SQLite 任务存储中，各进程的工作协程按同样的优先级顺序原子领取，
+执行期间定期续租；进程退出后租约过期的任务由其他进程接管。
+"""
+
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from core.inference_executor import ExecutorBusyError
+from core.job_store import FINISHED_STATUSES, job_store
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_WORKERS = 1
+DEFAULT_MAX_QUEUE = 1000
+DEFAULT_RETRY_AFTER_S = 5
+
+
+class JobQueue:
+    """异步转录任务的优先级队列"""
+
+    def __init__(self):
+        self.workers = DEFAULT_WORKERS
+        self.max_queue = DEFAULT_MAX_QUEUE
+        self.retry_after_s = DEFAULT_RETRY_AFTER_S
+        self._handler: Optional[Callable[[str], Awaitable[None]]] = None
+        self._heap: List[Tuple[int, int, str]] = []  # (-priority, seq, job_id)
+        self._entries: Dict[str, Tuple[int, int, str]] = {}
+        self._seq = itertools.count()
+        self._cond: Optional[asyncio.Condition] = None
+        self._tasks: List[asyncio.Task] = []
+        self.shared = False
+        # 本进程执行中的任务：job_id -> 执行该任务的协程（取消任务时取消该协程）
+        self._running: Dict[str, asyncio.Task] = {}
+        self.running = 0
+        self.rejected = 0
+        self.completed = 0
+        self.avg_job_s = 0.0  # 单个任务执行耗时的指数滑动平均
+
+    async def start(self, config: Dict[str, Any], handler: Callable[[str], Awaitable[None]]) -> None:
+        """根据 config.yaml 的 job_queue 节启动工作协程，handler(job_id) 执行单个任务"""
+        queue_cfg = config.get("job_queue") or {}
+        self.workers = max(1, int(queue_cfg.get("workers", DEFAULT_WORKERS)))
+        self.max_queue = max(0, int(queue_cfg.get("max_queue", DEFAULT_MAX_QUEUE)))
+        self.retry_after_s = int(queue_cfg.get("retry_after_s", DEFAULT_RETRY_AFTER_S))
+        self._handler = handler
+        self.shared = job_store.shared
+        self._cond = asyncio.Condition()
+        self._tasks = [asyncio.create_task(self._worker(i)) for i in range(self.workers)]
+        if self.shared:
+            self._tasks.append(asyncio.create_task(self._supervise()))
+        logger.info(
+            f"任务队列已启动: workers={self.workers}, max_queue={self.max_queue}"
+            f"{', 多进程共享' if self.shared else ''}"
+        )
+
+    async def stop(self) -> None:
+        """
+        停止工作协程；排队中的任务保留在任务存储中（持久化后端重启后恢复）
+        多进程共享模式下本进程执行中被中断的任务交还为待处理，由其他进程继续执行
+        """
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self.shared:
+            for job_id in interrupted:
+                job_store.release(job_id)
+        self._tasks = []
+        self._cond = None
+
+    def check_capacity(self) -> None:
+        """队列已满时抛出 ExecutorBusyError（429），未启动时为 503"""
+        if self._cond is None:
+            raise ExecutorBusyError("jobs", self.retry_after_s, status_code=503)
+        if self._queued() >= self.max_queue:
+            self.rejected += 1
+            raise ExecutorBusyError("jobs", self._retry_after())
+
+    async def put(self, job_id: str, priority: int = 0, force: bool = False) -> None:
+        """
+        入队；force=True（服务重启恢复任务）时不检查队列长度
+        Raises:
+            ExecutorBusyError: 队列已满或未启动
+        """
+        if not force:
+            self.check_capacity()
+        elif self._cond is None:
+            raise ExecutorBusyError("jobs", self.retry_after_s, status_code=503)
+        if not self.shared:
+            # 共享模式下任务已在任务存储中处于待处理状态，只需唤醒本进程的工作协程去领取
+            entry = (-int(priority), next(self._seq), job_id)
+            heapq.heappush(self._heap, entry)
+            self._entries[job_id] = entry
+        async with self._cond:
+            self._cond.notify()
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        取消本进程中的任务：排队中的直接移出队列（"dropped"），执行中的取消其协程（"interrupted"），
+        不在本进程中时返回 None（共享模式下由执行该任务的进程在轮询时发现并中断）
+        """
+        if self.discard(job_id):
+            return "dropped"
+        task = self._running.get(job_id)
+        if task is not None:
+            task.cancel()
+            return "interrupted"
+        return None
+
+    def discard(self, job_id: str) -> bool:
+        """将本进程队列中排队的任务移出队列，不影响执行中的任务；任务不在队列中时返回 False"""
+        entry = self._entries.pop(job_id, None)
+        if entry is None:
+            return False
+        self._heap.remove(entry)
+        heapq.heapify(self._heap)
+        return True
+
+    def position(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        排队中任务的位置与预计开始时间
+        Returns: {'queue_position': 1 起始, 'estimated_start_s': float} 或 None（不在队列中）
+        """
+        if self.shared:
+            ahead = job_store.pending_ahead(job_id)
+            if ahead is None:
+                return None
+        else:
+            entry = self._entries.get(job_id)
+            if entry is None:
+                return None
+            ahead = sum(1 for other in self._heap if other < entry)
+        # 前方任务与正在执行的任务按工作协程数平均分摊
+        waves = (ahead + self.running) / float(self.workers)
+        return {
+            "queue_position": ahead + 1,
+            "estimated_start_s": round(waves * self.avg_job_s, 1),
+        }
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "shared": self.shared,
+            "running": self.running,
+            "queued": self._queued(),
+            "max_queue": self.max_queue,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "avg_job_ms": int(self.avg_job_s * 1000),
+        }
+
+    def _queued(self) -> int:
+        """排队任务数（共享模式下为所有进程的待处理任务总数）"""
+        return job_store.count_pending() if self.shared else len(self._heap)
+
+    async def _get(self) -> str:
+        if self.shared:
+            return await self._claim()
+        async with self._cond:
+            while not self._heap:
+                await self._cond.wait()
+            _, _, job_id = heapq.heappop(self._heap)
+        self._entries.pop(job_id, None)
+        return job_id
+
+    async def _claim(self) -> str:
+        """共享模式：从任务存储领取任务；没有任务时等待本进程的提交通知或轮询间隔（其他进程的提交）"""
+        while True:
+            job_id = job_store.claim_next()
+            if job_id:
+                return job_id
+            async with self._cond:
+                try:
+                    await asyncio.wait_for(self._cond.wait(), job_store.poll_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _supervise(self) -> None:
+        """
+        共享模式：每 1/3 租约时长为本进程执行中的任务续租；
+        每个轮询间隔检查执行中的任务是否已被其他进程取消或判定过期，是则中断
+        """
+        last_renew = time.monotonic()
+        while True:
+            await asyncio.sleep(job_store.poll_interval_s)
+            try:
+                for job_id, task in list(self._running.items()):
+                    job = job_store.get(job_id)
+                    if not job or job["status"] in FINISHED_STATUSES:
+                        task.cancel()
+                if time.monotonic() - last_renew >= job_store.lease_s / 3:
+                    job_store.renew_leases(list(self._running))
+                    last_renew = time.monotonic()
+            except Exception as e:
+                logger.error(f"任务续租或取消检查失败: {e}")
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job_id = await self._get()
+            self.running += 1
+            task = asyncio.create_task(self._handler(job_id))
+            self._running[job_id] = task
+            start = time.time()
+            try:
+                # 任务协程被取消（DELETE / 截止时间）时工作协程继续处理下一个任务；
+                # 工作协程自身被取消（服务关闭）时一并取消任务协程
+                try:
+                    await asyncio.wait({task})
+                except asyncio.CancelledError:
+                    task.cancel()
+                    await asyncio.wait({task})
+                    raise
+                if not task.cancelled() and task.exception() is not None:
+                    logger.error(f"任务执行异常: worker={index}, job_id={job_id}, error={task.exception()}")
+            finally:
+                elapsed = time.time() - start
+                self._running.pop(job_id, None)
+                self.running -= 1
+                self.completed += 1
+                self.avg_job_s = elapsed if self.completed == 1 else 0.8 * self.avg_job_s + 0.2 * elapsed
+
+    def _retry_after(self) -> int:
+        """按平均耗时估算队列前进一个任务所需秒数"""
+        return max(self.retry_after_s, math.ceil(self.avg_job_s / self.workers))
+
+
+# 全局单例
+job_queue = JobQueue()
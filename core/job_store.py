@@ -1,11 +1,22 @@
 """
 异步转录任务存储
-内存存储，用于 submit/status/result 轮询模式
+用于 submit/status/result 轮询模式；存储后端可插拔（见 core.job_backends）：
+- memory：进程内内存（默认）
+- sqlite：SQLite WAL 持久化，服务重启后任务与结果仍可查询
+序列化后超过 spool_threshold_bytes 的结果压缩落盘（core.result_spool），任务记录中只保留文件引用；
+内存后端中内联结果的总字节数受 memory_budget_bytes 约束，超出预算的新结果同样落盘。
+jobs.shared 为 true 时（需 sqlite 后端）多个 worker 进程共享同一数据库：任何进程都能查询任何任务，
+待处理任务由各进程的任务队列原子领取（见 core.job_queue），其他进程产生的状态变化通过轮询感知。
 """
 
+import asyncio
+import os
+import socket
 import time
 import uuid
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
+from core.job_backends import MemoryJobBackend, create_job_backend
+from core.result_spool import DEFAULT_RESULTS_DIR, DEFAULT_SPOOL_THRESHOLD_BYTES, ResultSpool, dump_result
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -15,17 +26,71 @@ STATUS_PENDING = "pending"
 STATUS_PROCESSING = "processing"
 STATUS_COMPLETED = "completed"
 STATUS_FAILED = "failed"
+STATUS_CANCELLED = "cancelled"  # 客户端通过 DELETE 取消
+STATUS_EXPIRED = "expired"      # 超过提交时指定的 deadline_ms
+FINISHED_STATUSES = (STATUS_COMPLETED, STATUS_FAILED, STATUS_CANCELLED, STATUS_EXPIRED)
 
-# 最大保留任务数，超出时清理最老的已完成/失败任务
+# 默认最大保留任务数，超出时优先清理已取回结果的最老任务，其次是最老的已完成/失败任务
 MAX_JOBS = 1000
+# 内存后端中内联结果（未落盘）的默认字节预算
+DEFAULT_MEMORY_BUDGET_BYTES = 268435456
+# 多进程共享模式：任务租约时长（秒）与等待其他进程状态变化的轮询间隔（秒）
+DEFAULT_LEASE_S = 60
+DEFAULT_POLL_INTERVAL_S = 0.5
 
 
 class JobStore:
-    """异步转录任务存储（进程内内存）"""
+    """异步转录任务存储（委托给可配置的后端）"""
 
     def __init__(self):
-        self._jobs: Dict[str, Dict[str, Any]] = {}
-        self._order: list = []  # 用于 LRU 清理
+        self._backend = MemoryJobBackend(MAX_JOBS)
+        self._backend.on_evict = self._on_evict
+        # 每个被等待的任务一个 asyncio.Event：任务状态或进度变化时触发并替换，供 SSE / 长轮询等待
+        self._events: Dict[str, asyncio.Event] = {}
+        self._waiters: Dict[str, int] = {}  # 各任务当前的等待者数
+        self._spool = ResultSpool()
+        self.memory_budget_bytes = DEFAULT_MEMORY_BUDGET_BYTES
+        # 内存后端中各任务内联结果的序列化字节数
+        self._inline_sizes: Dict[str, int] = {}
+        self._inline_bytes = 0
+        self.spooled = 0
+        self.shared = False
+        self.lease_s = DEFAULT_LEASE_S
+        self.poll_interval_s = DEFAULT_POLL_INTERVAL_S
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """根据 config.yaml 的 jobs 节切换后端与结果落盘配置"""
+        jobs_cfg = config.get("jobs") or {}
+        shared = bool(jobs_cfg.get("shared", False))
+        backend = create_job_backend(jobs_cfg, MAX_JOBS)
+        if shared and backend.name != "sqlite":
+            backend.close()
+            raise ValueError("jobs.shared 需要 jobs.backend: sqlite")
+        self._backend.close()
+        self._backend = backend
+        self._backend.on_evict = self._on_evict
+        self._backend.shared = shared
+        self.shared = shared
+        self.lease_s = float(jobs_cfg.get("lease_s", DEFAULT_LEASE_S))
+        self.poll_interval_s = float(jobs_cfg.get("poll_interval_s", DEFAULT_POLL_INTERVAL_S))
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._spool = ResultSpool(
+            results_dir=jobs_cfg.get("results_dir", DEFAULT_RESULTS_DIR),
+            threshold_bytes=jobs_cfg.get("spool_threshold_bytes", DEFAULT_SPOOL_THRESHOLD_BYTES),
+            codec=jobs_cfg.get("result_codec", "auto"),
+        )
+        self.memory_budget_bytes = int(jobs_cfg.get("memory_budget_bytes", DEFAULT_MEMORY_BUDGET_BYTES))
+        self._inline_sizes.clear()
+        self._inline_bytes = 0
+        logger.info(
+            f"任务存储后端: {backend.name}, max_jobs={backend.max_jobs}, "
+            f"结果落盘阈值={self._spool.threshold_bytes}B ({self._spool.codec})"
+            f"{f', 多进程共享 worker_id={self.worker_id}' if shared else ''}"
+        )
+
+    def close(self) -> None:
+        self._backend.close()
 
     def create(
         self,
@@ -36,23 +101,32 @@ class JobStore:
     ) -> str:
         """创建任务，返回 job_id"""
         job_id = str(uuid.uuid4())
-        self._jobs[job_id] = {
+        now = time.time()
+        params = params or {}
+        self._backend.insert({
+            "job_id": job_id,
             "status": STATUS_PENDING,
-            "created_at": time.time(),
+            "created_at": now,
+            "updated_at": now,
+            "finished_at": None,
+            "fetched": False,
             "tmp_path": tmp_path,
             "filename": filename,
             "uttid": uttid,
-            "params": params or {},
+            "params": params,
+            "progress": None,
             "result": None,
+            "result_ref": None,
             "error": None,
-        }
-        self._order.append(job_id)
-        self._maybe_cleanup()
+            "priority": int(params.get("priority", 0) or 0),
+            "worker_id": None,
+            "lease_until": None,
+        })
         return job_id
 
     def get(self, job_id: str) -> Optional[Dict[str, Any]]:
         """获取任务信息（不含敏感字段）"""
-        job = self._jobs.get(job_id)
+        job = self._backend.get(job_id)
         if not job:
             return None
         return {
@@ -60,59 +134,295 @@ class JobStore:
             "status": job["status"],
             "created_at": job["created_at"],
             "filename": job.get("filename"),
+            "progress": job.get("progress"),
             "result": job.get("result"),
+            "result_ref": job.get("result_ref"),
             "error": job.get("error"),
         }
 
     def get_full(self, job_id: str) -> Optional[Dict[str, Any]]:
         """获取完整任务（含 tmp_path 等，供后台任务使用）"""
-        return self._jobs.get(job_id)
+        return self._backend.get(job_id)
 
     def set_processing(self, job_id: str) -> bool:
         """标记为处理中"""
-        if job_id not in self._jobs:
-            return False
-        self._jobs[job_id]["status"] = STATUS_PROCESSING
-        return True
+        return self._update(job_id, status=STATUS_PROCESSING, updated_at=time.time())
+
+    def set_progress(self, job_id: str, progress: Dict[str, Any]) -> bool:
+        """更新处理进度（长音频分段识别）"""
+        return self._update(job_id, progress=progress, updated_at=time.time())
 
     def set_completed(self, job_id: str, result: Dict[str, Any]) -> bool:
-        """标记为完成"""
-        if job_id not in self._jobs:
-            return False
-        self._jobs[job_id]["status"] = STATUS_COMPLETED
-        self._jobs[job_id]["result"] = result
-        self._jobs[job_id]["error"] = None
-        return True
+        """标记为完成（大结果在当前线程中压缩落盘）"""
+        return self._store_completed(job_id, *self._encode_result(job_id, result))
+
+    async def complete(self, job_id: str, result: Dict[str, Any]) -> bool:
+        """标记为完成，序列化与压缩落盘在线程中执行，不阻塞事件循环"""
+        encoded = await asyncio.to_thread(self._encode_result, job_id, result)
+        return self._store_completed(job_id, *encoded)
+
+    @staticmethod
+    def iter_result(job: Dict[str, Any]):
+        """按块读取已落盘结果的 JSON 字节（job['result_ref'] 非空时使用）"""
+        return ResultSpool.iter_bytes(job["result_ref"])
+
+    @staticmethod
+    def load_result(job: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """返回结果对象：内联结果直接返回，已落盘的结果读取并解压"""
+        if job.get("result_ref"):
+            return ResultSpool.load(job["result_ref"])
+        return job.get("result")
 
     def set_failed(self, job_id: str, error: str) -> bool:
-        """标记为失败"""
-        if job_id not in self._jobs:
+        """标记为失败（已取消/过期的任务保持原状态）"""
+        if self._terminated(job_id):
             return False
-        self._jobs[job_id]["status"] = STATUS_FAILED
-        self._jobs[job_id]["result"] = None
-        self._jobs[job_id]["error"] = error
-        return True
+        now = time.time()
+        return self._update(
+            job_id, status=STATUS_FAILED, result=None, error=error, updated_at=now, finished_at=now,
+        )
+
+    def set_cancelled(self, job_id: str, reason: str) -> bool:
+        """标记为已取消"""
+        return self._terminate(job_id, STATUS_CANCELLED, reason)
+
+    def set_expired(self, job_id: str, reason: str) -> bool:
+        """标记为已过期（超过截止时间）"""
+        return self._terminate(job_id, STATUS_EXPIRED, reason)
+
+    def _terminate(self, job_id: str, status: str, reason: str) -> bool:
+        now = time.time()
+        return self._update(
+            job_id, status=status, result=None, error=reason, updated_at=now, finished_at=now,
+        )
+
+    def _terminated(self, job_id: str) -> bool:
+        """任务已被取消或已过期：执行中途完成/失败的结果不再覆盖该状态"""
+        job = self._backend.get(job_id)
+        return bool(job) and job["status"] in (STATUS_CANCELLED, STATUS_EXPIRED)
+
+    async def wait_for_change(self, job_id: str, timeout: float) -> bool:
+        """
+        等待任务状态或进度发生变化，timeout 秒内有变化返回 True
+        多进程共享模式下任务可能由其他进程执行，按 poll_interval_s 轮询 updated_at
+        """
+        if not self.shared:
+            return await self._wait_event(job_id, timeout)
+        job = self._backend.get(job_id)
+        updated_at = job["updated_at"] if job else None
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            if await self._wait_event(job_id, min(remaining, self.poll_interval_s)):
+                return True
+            job = self._backend.get(job_id)
+            if (job["updated_at"] if job else None) != updated_at:
+                return True
+
+    async def _wait_event(self, job_id: str, timeout: float) -> bool:
+        event = self._events.get(job_id)
+        if event is None:
+            event = self._events[job_id] = asyncio.Event()
+        self._waiters[job_id] = self._waiters.get(job_id, 0) + 1
+        try:
+            await asyncio.wait_for(event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            # 最后一个等待者离开时移除未触发的 Event，超时的等待不在 _events 中残留
+            remaining = self._waiters.pop(job_id) - 1
+            if remaining:
+                self._waiters[job_id] = remaining
+            elif self._events.get(job_id) is event:
+                del self._events[job_id]
+
+    async def wait_finished(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """等待任务结束（completed/failed/cancelled/expired）或超时，返回最新的任务信息（同 get）"""
+        deadline = time.monotonic() + timeout
+        while True:
+            job = self.get(job_id)
+            if not job or job["status"] in FINISHED_STATUSES:
+                return job
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return job
+            await self.wait_for_change(job_id, remaining)
+
+    def _update(self, job_id: str, **fields) -> bool:
+        updated = self._backend.update(job_id, **fields)
+        self._notify(job_id)
+        return updated
+
+    def _notify(self, job_id: str) -> None:
+        event = self._events.pop(job_id, None)
+        if event is not None:
+            event.set()
+
+    def _encode_result(self, job_id: str, result: Dict[str, Any]):
+        """
+        序列化结果并决定是否落盘：超过阈值，或内存后端的内联结果将超出预算时写入结果目录
+        Returns: (内联结果或 None, 落盘引用或 None, 序列化字节数)
+        """
+        payload = dump_result(result)
+        size = len(payload)
+        over_budget = (
+            self._backend.name == "memory"
+            and self.memory_budget_bytes > 0
+            and self._inline_bytes + size > self.memory_budget_bytes
+        )
+        if size >= self._spool.threshold_bytes or over_budget:
+            return None, self._spool.write(job_id, payload), size
+        return result, None, size
+
+    def _store_completed(
+        self, job_id: str, result: Optional[Dict[str, Any]], result_ref: Optional[Dict[str, Any]], size: int,
+    ) -> bool:
+        if self._terminated(job_id):
+            ResultSpool.delete(result_ref)
+            return False
+        now = time.time()
+        updated = self._update(
+            job_id, status=STATUS_COMPLETED, result=result, result_ref=result_ref, error=None,
+            updated_at=now, finished_at=now,
+        )
+        if not updated:
+            ResultSpool.delete(result_ref)
+        elif result_ref is not None:
+            self.spooled += 1
+        elif self._backend.name == "memory":
+            self._inline_sizes[job_id] = size
+            self._inline_bytes += size
+        return updated
+
+    def _on_evict(self, job_id: str, result_ref: Optional[Dict[str, Any]]) -> None:
+        """后端淘汰任务时释放内联结果计数并删除落盘文件，唤醒仍在等待该任务的请求"""
+        self._inline_bytes -= self._inline_sizes.pop(job_id, 0)
+        ResultSpool.delete(result_ref)
+        self._notify(job_id)
+
+    def purge_finished(self, status: str, before: float, limit: int) -> Dict[str, int]:
+        """
+        删除结束时间早于 before 的指定状态任务（TTL 清理），同时删除其落盘结果与遗留的临时文件
+        Returns: {'jobs': 删除的任务数, 'bytes': 释放的内联结果与文件字节数}
+        """
+        removed = reclaimed = 0
+        for job in self._backend.list_finished_before(status, before, limit):
+            job_id = job["job_id"]
+            # 多进程共享模式下其他进程可能已删除同一任务
+            if not self._backend.delete(job_id):
+                continue
+            removed += 1
+            inline = self._inline_sizes.pop(job_id, 0)
+            self._inline_bytes -= inline
+            reclaimed += inline
+            ref = job.get("result_ref")
+            if ref:
+                reclaimed += ref.get("stored_size", 0)
+                ResultSpool.delete(ref)
+            tmp_path = job.get("tmp_path")
+            if tmp_path and os.path.exists(tmp_path):
+                try:
+                    size = os.path.getsize(tmp_path)
+                    os.unlink(tmp_path)
+                    reclaimed += size
+                except OSError:
+                    pass
+            self._notify(job_id)
+        return {"jobs": removed, "bytes": reclaimed}
+
+    def list_unfinished(self) -> List[Dict[str, Any]]:
+        """待处理与处理中的任务（按创建时间）"""
+        return self._backend.list_by_status(STATUS_PENDING) + self._backend.list_by_status(STATUS_PROCESSING)
+
+    @property
+    def results_dir(self) -> str:
+        return self._spool.results_dir
+
+    def mark_fetched(self, job_id: str) -> bool:
+        """标记结果已被客户端取回，容量不足时优先淘汰"""
+        return self._backend.update(job_id, fetched=True)
 
     def pop_tmp_path(self, job_id: str) -> Optional[str]:
         """取出并移除 tmp_path（用完后清理）"""
-        job = self._jobs.get(job_id)
+        job = self._backend.get(job_id)
         if not job:
             return None
-        path = job.pop("tmp_path", None)
+        path = job.get("tmp_path")
+        self._backend.update(job_id, tmp_path=None)
         return path
 
-    def _maybe_cleanup(self) -> None:
-        """超出容量时清理最老的已完成/失败任务"""
-        if len(self._jobs) <= MAX_JOBS:
-            return
-        for jid in list(self._order):
-            if len(self._jobs) <= MAX_JOBS:
-                break
-            job = self._jobs.get(jid)
-            if job and job["status"] in (STATUS_COMPLETED, STATUS_FAILED):
-                self._jobs.pop(jid, None)
-                if jid in self._order:
-                    self._order.remove(jid)
+    def claim_next(self) -> Optional[str]:
+        """多进程共享模式：原子领取下一个待执行任务（含租约过期的处理中任务）"""
+        job_id = self._backend.claim(self.worker_id, self.lease_s)
+        if job_id:
+            self._notify(job_id)
+        return job_id
+
+    def renew_leases(self, job_ids: List[str]) -> None:
+        """多进程共享模式：续期本进程正在执行的任务"""
+        self._backend.renew(job_ids, self.worker_id, self.lease_s)
+
+    def release(self, job_id: str) -> bool:
+        """多进程共享模式：进程关闭时交还未完成的任务，由其他进程重新领取"""
+        released = self._backend.release(job_id, self.worker_id)
+        if released:
+            self._notify(job_id)
+        return released
+
+    def count_pending(self) -> int:
+        """多进程共享模式：所有进程的待处理任务总数"""
+        return self._backend.count_pending()
+
+    def pending_ahead(self, job_id: str) -> Optional[int]:
+        """多进程共享模式：排在该任务之前的待处理任务数"""
+        return self._backend.pending_ahead(job_id)
+
+    def recover(self) -> List[str]:
+        """
+        服务启动时恢复未完成的任务（持久化后端）：处理中的任务重置为待处理，
+        临时音频已丢失的任务标记为失败。返回需重新调度的 job_id 列表（按创建时间）
+        多进程共享模式下其他进程可能仍在运行，处理中的任务交由租约过期接管，待处理任务由队列直接领取，返回空列表
+        """
+        if self.shared:
+            for job in self._backend.list_by_status(STATUS_PENDING):
+                tmp_path = job.get("tmp_path")
+                if not tmp_path or not os.path.exists(tmp_path):
+                    self.set_failed(job["job_id"], "服务重启，临时文件丢失")
+            return []
+        job_ids = []
+        unfinished = self._backend.list_by_status(STATUS_PROCESSING) + self._backend.list_by_status(STATUS_PENDING)
+        for job in unfinished:
+            tmp_path = job.get("tmp_path")
+            if not tmp_path or not os.path.exists(tmp_path):
+                self.set_failed(job["job_id"], "服务重启，临时文件丢失")
+                continue
+            if job["status"] == STATUS_PROCESSING:
+                self._backend.update(job["job_id"], status=STATUS_PENDING, updated_at=time.time())
+            job_ids.append((job["created_at"], job["job_id"]))
+        if job_ids:
+            logger.info(f"恢复未完成的异步任务: {len(job_ids)} 个")
+        return [job_id for _, job_id in sorted(job_ids)]
+
+    def get_status(self) -> Dict[str, Any]:
+        """后端类型、各状态任务数与结果内存占用"""
+        return {
+            "backend": self._backend.name,
+            "max_jobs": self._backend.max_jobs,
+            "jobs": self._backend.count_by_status(),
+            "evicted": self._backend.evicted,
+            "shared": self.shared,
+            "worker_id": self.worker_id,
+            "results": {
+                "inline_bytes": self._inline_bytes if self._backend.name == "memory" else None,
+                "memory_budget_bytes": self.memory_budget_bytes,
+                "spool_threshold_bytes": self._spool.threshold_bytes,
+                "codec": self._spool.codec,
+                "spooled": self.spooled,
+            },
+        }
 
 
 # 全局单例
@@ -2,12 +2,13 @@
 LID 处理器 - 语种识别
 """
 
-import os
+import asyncio
 import uuid
 from fastapi import UploadFile
 from typing import Dict, Any
+from core.inference_executor import inference_executor
 from utils.logger import get_logger
-from utils.audio_validator import prepare_audio_for_asr
+from utils.audio_validator import load_audio_for_inference, release_audio
 from utils.config_loader import get_config
 
 logger = get_logger(__name__)
@@ -23,16 +24,18 @@ class LIDProcessor:
         
     async def detect(self, audio_file: UploadFile) -> Dict[str, Any]:
         uttid = str(uuid.uuid4())
-        wav_path = None
+        audio = None
         
         try:
-            _, wav_path = prepare_audio_for_asr(audio_file, self.config)
-            
             lid_model = self.model_manager.get_model('lid')
             if not lid_model:
                 raise RuntimeError("LID 模型未加载")
             
-            result = lid_model.detect(wav_path)
+            # 转码与推理均在线程池中执行，不阻塞事件循环；转码期间不占用 lid 槽位
+            inference_executor.check_capacity('lid')
+            _, audio = await asyncio.to_thread(load_audio_for_inference, audio_file, self.config)
+            async with inference_executor.slot('lid'):
+                result = await inference_executor.run('lid', lid_model.detect, audio)
             return {
                 'uttid': uttid,
                 'lang': result['lang'],
@@ -43,8 +46,5 @@ class LIDProcessor:
             self.logger.error(f"LID 检测失败: {e}")
             raise
         finally:
-            if wav_path and os.path.exists(wav_path):
-                try:
-                    os.unlink(wav_path)
-                except OSError:
-                    pass
+            if audio is not None:
+                release_audio(audio)
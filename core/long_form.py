@@ -0,0 +1,122 @@
+"""
+长音频分段并行识别（异步任务 long_form 模式）
+整段音频只做一次 VAD，按语音段以内存映射切片（不复制样本），分段按时长排序后分批，
+多个批次并行提交到 asr 推理线程池，最后按时间顺序拼接分句与时间戳。
+"""
+
+import asyncio
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.inference_executor import inference_executor
+from core.pipeline import TranscribePipeline, join_sentences, mmap_wav_int16
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_CHUNK_S = 30
+
+
+class LongFormTranscriber:
+    """
+    长音频识别
+    on_progress(progress) 在每个批次完成后调用，progress 含 segments_done / segments_total、
+    已识别语音时长与当前实时率（rtf = 耗时 / 已覆盖的音频时长）
+    """
+
+    def __init__(self, asr_system: Any, config: Dict[str, Any]):
+        self._system = asr_system
+        self._pipeline = TranscribePipeline(asr_system)
+        long_form_cfg = config.get("long_form") or {}
+        asr_slots = ((config.get("inference") or {}).get("asr") or {}).get("slots", 1)
+        self.parallel_batches = max(1, int(long_form_cfg.get("parallel_batches", 0) or asr_slots))
+        self.chunk_s = float(long_form_cfg.get("chunk_s", DEFAULT_CHUNK_S))
+
+    async def transcribe(
+        self,
+        wav_path: str,
+        uttid: str,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """识别 16kHz 16-bit mono WAV，输出结构与 FireRedAsr2System.process 一致"""
+        start_time = time.time()
+        samples, sample_rate = mmap_wav_int16(wav_path)
+        dur = len(samples) / float(sample_rate)
+
+        # 1. 整段只做一次 VAD；未启用 VAD 时按固定窗口切分
+        if self._pipeline.enable_vad:
+            vad_result, _ = await inference_executor.run('vad', self._system.vad.detect, wav_path)
+            timestamps = [(float(s), float(e)) for s, e in vad_result.get('timestamps', [])]
+        else:
+            timestamps = [(t, min(t + self.chunk_s, dur)) for t in _frange(0.0, dur, self.chunk_s)]
+        segments = sorted(timestamps)
+        total_speech = sum(end - start for start, end in segments)
+
+        progress = {
+            "segments_done": 0,
+            "segments_total": len(segments),
+            "audio_s": round(dur, 3),
+            "speech_s": round(total_speech, 3),
+            "decoded_s": 0.0,
+            "rtf": None,
+        }
+        if on_progress:
+            on_progress(dict(progress))
+
+        # 2. 分段按时长排序后分批，最多 parallel_batches 个批次同时在 asr 线程池中执行
+        seg_results: List[Dict[str, Any]] = [{} for _ in segments]
+        uttids = [f"{uttid}_s{int(s * 1000)}_e{int(e * 1000)}" for s, e in segments]
+        order = sorted(range(len(segments)), key=lambda i: segments[i][1] - segments[i][0])
+        batch_size = self._pipeline.asr_batch_size
+        batches = [order[b:b + batch_size] for b in range(0, len(order), batch_size)]
+        semaphore = asyncio.Semaphore(self.parallel_batches)
+
+        async def run_batch(batch_idx: List[int]) -> None:
+            batch_wav = [self._slice(samples, sample_rate, segments[i]) for i in batch_idx]
+            async with semaphore:
+                results = await inference_executor.run(
+                    'asr', self._pipeline.decode_segments, [uttids[i] for i in batch_idx], batch_wav,
+                )
+            for i, r in zip(batch_idx, results):
+                seg_results[i] = r
+            progress["segments_done"] += len(batch_idx)
+            progress["decoded_s"] = round(
+                progress["decoded_s"] + sum(segments[i][1] - segments[i][0] for i in batch_idx), 3
+            )
+            # 实时率按已识别语音占全部语音的比例折算为音频时长：耗时 / 已覆盖的音频时长
+            covered = dur * progress["decoded_s"] / total_speech if total_speech else 0.0
+            progress["rtf"] = round((time.time() - start_time) / covered, 4) if covered else None
+            if on_progress:
+                on_progress(dict(progress))
+
+        await asyncio.gather(*[run_batch(batch_idx) for batch_idx in batches])
+
+        # 3. 标点
+        if self._pipeline.enable_punc:
+            await inference_executor.run('punc', self._pipeline.punctuate, seg_results, uttids)
+
+        # 4. 按时间顺序拼接
+        output = TranscribePipeline.empty_result(uttid, dur)
+        for (start, end), r in zip(segments, seg_results):
+            TranscribePipeline.append_segment(output, start, end, r)
+        output['text'] = join_sentences([s['text'] for s in output['sentences']])
+        elapsed = time.time() - start_time
+        output['rtf'] = round(elapsed / dur, 4) if dur else None
+        logger.info(
+            f"长音频识别完成: uttid={uttid}, 时长={dur:.1f}s, 分段={len(segments)}, "
+            f"耗时={elapsed:.1f}s, rtf={output['rtf']}"
+        )
+        return output
+
+    @staticmethod
+    def _slice(samples: Any, sample_rate: int, segment: Tuple[float, float]) -> Tuple[int, Any]:
+        """按 FireRedAsr2System 内部约定返回 (sample_rate, 样本视图)，内存映射切片不复制数据"""
+        start, end = segment
+        return sample_rate, samples[int(start * sample_rate):int(end * sample_rate)]
+
+
+def _frange(start: float, stop: float, step: float):
+    value = start
+    while value < stop:
+        yield value
+        value += step
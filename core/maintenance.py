@@ -0,0 +1,245 @@
+"""
+后台维护任务 - 按 TTL 清理异步任务、回收遗留的临时文件与结果文件
+每 interval_s 执行一次（也可通过 POST /admin/maintenance/run 立即执行）：
+- 已结束的任务按状态配置的 TTL（自结束时间起算）删除，同时删除其落盘结果
+- 临时音频已丢失的待处理任务（进程崩溃遗留）标记为失败；配置了 pending TTL 时排队过久的任务置为过期
+- 服务临时文件目录（utils.scratch）中超过 tmp_max_age_s 且不属于未结束任务的文件删除
+- 结果目录（jobs.results_dir、bulk.results_dir）中所属任务已不存在的结果文件删除
+每次执行的回收数量与字节数累计到 /admin/status 的 maintenance 字段
+"""
+
+import asyncio
+import os
+import re
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from core.bulk import bulk_config
+from core.cancellation import cancel_stats
+from core.job_queue import job_queue
+from core.job_store import (
+    STATUS_CANCELLED, STATUS_COMPLETED, STATUS_EXPIRED, STATUS_FAILED, STATUS_PENDING, job_store,
+)
+from utils.logger import get_logger
+from utils.scratch import scratch_dir
+
+logger = get_logger(__name__)
+
+DEFAULT_INTERVAL_S = 300
+DEFAULT_TMP_MAX_AGE_S = 21600
+# 结果文件最近修改后的保护时长（秒），正在写入的结果（含 .tmp）与刚完成的任务不会被误判为无主文件
+DEFAULT_RESULT_GRACE_S = 600
+# 任务结果文件名：<job_id>.json / .json.zst / .json.gz（任务结果）或 .jsonl（批量结果），写入中带 .tmp 后缀；
+# 结果目录中的其他文件不属于本服务，不回收
+RESULT_FILE_PATTERN = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-4[0-9a-f]{3}-[89ab][0-9a-f]{3}-[0-9a-f]{12}"
+    r"\.(?:json(?:\.zst|\.gz)?|jsonl)(?:\.tmp)?$"
+)
+# 各状态任务的保留时长（秒），0 表示不按时间清理（仍受 jobs.max_jobs 容量淘汰）
+DEFAULT_JOB_TTL_S = {
+    STATUS_COMPLETED: 86400,
+    STATUS_FAILED: 86400,
+    STATUS_CANCELLED: 3600,
+    STATUS_EXPIRED: 3600,
+    STATUS_PENDING: 0,
+}
+# 单次执行每种状态最多删除的任务数，避免积压时长时间占用事件循环
+PURGE_BATCH = 1000
+
+
+class MaintenanceService:
+    """后台维护任务"""
+
+    def __init__(self):
+        self.enabled = False
+        self.interval_s = DEFAULT_INTERVAL_S
+        self.tmp_max_age_s = DEFAULT_TMP_MAX_AGE_S
+        self.result_grace_s = DEFAULT_RESULT_GRACE_S
+        self.job_ttl_s: Dict[str, float] = dict(DEFAULT_JOB_TTL_S)
+        self._result_dirs: List[str] = []
+        self._task: Optional[asyncio.Task] = None
+        self._on_terminated: Optional[Callable[[str], None]] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self.runs = 0
+        self.last_run_at: Optional[float] = None
+        self.last_report: Optional[Dict[str, Any]] = None
+        self.jobs_removed: Dict[str, int] = {}
+        self.files_removed = 0
+        self.bytes_reclaimed = 0
+
+    async def start(self, config: Dict[str, Any], on_terminated: Optional[Callable[[str], None]] = None) -> None:
+        """
+        根据 config.yaml 的 maintenance 节启动周期任务
+        on_terminated(job_id)：待处理任务被标记为失败/过期后调用（投递任务回调）
+        """
+        maintenance_cfg = config.get("maintenance") or {}
+        self.interval_s = max(1.0, float(maintenance_cfg.get("interval_s", DEFAULT_INTERVAL_S)))
+        self.tmp_max_age_s = max(0.0, float(maintenance_cfg.get("tmp_max_age_s", DEFAULT_TMP_MAX_AGE_S)))
+        self.result_grace_s = max(0.0, float(maintenance_cfg.get("result_grace_s", DEFAULT_RESULT_GRACE_S)))
+        self.job_ttl_s = dict(DEFAULT_JOB_TTL_S)
+        for status, ttl in (maintenance_cfg.get("job_ttl_s") or {}).items():
+            if status not in DEFAULT_JOB_TTL_S:
+                raise ValueError(f"maintenance.job_ttl_s 不支持的任务状态: {status}")
+            self.job_ttl_s[status] = max(0.0, float(ttl or 0))
+        self._result_dirs = [job_store.results_dir, bulk_config(config)["results_dir"]]
+        self._lock = asyncio.Lock()
+        self._on_terminated = on_terminated
+        if not maintenance_cfg.get("enabled", True):
+            logger.info("后台维护任务已禁用")
+            return
+        self.enabled = True
+        self._task = asyncio.create_task(self._loop())
+        logger.info(
+            f"后台维护任务已启动: interval_s={self.interval_s}, tmp_max_age_s={self.tmp_max_age_s}, "
+            f"job_ttl_s={self.job_ttl_s}, scratch_dir={scratch_dir()}"
+        )
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        self.enabled = False
+
+    async def run_once(self) -> Dict[str, Any]:
+        """执行一次清理，返回本次回收的任务数、文件数与字节数"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            start = time.time()
+            report: Dict[str, Any] = {
+                "jobs_removed": {},
+                "orphaned_jobs": 0,
+                "pending_expired": 0,
+                "tmp_files": 0,
+                "result_files": 0,
+                "bytes_reclaimed": 0,
+            }
+            self._sweep_jobs(report, start)
+            await self._reap_files(report, start)
+            report["duration_ms"] = int((time.time() - start) * 1000)
+            self.runs += 1
+            self.last_run_at = start
+            self.last_report = report
+            for status, count in report["jobs_removed"].items():
+                self.jobs_removed[status] = self.jobs_removed.get(status, 0) + count
+            self.files_removed += report["tmp_files"] + report["result_files"]
+            self.bytes_reclaimed += report["bytes_reclaimed"]
+            if report["bytes_reclaimed"] or report["jobs_removed"] or report["orphaned_jobs"]:
+                logger.info(f"后台维护完成: {report}")
+            return report
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "interval_s": self.interval_s,
+            "tmp_max_age_s": self.tmp_max_age_s,
+            "result_grace_s": self.result_grace_s,
+            "job_ttl_s": self.job_ttl_s,
+            "scratch_dir": scratch_dir(),
+            "runs": self.runs,
+            "last_run_at": self.last_run_at,
+            "last_report": self.last_report,
+            "jobs_removed": dict(self.jobs_removed),
+            "files_removed": self.files_removed,
+            "bytes_reclaimed": self.bytes_reclaimed,
+        }
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval_s)
+            try:
+                await self.run_once()
+            except Exception as e:
+                logger.error(f"后台维护失败: {e}")
+
+    def _sweep_jobs(self, report: Dict[str, Any], now: float) -> None:
+        """TTL 清理已结束的任务；处理临时音频丢失或排队超时的待处理任务"""
+        for status, ttl in self.job_ttl_s.items():
+            if status == STATUS_PENDING or not ttl:
+                continue
+            purged = job_store.purge_finished(status, now - ttl, PURGE_BATCH)
+            if purged["jobs"]:
+                report["jobs_removed"][status] = purged["jobs"]
+            report["bytes_reclaimed"] += purged["bytes"]
+        pending_ttl = self.job_ttl_s.get(STATUS_PENDING)
+        for job in job_store.list_unfinished():
+            if job["status"] != STATUS_PENDING:
+                continue
+            job_id = job["job_id"]
+            tmp_path = job.get("tmp_path")
+            if not tmp_path or not os.path.exists(tmp_path):
+                job_store.set_failed(job_id, "临时文件丢失")
+                job_queue.cancel(job_id)
+                report["orphaned_jobs"] += 1
+            elif pending_ttl and job["created_at"] < now - pending_ttl:
+                job_store.set_expired(job_id, "排队超过保留时长")
+                job_queue.cancel(job_id)
+                cancel_stats.record_expired("jobs")
+                cancel_stats.dropped_queued += 1
+                report["bytes_reclaimed"] += _remove_files([job_store.pop_tmp_path(job_id)])[1]
+                report["pending_expired"] += 1
+            else:
+                continue
+            if self._on_terminated:
+                self._on_terminated(job_id)
+
+    async def _reap_files(self, report: Dict[str, Any], now: float) -> None:
+        """回收临时文件目录中的遗留文件与已无所属任务的结果文件（文件扫描与删除在线程中执行）"""
+        # 未结束任务的临时音频/清单（可能排队较久）不回收
+        live = {os.path.realpath(job["tmp_path"]) for job in job_store.list_unfinished() if job.get("tmp_path")}
+        tmp_candidates = await asyncio.to_thread(_list_files, [scratch_dir()], now - self.tmp_max_age_s)
+        tmp_stale = [path for path in tmp_candidates if os.path.realpath(path) not in live]
+        result_candidates = await asyncio.to_thread(_list_files, self._result_dirs, now - self.result_grace_s)
+        # 只回收文件名符合任务结果命名且所属任务已被删除或淘汰的文件
+        orphaned = [
+            path for path in result_candidates
+            if RESULT_FILE_PATTERN.match(os.path.basename(path)) and job_store.get(_job_id_of(path)) is None
+        ]
+        count, size = await asyncio.to_thread(_remove_files, tmp_stale)
+        report["tmp_files"] += count
+        report["bytes_reclaimed"] += size
+        count, size = await asyncio.to_thread(_remove_files, orphaned)
+        report["result_files"] += count
+        report["bytes_reclaimed"] += size
+
+
+def _job_id_of(path: str) -> str:
+    return os.path.basename(path).split(".", 1)[0]
+
+
+def _list_files(directories: Iterable[str], before: float) -> List[str]:
+    """目录（不递归）中修改时间早于 before 的普通文件"""
+    paths = []
+    for directory in directories:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_file(follow_symlinks=False) and entry.stat().st_mtime < before:
+                    paths.append(entry.path)
+            except OSError:
+                continue
+    return paths
+
+
+def _remove_files(paths: Iterable[Optional[str]]) -> Tuple[int, int]:
+    """删除文件，返回 (删除数, 释放字节数)；已被其他进程删除的文件忽略"""
+    count = size = 0
+    for path in paths:
+        if not path:
+            continue
+        try:
+            file_size = os.path.getsize(path)
+            os.unlink(path)
+        except OSError:
+            continue
+        count += 1
+        size += file_size
+    return count, size
+
+
+# 全局单例
+maintenance = MaintenanceService()
@@ -0,0 +1,292 @@
+"""
+批量识别流水线 - 将多个请求的 VAD 分段合并为批次送入 ASR/LID/Punc
+输出结构与 FireRedAsr2System.process 保持一致
+
+音频输入可以是 WAV 路径，也可以是内存中的 (sample_rate, int16 样本数组)，
+后者按 FireRedAsr2System 内部约定直接交给 VAD/LID/ASR 模型，不经过文件系统。
+安装了共享前端（core.adapters.SharedFrontend，models.shared_frontend）时，音频只读取一次、fbank 只计算一次，
+VAD/LID/ASR 均使用内存样本，各分段的特征从整段 fbank 按帧偏移切片。
+"""
+
+import wave
+from contextlib import nullcontext
+from typing import Dict, Any, Iterator, List, Tuple, Union
+
+import numpy as np
+
+from core.adapters import beam_size_scope
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+def load_wav_int16(wav_path: str) -> Tuple[np.ndarray, int]:
+    """读取 16-bit PCM WAV，返回 (int16 样本数组, 采样率)；多声道时取第一声道"""
+    with wave.open(wav_path, 'rb') as wav:
+        sample_rate = wav.getframerate()
+        channels = wav.getnchannels()
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"仅支持 16-bit PCM WAV: {wav_path}")
+        frames = wav.readframes(wav.getnframes())
+    samples = np.frombuffer(frames, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels)[:, 0]
+    return samples, sample_rate
+
+
+def mmap_wav_int16(wav_path: str) -> Tuple[np.ndarray, int]:
+    """
+    以内存映射方式打开 16-bit mono PCM WAV，返回 (只读 int16 样本视图, 采样率)；
+    长音频按分段切片时不复制整段样本。非 mono 时回退为 load_wav_int16
+    """
+    with wave.open(wav_path, 'rb') as wav:
+        sample_rate = wav.getframerate()
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        n_frames = wav.getnframes()
+    if channels != 1 or sample_width != 2:
+        return load_wav_int16(wav_path)
+    with open(wav_path, 'rb') as f:
+        head = f.read(64 * 1024)
+    offset = 12
+    while offset + 8 <= len(head):
+        chunk_id = head[offset:offset + 4]
+        chunk_size = int.from_bytes(head[offset + 4:offset + 8], 'little')
+        if chunk_id == b'data':
+            if n_frames == 0:
+                return np.zeros(0, dtype=np.int16), sample_rate
+            return np.memmap(wav_path, dtype=np.int16, mode='r', offset=offset + 8, shape=(n_frames,)), sample_rate
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return load_wav_int16(wav_path)
+
+
+def load_audio_input(audio: Union[str, Tuple[int, np.ndarray]]) -> Tuple[np.ndarray, int]:
+    """将 WAV 路径或 (sample_rate, samples) 统一为 (samples, sample_rate)"""
+    if isinstance(audio, str):
+        return load_wav_int16(audio)
+    sample_rate, samples = audio
+    return samples, sample_rate
+
+
+def transcribe_audio(asr_system: Any, audio: Union[str, Tuple[int, np.ndarray]], uttid: str) -> Dict[str, Any]:
+    """单条识别：WAV 路径走 FireRedAsr2System.process，内存音频或已安装共享前端时走 TranscribePipeline"""
+    if isinstance(audio, str) and getattr(asr_system, 'shared_frontend', None) is None:
+        with beam_size_scope(asr_system.asr):
+            return asr_system.process(audio, uttid)
+    return TranscribePipeline(asr_system).process_batch([(audio, uttid)])[0]
+
+
+def join_sentences(texts: List[str]) -> str:
+    """拼接分句文本，相邻两侧均为 ASCII 字母数字时补空格（英文），否则直接拼接（中文）"""
+    merged = ""
+    for text in texts:
+        if not text:
+            continue
+        if merged and merged[-1].isascii() and merged[-1].isalnum() and text[0].isascii() and text[0].isalnum():
+            merged += " "
+        merged += text
+    return merged
+
+
+class TranscribePipeline:
+    """
+    对多条音频执行 VAD→ASR→LID→Punc，跨请求合并分段做批量推理。
+    批大小取自 FireRedAsr2SystemConfig 的 asr_batch_size / punc_batch_size。
+    """
+
+    def __init__(self, asr_system: Any):
+        self._system = asr_system
+        cfg = asr_system.config
+        self.asr_batch_size = max(1, int(getattr(cfg, 'asr_batch_size', 1) or 1))
+        self.punc_batch_size = max(1, int(getattr(cfg, 'punc_batch_size', 1) or 1))
+        self.enable_vad = bool(getattr(cfg, 'enable_vad', False)) and asr_system.vad is not None
+        self.enable_lid = bool(getattr(cfg, 'enable_lid', False)) and asr_system.lid is not None
+        self.enable_punc = bool(getattr(cfg, 'enable_punc', False)) and asr_system.punc is not None
+        self.frontend = getattr(asr_system, 'shared_frontend', None)
+
+    def process_batch(self, items: List[Tuple[Any, str]]) -> List[Dict[str, Any]]:
+        """
+        批量识别
+        Args:
+            items: [(audio, uttid), ...]，audio 为 16kHz 16-bit mono PCM WAV 路径或 (sample_rate, samples)
+        Returns:
+            与 items 一一对应的识别结果列表
+        """
+        # 1. 读取音频并做 VAD 分段
+        audios = []
+        caches = []
+        segments = []  # [(item_idx, start_s, end_s), ...]
+        for idx, (audio, _) in enumerate(items):
+            samples, sample_rate = load_audio_input(audio)
+            dur = len(samples) / float(sample_rate)
+            audios.append((samples, sample_rate, dur))
+            timestamps, cache = self._detect(audio, samples, sample_rate, dur)
+            caches.append(cache)
+            for start, end in timestamps:
+                segments.append((idx, start, end))
+
+        # 2. 按时长排序后分批 ASR，减少批内 padding
+        seg_results: List[Dict[str, Any]] = [{} for _ in segments]
+        order = sorted(range(len(segments)), key=lambda i: segments[i][2] - segments[i][1])
+        for b in range(0, len(order), self.asr_batch_size):
+            batch_idx = order[b:b + self.asr_batch_size]
+            batch_uttid = [self._segment_uttid(items, segments[i]) for i in batch_idx]
+            batch_wav = [self._segment_input(audios, segments[i]) for i in batch_idx]
+            with self._features(caches):
+                decoded = self.decode_segments(batch_uttid, batch_wav)
+            for i, r in zip(batch_idx, decoded):
+                seg_results[i] = r
+
+        # 3. 对非空文本批量加标点
+        if self.enable_punc:
+            uttids = [self._segment_uttid(items, segment) for segment in segments]
+            self.punctuate(seg_results, uttids)
+
+        # 4. 按请求组装结果
+        outputs = [self.empty_result(uttid, audios[idx][2]) for idx, (_, uttid) in enumerate(items)]
+        for (idx, start, end), r in zip(segments, seg_results):
+            self.append_segment(outputs[idx], start, end, r)
+        for out in outputs:
+            out['text'] = join_sentences([s['text'] for s in out['sentences']])
+        return outputs
+
+    def iter_transcribe(self, audio: Any, uttid: str) -> Iterator[Tuple[str, Dict[str, Any]]]:
+        """
+        单条音频的增量识别：VAD 后按时间顺序分批解码，每批完成即产出其中的分句
+        Yields:
+            ('start', {'uttid', 'dur_s', 'vad_segments_ms'})
+            ('sentence', {start_ms, end_ms, text, asr_confidence, [lang, lang_confidence], words})，按时间顺序
+            ('result', 与 process_batch 相同结构的完整结果)
+        """
+        samples, sample_rate = load_audio_input(audio)
+        dur = len(samples) / float(sample_rate)
+        items = [(audio, uttid)]
+        audios = [(samples, sample_rate, dur)]
+        timestamps, cache = self._detect(audio, samples, sample_rate, dur)
+        segments = [(0, start, end) for start, end in timestamps]
+        out = self.empty_result(uttid, dur)
+        yield 'start', {
+            'uttid': uttid,
+            'dur_s': out['dur_s'],
+            'vad_segments_ms': [(int(start * 1000), int(end * 1000)) for _, start, end in segments],
+        }
+
+        # 不按时长排序：按时间顺序分批，前面的分句先返回
+        for b in range(0, len(segments), self.asr_batch_size):
+            batch = segments[b:b + self.asr_batch_size]
+            uttids = [self._segment_uttid(items, segment) for segment in batch]
+            # 每一步可能在不同的推理线程中执行，特征缓存只在本批解码期间对当前线程可见
+            with self._features([cache]):
+                seg_results = self.decode_segments(uttids, [self._segment_input(audios, segment) for segment in batch])
+            if self.enable_punc:
+                self.punctuate(seg_results, uttids)
+            for (_, start, end), r in zip(batch, seg_results):
+                n_sentences, n_words = len(out['sentences']), len(out['words'])
+                self.append_segment(out, start, end, r)
+                if len(out['sentences']) > n_sentences:
+                    yield 'sentence', {**out['sentences'][-1], 'words': out['words'][n_words:]}
+        out['text'] = join_sentences([s['text'] for s in out['sentences']])
+        yield 'result', out
+
+    def _detect(
+        self,
+        audio: Any,
+        samples: np.ndarray,
+        sample_rate: int,
+        dur: float,
+    ) -> Tuple[List[Tuple[float, float]], Any]:
+        """
+        VAD 分段，返回 ([(start_s, end_s), ...], 整段 fbank 缓存)。
+        启用共享前端时先计算整段 fbank，VAD 使用已读取的内存样本，LID/ASR 的分段特征从缓存切片
+        """
+        cache = None
+        if self.frontend is not None:
+            cache = self.frontend.compute(samples, sample_rate)
+            audio = (sample_rate, samples)
+        if self.enable_vad:
+            with self._features([cache]):
+                vad_result, _ = self._system.vad.detect(audio)
+            timestamps = [(float(start), float(end)) for start, end in vad_result.get('timestamps', [])]
+        else:
+            timestamps = [(0.0, dur)]
+        return timestamps, cache
+
+    def _features(self, caches: List[Any]):
+        """调用 VAD/LID/ASR 期间在当前线程激活本请求的 fbank 缓存（未安装共享前端时为空操作）"""
+        if self.frontend is None:
+            return nullcontext()
+        return self.frontend.activate(caches)
+
+    def decode_segments(self, batch_uttid: List[str], batch_wav: List[Any]) -> List[Dict[str, Any]]:
+        """一批分段的 ASR（及 LID），返回 [{'asr': ..., 'lid': ...}, ...]"""
+        with beam_size_scope(self._system.asr):
+            asr_results = self._system.asr.transcribe(batch_uttid, batch_wav)
+        seg_results: List[Dict[str, Any]] = [{'asr': r} for r in asr_results]
+        if self.enable_lid:
+            for seg, r in zip(seg_results, self._system.lid.process(batch_uttid, batch_wav)):
+                seg['lid'] = r
+        return seg_results
+
+    def punctuate(self, seg_results: List[Dict[str, Any]], uttids: List[str]) -> None:
+        """对非空分段文本按 punc_batch_size 批量加标点，结果写入 seg_results[i]['punc']"""
+        text_idx = [i for i, r in enumerate(seg_results) if r.get('asr', {}).get('text')]
+        for b in range(0, len(text_idx), self.punc_batch_size):
+            batch_idx = text_idx[b:b + self.punc_batch_size]
+            batch_text = [seg_results[i]['asr']['text'] for i in batch_idx]
+            batch_uttid = [uttids[i] for i in batch_idx]
+            for i, r in zip(batch_idx, self._system.punc.process(batch_text, batch_uttid)):
+                seg_results[i]['punc'] = r
+
+    @staticmethod
+    def _segment_uttid(items: List[Tuple[Any, str]], segment: Tuple[int, float, float]) -> str:
+        idx, start, end = segment
+        return f"{items[idx][1]}_s{int(start * 1000)}_e{int(end * 1000)}"
+
+    @staticmethod
+    def _segment_bounds(start: float, end: float, sample_rate: int) -> Tuple[int, int]:
+        """分段的样本范围；四舍五入使 10ms 粒度的时间戳落在 fbank 帧边界上"""
+        return int(round(start * sample_rate)), int(round(end * sample_rate))
+
+    @classmethod
+    def _segment_input(cls, audios: list, segment: Tuple[int, float, float]) -> Tuple[int, np.ndarray]:
+        """切出分段样本（视图），按 FireRedAsr2System 内部约定以 (sample_rate, samples) 形式传给模型"""
+        idx, start, end = segment
+        samples, sample_rate, _ = audios[idx]
+        begin, finish = cls._segment_bounds(start, end, sample_rate)
+        return sample_rate, samples[begin:finish]
+
+    @staticmethod
+    def empty_result(uttid: str, dur: float) -> Dict[str, Any]:
+        return {
+            'uttid': uttid,
+            'text': '',
+            'sentences': [],
+            'vad_segments_ms': [],
+            'dur_s': round(dur, 3),
+            'words': [],
+        }
+
+    @staticmethod
+    def append_segment(out: Dict[str, Any], start: float, end: float, r: Dict[str, Any]) -> None:
+        start_ms, end_ms = int(start * 1000), int(end * 1000)
+        out['vad_segments_ms'].append((start_ms, end_ms))
+        asr = r.get('asr', {})
+        text = asr.get('text', '')
+        if not text:
+            return
+        sentence = {
+            'start_ms': start_ms,
+            'end_ms': end_ms,
+            'text': r['punc'].get('punc_text', text) if 'punc' in r else text,
+            'asr_confidence': asr.get('confidence', 0.0),
+        }
+        if 'lid' in r:
+            sentence['lang'] = r['lid'].get('lang', '')
+            sentence['lang_confidence'] = r['lid'].get('confidence', 0.0)
+        out['sentences'].append(sentence)
+        for token, t_start, t_end in asr.get('timestamp', []) or []:
+            out['words'].append({
+                'start_ms': start_ms + int(float(t_start) * 1000),
+                'end_ms': start_ms + int(float(t_end) * 1000),
+                'text': token,
+            })
@@ -4,25 +4,31 @@
 """
 
 import asyncio
-import os
 import time
 import uuid
-from io import BytesIO
 from types import SimpleNamespace
 from fastapi import UploadFile
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, Callable, Optional
+from core.inference_executor import inference_executor
+from core.result_cache import result_cache, config_fingerprint
 from utils.logger import get_logger
-from utils.audio_validator import prepare_audio_for_asr
+from core.cancellation import DeadlineExceeded, cancel_stats
+from core.pipeline import TranscribePipeline, transcribe_audio
+from core.long_form import LongFormTranscriber
+from utils.audio_validator import (
+    load_audio_for_inference,
+    load_pcm_body,
+    prepare_local_audio,
+    release_audio,
+)
 from utils.config_loader import get_config
 
 logger = get_logger(__name__)
 
 
 def _make_upload_like(file_path: str, filename: str):
-    """从本地文件路径构造 UploadFile 兼容对象，供 prepare_audio_for_asr 使用"""
-    with open(file_path, "rb") as f:
-        content = f.read()
-    return SimpleNamespace(filename=filename, file=BytesIO(content))
+    """从本地文件路径构造 UploadFile 兼容对象，供 prepare_audio_for_asr 使用（按需分块读取，不整体载入内存）"""
+    return SimpleNamespace(filename=filename, file=open(file_path, "rb"))
 
 
 class RequestProcessor:
@@ -38,9 +44,14 @@ class RequestProcessor:
         audio_file: UploadFile,
         asr_system,
         uttid: str = None,
+        scheduler=None,
+        reject_when_busy: bool = True,
     ) -> Dict[str, Any]:
         """
         一站式语音识别，调用 FireRedAsr2System.process 执行完整流水线。
+        传入 scheduler（MicroBatchScheduler）时与并发请求合并为批量推理。
+        推理在 asr 专用线程池中执行；reject_when_busy=True 时队列满抛出 ExecutorBusyError。
+        转码（含转码进程池排队）期间不占用 asr 槽位，解码完成后才进入 asr 队列。
         Returns: {
             'uttid': str, 'text': str, 'dur_s': float,
             'sentences': [...], 'vad_segments_ms': [...],
@@ -49,35 +60,186 @@ class RequestProcessor:
         """
         if not asr_system:
             raise ValueError("ASR System 未加载，请检查服务配置")
+        if reject_when_busy:
+            # asr 队列已满时在转码前拒绝，不做无用的解码
+            inference_executor.check_capacity('asr')
 
         start_time = time.time()
         uttid = uttid or str(uuid.uuid4())
-        tmp_path = None
+        audio = None
 
         try:
-            audio_info, tmp_path = prepare_audio_for_asr(audio_file, self.config)
+            # 转码/解码在线程中执行；processing.in_memory_decode 开启时 audio 为内存样本，不落盘
+            audio_info, audio = await asyncio.to_thread(load_audio_for_inference, audio_file, self.config)
             logger.info(
                 f"音频准备成功: {audio_info['filename']}, 时长: {audio_info['duration']:.2f}s"
                 f"{', 已转码' if audio_info.get('transcoded') else ''}"
             )
 
-            result = await asyncio.to_thread(asr_system.process, tmp_path, uttid)
+            return await self._infer(audio_info, audio, asr_system, uttid, scheduler, start_time, reject_when_busy)
+        except Exception as e:
+            logger.error(f"语音识别失败: {e}")
+            raise
+        finally:
+            if audio is not None:
+                release_audio(audio)
 
-            result.pop("wav_path", None)
-            result["processing_time_ms"] = int((time.time() - start_time) * 1000)
+    async def _infer(
+        self,
+        audio_info: Dict[str, Any],
+        audio,
+        asr_system,
+        uttid: str,
+        scheduler,
+        start_time: float,
+        reject_when_busy: bool,
+    ) -> Dict[str, Any]:
+        """结果缓存查询 + 一站式推理（微批调度器或 asr 线程池），仅推理期间占用 asr 槽位"""
+        # 相同音频内容 + 相同模型配置直接返回缓存结果，跳过整条流水线
+        cache_key = None
+        if result_cache.enabled and audio_info.get('sha256'):
+            cache_key = result_cache.make_key(audio_info['sha256'], config_fingerprint(asr_system))
+            cache_generation = result_cache.generation
+            cached = await asyncio.to_thread(result_cache.get, cache_key)
+            if cached is not None:
+                cached["uttid"] = uttid
+                cached["cached"] = True
+                cached["processing_time_ms"] = int((time.time() - start_time) * 1000)
+                logger.info(f"命中结果缓存: uttid={uttid}, 耗时={cached['processing_time_ms']}ms")
+                return cached
 
-            logger.info(f"识别完成: uttid={uttid}, 耗时={result['processing_time_ms']}ms")
-            return result
+        async with inference_executor.slot('asr', reject=reject_when_busy):
+            if scheduler is not None:
+                result = await scheduler.submit((audio, uttid))
+            else:
+                result = await inference_executor.run('asr', transcribe_audio, asr_system, audio, uttid)
+
+        result.pop("wav_path", None)
+        if cache_key is not None:
+            await asyncio.to_thread(result_cache.put, cache_key, result, cache_generation)
+        result["processing_time_ms"] = int((time.time() - start_time) * 1000)
 
+        logger.info(f"识别完成: uttid={uttid}, 耗时={result['processing_time_ms']}ms")
+        return result
+
+    async def transcribe_pcm(
+        self,
+        chunks: AsyncIterator[bytes],
+        sample_format: str,
+        asr_system,
+        uttid: str = None,
+        scheduler=None,
+    ) -> Dict[str, Any]:
+        """
+        识别原始 PCM 请求体（16kHz mono，sample_format 见 PCM_FORMATS）：
+        样本直接以 (sample_rate, samples) 送入流水线，不经过 multipart 解析、临时文件与转码。
+        准入检查在读取请求体之前完成，队列满时抛出 ExecutorBusyError；读取请求体期间不占用 asr 槽位
+        """
+        if not asr_system:
+            raise ValueError("ASR System 未加载，请检查服务配置")
+        inference_executor.check_capacity('asr')
+
+        start_time = time.time()
+        uttid = uttid or str(uuid.uuid4())
+        audio_info, audio = await load_pcm_body(chunks, sample_format, self.config)
+        logger.info(f"PCM 音频读取成功: 格式={sample_format}, 时长: {audio_info['duration']:.2f}s")
+        return await self._infer(audio_info, audio, asr_system, uttid, scheduler, start_time, True)
+
+    async def transcribe_stream(
+        self,
+        audio_file: UploadFile,
+        asr_system,
+        uttid: str = None,
+        deadline_ms: Optional[int] = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        增量识别（/system/transcribe stream=true）：VAD 后按时间顺序分批解码，每批完成即产出分句记录。
+        依次产出 {'type': 'start', 'uttid', 'dur_s', 'vad_segments_ms'}、
+        {'type': 'sentence', 'start_ms', 'end_ms', 'text', 'words', ...}（按时间顺序）、
+        {'type': 'result', ...完整结果，与非流式响应的 data 相同}。
+        逐请求执行，不经过微批调度器；命中结果缓存时直接回放缓存结果中的分句。
+        准入检查与音频解码在产出第一条记录前完成（队列满抛出 ExecutorBusyError）；
+        超过 deadline_ms 时在下一批分段处抛出 DeadlineExceeded。
+        """
+        if not asr_system:
+            raise ValueError("ASR System 未加载，请检查服务配置")
+        # asr 队列已满时在转码前拒绝，不做无用的解码
+        inference_executor.check_capacity('asr')
+
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + deadline_ms / 1000.0 if deadline_ms else None
+        uttid = uttid or str(uuid.uuid4())
+        audio = None
+        # 超过截止时间后仍在推理线程中执行的一步，释放音频前须等待其结束
+        inflight: Optional[asyncio.Future] = None
+
+        async def step(fn, *args):
+            """在 asr 线程池中执行一步，超过截止时间时不再等待"""
+            nonlocal inflight
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    cancel_stats.record_expired("sync")
+                    raise DeadlineExceeded(f"超过截止时间 {deadline_ms}ms")
+            inflight = asyncio.ensure_future(inference_executor.run('asr', fn, *args))
+            done, _ = await asyncio.wait({inflight}, timeout=timeout)
+            if not done:
+                cancel_stats.record_expired("sync")
+                raise DeadlineExceeded(f"超过截止时间 {deadline_ms}ms")
+            future, inflight = inflight, None
+            return future.result()
+
+        try:
+            # 转码期间不占用 asr 槽位，解码完成后才进入 asr 队列
+            audio_info, audio = await asyncio.to_thread(load_audio_for_inference, audio_file, self.config)
+            logger.info(f"音频准备成功（流式响应）: {audio_info['filename']}, 时长: {audio_info['duration']:.2f}s")
+
+            cache_key = None
+            if result_cache.enabled and audio_info.get('sha256'):
+                cache_key = result_cache.make_key(audio_info['sha256'], config_fingerprint(asr_system))
+                cache_generation = result_cache.generation
+                cached = await asyncio.to_thread(result_cache.get, cache_key)
+                if cached is not None:
+                    cached["uttid"] = uttid
+                    cached["cached"] = True
+                    yield {
+                        'type': 'start', 'uttid': uttid,
+                        'dur_s': cached.get('dur_s'), 'vad_segments_ms': cached.get('vad_segments_ms', []),
+                    }
+                    for sentence in cached.get('sentences', []):
+                        words = [w for w in cached.get('words', [])
+                                 if sentence['start_ms'] <= w['start_ms'] < sentence['end_ms']]
+                        yield {'type': 'sentence', **sentence, 'words': words}
+                    cached["processing_time_ms"] = int((time.time() - start_time) * 1000)
+                    yield {'type': 'result', **cached}
+                    return
+
+            async with inference_executor.slot('asr'):
+                stages = TranscribePipeline(asr_system).iter_transcribe(audio, uttid)
+                try:
+                    while True:
+                        stage = await step(next, stages, None)
+                        if stage is None:
+                            break
+                        kind, record = stage
+                        if kind == 'result':
+                            if cache_key is not None:
+                                await asyncio.to_thread(result_cache.put, cache_key, record, cache_generation)
+                            record["processing_time_ms"] = int((time.time() - start_time) * 1000)
+                            logger.info(f"识别完成（流式响应）: uttid={uttid}, 耗时={record['processing_time_ms']}ms")
+                        yield {'type': kind, **record}
+                finally:
+                    if inflight is not None:
+                        # 推理线程无法中断：等待在途的一步结束（期间仍占用槽位），之后才能释放音频
+                        await asyncio.wait({inflight})
         except Exception as e:
             logger.error(f"语音识别失败: {e}")
             raise
         finally:
-            if tmp_path and os.path.exists(tmp_path):
-                try:
-                    os.unlink(tmp_path)
-                except OSError as oe:
-                    logger.warning(f"清理临时文件失败: {oe}")
+            if audio is not None:
+                release_audio(audio)
 
     async def transcribe_from_path(
         self,
@@ -85,9 +247,11 @@ class RequestProcessor:
         filename: str,
         asr_system,
         uttid: str = None,
+        scheduler=None,
     ) -> Dict[str, Any]:
         """
         从本地文件路径执行一站式语音识别（用于异步任务）。
+        后台任务不会因队列满被拒绝（准入在提交时检查），但仍计入队列深度。
         调用方负责在调用完成后删除 file_path。
         """
         upload_like = _make_upload_like(file_path, filename)
@@ -96,7 +260,62 @@ class RequestProcessor:
                 audio_file=upload_like,
                 asr_system=asr_system,
                 uttid=uttid,
+                scheduler=scheduler,
+                reject_when_busy=False,
             )
         finally:
             if hasattr(upload_like.file, "close"):
                 upload_like.file.close()  # type: ignore
+
+    async def transcribe_local_file(
+        self,
+        file_path: str,
+        asr_system,
+        uttid: str = None,
+        scheduler=None,
+    ) -> Dict[str, Any]:
+        """
+        识别服务器本地音频（批量清单任务）：已是 16kHz mono WAV 时直接读取原文件，不复制到临时文件。
+        与后台任务相同，不因队列满被拒绝但计入队列深度。
+        """
+        if not asr_system:
+            raise ValueError("ASR System 未加载，请检查服务配置")
+        start_time = time.time()
+        uttid = uttid or str(uuid.uuid4())
+        # 转码期间不占用 asr 槽位
+        audio_info, wav_path = await asyncio.to_thread(prepare_local_audio, file_path, self.config)
+        try:
+            return await self._infer(audio_info, wav_path, asr_system, uttid, scheduler, start_time, False)
+        finally:
+            if wav_path != file_path:
+                release_audio(wav_path)
+
+    async def transcribe_long_form(
+        self,
+        file_path: str,
+        filename: str,
+        asr_system,
+        uttid: str = None,
+        on_progress: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        长音频分段并行识别（异步任务 long_form 模式），使用 long_form 节的时长限制。
+        调用方负责在调用完成后删除 file_path。
+        """
+        if not asr_system:
+            raise ValueError("ASR System 未加载，请检查服务配置")
+        start_time = time.time()
+        uttid = uttid or str(uuid.uuid4())
+        wav_path = None
+        try:
+            # 已落盘的音频就地校验，标准 WAV 不复制；转码期间不占用 asr 槽位
+            audio_info, wav_path = await asyncio.to_thread(prepare_local_audio, file_path, self.config, True)
+            logger.info(f"长音频准备成功: {filename}, 时长: {audio_info['duration']:.2f}s")
+            transcriber = LongFormTranscriber(asr_system, self.config)
+            async with inference_executor.slot('asr', reject=False):
+                result = await transcriber.transcribe(wav_path, uttid, on_progress=on_progress)
+            result["processing_time_ms"] = int((time.time() - start_time) * 1000)
+            return result
+        finally:
+            if wav_path is not None and wav_path != file_path:
+                release_audio(wav_path)
@@ -4,6 +4,7 @@ Punc 处理器 - 标点预测
 
 import uuid
 from typing import List, Dict, Any
+from core.inference_executor import inference_executor
 from utils.logger import get_logger
 
 logger = get_logger(__name__)
@@ -12,9 +13,10 @@ logger = get_logger(__name__)
 class PuncProcessor:
     """标点预测处理器"""
     
-    def __init__(self, model_manager):
-        """初始化 Punc 处理器"""
+    def __init__(self, model_manager, punc_service=None):
+        """初始化 Punc 处理器；传入 punc_service（PuncService）时走批处理与缓存路径"""
         self.model_manager = model_manager
+        self.punc_service = punc_service
         self.logger = logger
         
     async def predict(
@@ -25,6 +27,7 @@ class PuncProcessor:
         """
         标点预测
         Returns: {'results': [{'punc_text': str, 'origin_text': str, 'uttid': str}, ...]}
+        经 punc_service 处理时另含 'batches'（每批大小、最长字数与耗时）与 'cache_hits'
         """
         if not texts:
             return {'results': []}
@@ -37,12 +40,16 @@ class PuncProcessor:
             raise ValueError("texts 和 uttids 长度不一致")
         
         try:
+            if self.punc_service is not None:
+                return await self.punc_service.predict(texts, uttids)
+
             # 调用 Punc 模型
             punc_model = self.model_manager.get_model('punc')
             if not punc_model:
                 raise RuntimeError("Punc 模型未加载")
             
-            results = punc_model.predict(texts, uttids)
+            # 在 punc 专用线程池中推理，不阻塞事件循环
+            results = await inference_executor.call('punc', punc_model.predict, texts, uttids)
             
             return {'results': results}
         except Exception as e:
@@ -0,0 +1,187 @@
+"""
+标点服务 - /modules/punc/predict 的批处理与缓存
+- 大请求：去重后按文本长度排序，以 models.punc.batch_size 为批大小分批推理
+- 小请求：在 max_wait_ms 窗口内与其他并发请求合并为同一批（MicroBatchScheduler）
+- 结果缓存：按原文本 LRU 缓存标点结果，短语重复率高时可直接命中
+"""
+
+import asyncio
+import itertools
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from core.batch_scheduler import MicroBatchScheduler
+from core.inference_executor import inference_executor
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_WAIT_MS = 5
+DEFAULT_CACHE_SIZE = 10000
+
+
+class PuncService:
+    """标点预测批处理服务，模型在每批执行时通过 get_model 获取（兼容热重载）"""
+
+    def __init__(
+        self,
+        get_model: Callable[[], Any],
+        batch_size: int = 1,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        merge: bool = True,
+    ):
+        self._get_model = get_model
+        self.batch_size = max(1, int(batch_size))
+        self.cache_size = max(0, int(cache_size))
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+        self._batch_ids = itertools.count(1)
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._scheduler: Optional[MicroBatchScheduler] = None
+        if merge:
+            self._scheduler = MicroBatchScheduler(
+                handler=self._run_merged,
+                max_batch_size=self.batch_size,
+                max_wait_ms=max_wait_ms,
+                name="punc",
+                executor_module="punc",
+            )
+
+    async def start(self) -> None:
+        if self._scheduler:
+            await self._scheduler.start()
+
+    async def stop(self) -> None:
+        if self._scheduler:
+            await self._scheduler.stop()
+
+    async def predict(self, texts: List[str], uttids: List[str]) -> Dict[str, Any]:
+        """
+        标点预测
+        Returns: {
+            'results': [{'punc_text', 'origin_text', 'uttid'}, ...],
+            'batches': [{'batch_id', 'size', 'max_chars', 'elapsed_ms', 'merged'}, ...],
+            'cache_hits': int
+        }
+        """
+        punc_texts: List[Optional[str]] = [None] * len(texts)
+        pending: Dict[str, List[int]] = {}  # 未命中缓存的文本 -> 请求内下标（相同文本只推理一次）
+        hits = 0
+        for idx, text in enumerate(texts):
+            if not text:
+                punc_texts[idx] = text
+                continue
+            cached = self._cache_get(text)
+            if cached is not None:
+                punc_texts[idx] = cached
+                hits += 1
+            else:
+                pending.setdefault(text, []).append(idx)
+        self.cache_hits += hits
+        self.cache_misses += len(pending)
+
+        batches: List[Dict[str, Any]] = []
+        if pending:
+            items = [(text, uttids[idxs[0]]) for text, idxs in pending.items()]
+            async with inference_executor.slot('punc'):
+                if self._scheduler is not None and len(items) < self.batch_size:
+                    outputs = await asyncio.gather(*[self._scheduler.submit(item) for item in items])
+                else:
+                    outputs = await inference_executor.run('punc', self._run_sorted, items)
+            seen = set()
+            for (text, _), (punc_text, timing) in zip(items, outputs):
+                self._cache_put(text, punc_text)
+                for idx in pending[text]:
+                    punc_texts[idx] = punc_text
+                if timing['batch_id'] not in seen:
+                    seen.add(timing['batch_id'])
+                    batches.append(timing)
+
+        return {
+            'results': [
+                {'punc_text': punc_text, 'origin_text': text, 'uttid': uttid}
+                for text, punc_text, uttid in zip(texts, punc_texts, uttids)
+            ],
+            'batches': batches,
+            'cache_hits': hits,
+        }
+
+    def clear_cache(self) -> None:
+        """清空文本缓存（模型重载后调用）"""
+        self._cache.clear()
+
+    def get_status(self) -> Dict[str, Any]:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "batch_size": self.batch_size,
+            "cache_entries": len(self._cache),
+            "cache_size": self.cache_size,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(self.cache_hits / lookups, 4) if lookups else 0.0,
+            "merging": {"enabled": True, **self._scheduler.get_status()} if self._scheduler else {"enabled": False},
+        }
+
+    def _run_sorted(self, items: List[Tuple[str, str]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """按长度排序后分批推理（在 punc 线程中执行）"""
+        outputs: List[Any] = [None] * len(items)
+        order = sorted(range(len(items)), key=lambda i: len(items[i][0]))
+        for b in range(0, len(order), self.batch_size):
+            batch_idx = order[b:b + self.batch_size]
+            punc_texts, timing = self._run_batch([items[i] for i in batch_idx], merged=False)
+            for i, punc_text in zip(batch_idx, punc_texts):
+                outputs[i] = (punc_text, timing)
+        return outputs
+
+    def _run_merged(self, items: List[Tuple[str, str]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """MicroBatchScheduler 的批处理函数：窗口内各请求的文本合并为一批"""
+        order = sorted(range(len(items)), key=lambda i: len(items[i][0]))
+        punc_texts, timing = self._run_batch([items[i] for i in order], merged=True)
+        outputs: List[Any] = [None] * len(items)
+        for i, punc_text in zip(order, punc_texts):
+            outputs[i] = (punc_text, timing)
+        return outputs
+
+    def _run_batch(self, items: List[Tuple[str, str]], merged: bool) -> Tuple[List[str], Dict[str, Any]]:
+        model = self._get_model()
+        if not model:
+            raise RuntimeError("Punc 模型未加载")
+        start = time.time()
+        results = model.predict([text for text, _ in items], [uttid for _, uttid in items])
+        timing = {
+            'batch_id': next(self._batch_ids),
+            'size': len(items),
+            'max_chars': max(len(text) for text, _ in items),
+            'elapsed_ms': int((time.time() - start) * 1000),
+            'merged': merged,
+        }
+        return [r.get('punc_text', '') for r in results], timing
+
+    def _cache_get(self, text: str) -> Optional[str]:
+        value = self._cache.get(text)
+        if value is not None:
+            self._cache.move_to_end(text)
+        return value
+
+    def _cache_put(self, text: str, punc_text: str) -> None:
+        if not self.cache_size:
+            return
+        self._cache[text] = punc_text
+        self._cache.move_to_end(text)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+
+def create_punc_service(config: Dict[str, Any], get_model: Callable[[], Any]) -> PuncService:
+    """根据 models.punc.batch_size 与 batching.punc 节创建标点服务"""
+    punc_model_cfg = (config.get("models") or {}).get("punc") or {}
+    punc_batching_cfg = (config.get("batching") or {}).get("punc") or {}
+    return PuncService(
+        get_model=get_model,
+        batch_size=punc_model_cfg.get("batch_size", 1) or 1,
+        max_wait_ms=punc_batching_cfg.get("max_wait_ms", DEFAULT_MAX_WAIT_MS),
+        cache_size=punc_batching_cfg.get("cache_size", DEFAULT_CACHE_SIZE),
+        merge=punc_batching_cfg.get("enabled", True),
+    )
@@ -0,0 +1,258 @@
+"""
+识别结果缓存 - 以音频内容 SHA-256 + 生效模型配置指纹为键
+内存 LRU（按字节预算淘汰）+ 可选磁盘层，均支持 TTL；模型重载时整体失效
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_DISK_MAX_BYTES = 2 * 1024 * 1024 * 1024
+DEFAULT_TTL_S = 86400
+
+
+def config_fingerprint(asr_system: Any) -> str:
+    """FireRedAsr2System 生效配置（summarize_asr_system_config）的指纹"""
+    from core.asr_system_factory import summarize_asr_system_config
+
+    summary = summarize_asr_system_config(asr_system.config)
+    payload = json.dumps(summary, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+class ResultCache:
+    """
+    两级结果缓存
+    值以 JSON（UTF-8）字节保存，既便于按字节计量，也避免调用方修改结果影响缓存内容；
+    磁盘层文件只按 JSON 解析，被篡改的缓存文件不会导致任意代码执行。
+    所有方法为同步实现（磁盘层涉及文件 IO），异步代码中应通过 asyncio.to_thread 调用。
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.max_bytes = DEFAULT_MAX_BYTES
+        self.ttl_s = DEFAULT_TTL_S
+        self.disk_dir = ""
+        self.disk_max_bytes = DEFAULT_DISK_MAX_BYTES
+        self._entries: "OrderedDict[str, Tuple[float, bytes]]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.generation = 0  # 每次失效递增，失效前开始的推理结果不再写入
+
+    def configure(self, config: Dict[str, Any]) -> None:
+        """根据 config.yaml 的 cache 节配置缓存"""
+        cache_cfg = config.get("cache") or {}
+        self.enabled = bool(cache_cfg.get("enabled", False))
+        self.max_bytes = max(0, int(cache_cfg.get("max_bytes", DEFAULT_MAX_BYTES)))
+        self.ttl_s = float(cache_cfg.get("ttl_s", DEFAULT_TTL_S) or 0)
+        self.disk_dir = cache_cfg.get("disk_dir") or ""
+        self.disk_max_bytes = max(0, int(cache_cfg.get("disk_max_bytes", DEFAULT_DISK_MAX_BYTES)))
+        if self.enabled and self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._scan_disk())
+        if self.enabled:
+            logger.info(
+                f"结果缓存已启用: max_bytes={self.max_bytes}, ttl_s={self.ttl_s}, "
+                f"disk_dir={self.disk_dir or '-'}"
+            )
+
+    @staticmethod
+    def make_key(sha256: str, fingerprint: str) -> str:
+        return f"{sha256}-{fingerprint}"
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """查询缓存，未命中或已过期返回 None；磁盘命中时提升到内存层"""
+        if not self.enabled:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, blob = entry
+                if self._expired(stored_at, now):
+                    self._remove(key)
+                else:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return json.loads(blob)
+        blob = self._disk_get(key, now)
+        with self._lock:
+            if blob is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._store(key, blob, now)
+        try:
+            return json.loads(blob)
+        except ValueError:
+            # 损坏的磁盘文件按未命中处理
+            with self._lock:
+                self._remove(key)
+            self._disk_remove(self._disk_path(key))
+            return None
+
+    def put(self, key: str, value: Dict[str, Any], generation: Optional[int] = None) -> None:
+        """写入缓存（内存层 + 磁盘层）；generation 与当前不一致说明期间发生过失效，丢弃该结果"""
+        if not self.enabled or (generation is not None and generation != self.generation):
+            return
+        try:
+            blob = json.dumps(value, ensure_ascii=False).encode("utf-8")
+        except (TypeError, ValueError) as e:
+            logger.warning(f"结果无法序列化为 JSON，不写入缓存: {e}")
+            return
+        now = time.time()
+        with self._lock:
+            self._store(key, blob, now)
+        self._disk_put(key, blob)
+
+    def invalidate(self) -> int:
+        """清空两级缓存（模型重载后调用），返回清除的条目数"""
+        with self._lock:
+            count = len(self._entries)
+            self._entries.clear()
+            self._bytes = 0
+            self.invalidations += 1
+            self.generation += 1
+        for path, _, _ in self._scan_disk():
+            try:
+                os.unlink(path)
+                count += 1
+            except OSError:
+                pass
+        self._disk_bytes = 0
+        if self.enabled:
+            logger.info(f"结果缓存已失效: removed={count}")
+        return count
+
+    def get_status(self) -> Dict[str, Any]:
+        """命中/未命中计数与各层占用"""
+        lookups = self.hits + self.disk_hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "disk_bytes": self._disk_bytes if self.disk_dir else 0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_s > 0 and now - stored_at > self.ttl_s
+
+    def _store(self, key: str, blob: bytes, now: float) -> None:
+        """写入内存层并按字节预算从最久未用一端淘汰（需持有锁）"""
+        if len(blob) > self.max_bytes:
+            return
+        self._remove(key)
+        self._entries[key] = (now, blob)
+        self._bytes += len(blob)
+        while self._bytes > self.max_bytes:
+            old_key, _ = next(iter(self._entries.items()))
+            self._remove(old_key)
+            self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= len(entry[1])
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, f"{key}.json")
+
+    def _disk_get(self, key: str, now: float) -> Optional[bytes]:
+        if not self.disk_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            if self._expired(os.path.getmtime(path), now):
+                self._disk_remove(path)
+                return None
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _disk_put(self, key: str, blob: bytes) -> None:
+        if not self.disk_dir or len(blob) > self.disk_max_bytes:
+            return
+        path = self._disk_path(key)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            # 覆盖已有文件时先扣除其大小，避免重复写同一键使计数虚高
+            old_size = os.path.getsize(path)
+        except OSError:
+            old_size = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(blob)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f"结果缓存写入磁盘失败: {e}")
+            return
+        self._disk_bytes = max(0, self._disk_bytes - old_size) + len(blob)
+        if self._disk_bytes > self.disk_max_bytes:
+            self._trim_disk()
+
+    def _disk_remove(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.unlink(path)
+            self._disk_bytes = max(0, self._disk_bytes - size)
+        except OSError:
+            pass
+
+    def _scan_disk(self):
+        """[(path, size, mtime), ...]"""
+        if not self.disk_dir or not os.path.isdir(self.disk_dir):
+            return []
+        entries = []
+        for name in os.listdir(self.disk_dir):
+            if not name.endswith(".json"):
+                continue
+            path = os.path.join(self.disk_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((path, st.st_size, st.st_mtime))
+        return entries
+
+    def _trim_disk(self) -> None:
+        """磁盘层超出预算时按修改时间删除最旧的文件，降到预算的 90%"""
+        entries = sorted(self._scan_disk(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        target = int(self.disk_max_bytes * 0.9)
+        for path, size, _ in entries:
+            if total <= target:
+                break
+            try:
+                os.unlink(path)
+                total -= size
+                self.evictions += 1
+            except OSError:
+                pass
+        self._disk_bytes = total
+
+
+# 全局单例
+result_cache = ResultCache()
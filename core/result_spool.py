@@ -0,0 +1,103 @@
+"""
+异步任务结果落盘
+序列化后超过阈值的识别结果（含逐字/分句列表）压缩后写入结果目录，任务存储中只保留文件引用；
+读取时按块解压流式返回，不整体载入内存。压缩优先使用 zstd（需安装 zstandard），否则使用 gzip。
+"""
+
+import gzip
+import json
+import os
+from typing import Any, Dict, Iterator, Optional
+
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import zstandard
+except ImportError:  # 可选依赖
+    zstandard = None
+
+DEFAULT_RESULTS_DIR = "data/results"
+DEFAULT_SPOOL_THRESHOLD_BYTES = 262144
+READ_CHUNK_SIZE = 65536
+
+_EXTENSIONS = {"zstd": ".json.zst", "gzip": ".json.gz"}
+
+
+def dump_result(result: Any) -> bytes:
+    """结果序列化为紧凑 JSON（单行，可直接作为 SSE data）"""
+    return json.dumps(result, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class ResultSpool:
+    """结果落盘目录"""
+
+    def __init__(
+        self,
+        results_dir: str = DEFAULT_RESULTS_DIR,
+        threshold_bytes: int = DEFAULT_SPOOL_THRESHOLD_BYTES,
+        codec: str = "auto",
+    ):
+        self.results_dir = results_dir
+        self.threshold_bytes = max(0, int(threshold_bytes))
+        codec = (codec or "auto").lower()
+        if codec == "auto":
+            codec = "zstd" if zstandard is not None else "gzip"
+        elif codec == "zstd" and zstandard is None:
+            logger.warning("未安装 zstandard，结果落盘改用 gzip 压缩（pip install zstandard）")
+            codec = "gzip"
+        elif codec not in _EXTENSIONS:
+            raise ValueError(f"未知的结果压缩格式: {codec}")
+        self.codec = codec
+
+    def write(self, job_id: str, payload: bytes) -> Dict[str, Any]:
+        """压缩写入结果文件（先写临时文件再原子替换），返回文件引用"""
+        os.makedirs(self.results_dir, exist_ok=True)
+        path = os.path.join(self.results_dir, job_id + _EXTENSIONS[self.codec])
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            if self.codec == "zstd":
+                with zstandard.ZstdCompressor(level=3).stream_writer(f, closefd=False) as writer:
+                    writer.write(payload)
+            else:
+                with gzip.GzipFile(fileobj=f, mode="wb", compresslevel=6, mtime=0) as writer:
+                    writer.write(payload)
+        os.replace(tmp_path, path)
+        return {
+            "path": path,
+            "codec": self.codec,
+            "size": len(payload),
+            "stored_size": os.path.getsize(path),
+        }
+
+    @staticmethod
+    def iter_bytes(ref: Dict[str, Any], chunk_size: int = READ_CHUNK_SIZE) -> Iterator[bytes]:
+        """按块解压读取结果 JSON"""
+        with open(ref["path"], "rb") as f:
+            if ref["codec"] == "zstd":
+                if zstandard is None:
+                    raise RuntimeError("结果以 zstd 压缩，但未安装 zstandard")
+                reader = zstandard.ZstdDecompressor().stream_reader(f)
+            else:
+                reader = gzip.GzipFile(fileobj=f, mode="rb")
+            with reader:
+                while True:
+                    chunk = reader.read(chunk_size)
+                    if not chunk:
+                        return
+                    yield chunk
+
+    @classmethod
+    def load(cls, ref: Dict[str, Any]) -> Any:
+        """完整读取并反序列化（仅用于需要结果对象的场合）"""
+        return json.loads(b"".join(cls.iter_bytes(ref)).decode("utf-8"))
+
+    @staticmethod
+    def delete(ref: Optional[Dict[str, Any]]) -> None:
+        if not ref:
+            return
+        try:
+            os.unlink(ref["path"])
+        except OSError:
+            pass
@@ -0,0 +1,155 @@
+"""
+流式识别 - /system/transcribe/stream WebSocket 的会话
+- 端点检测复用流式 VAD（core.stream_vad）的会话：每个连接独立的检测器状态，模型权重共享
+- 会话保留当前语音段（含起点回退部分）的样本，speech_end 时切出该段交给分段调度器，
+  所有连接的语音段在同一时间窗口内合并为批量 ASR（及 LID、Punc）推理
+- 分段识别在后台执行，不阻塞后续 PCM 的接收与端点检测；结果按语音段顺序返回
+"""
+
+import asyncio
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from core.adapters import StreamVADAdapter
+from core.inference_executor import inference_executor
+from core.pipeline import TranscribePipeline
+from core.stream_vad import StreamVadSession
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = SAMPLE_RATE * StreamVADAdapter.FRAME_SHIFT_MS // 1000
+
+
+class SampleBuffer:
+    """按到达顺序保存 int16 样本块，以流开始的样本序号切片，丢弃已不再需要的前部"""
+
+    def __init__(self):
+        self._chunks: Deque[np.ndarray] = deque()
+        self.start = 0   # 缓冲区首个样本的序号
+        self.end = 0     # 已接收样本总数
+
+    def append(self, samples: np.ndarray) -> None:
+        if len(samples):
+            self._chunks.append(samples)
+            self.end += len(samples)
+
+    def slice(self, start: int, end: int) -> np.ndarray:
+        """返回 [start, end) 的样本（超出缓冲范围的部分截断）"""
+        start, end = max(start, self.start), min(end, self.end)
+        if end <= start:
+            return np.zeros(0, dtype=np.int16)
+        parts = []
+        offset = self.start
+        for chunk in self._chunks:
+            chunk_end = offset + len(chunk)
+            if chunk_end > start and offset < end:
+                parts.append(chunk[max(0, start - offset):min(len(chunk), end - offset)])
+            if chunk_end >= end:
+                break
+            offset = chunk_end
+        return np.concatenate(parts) if len(parts) > 1 else parts[0].copy()
+
+    def trim(self, before: int) -> None:
+        """丢弃完全位于 before 之前的样本块"""
+        while self._chunks and self.start + len(self._chunks[0]) <= before:
+            self.start += len(self._chunks.popleft())
+
+
+class StreamTranscribeSession:
+    """单个连接的流式识别状态"""
+
+    def __init__(
+        self,
+        vad_session: StreamVadSession,
+        scheduler: Any,
+        uttid: str,
+        punc: bool = True,
+    ):
+        self._vad = vad_session
+        self._scheduler = scheduler
+        self._buffer = SampleBuffer()
+        self.uttid = uttid
+        self.punc = punc
+        self.segments = 0
+        # 静音状态下需保留的帧数：speech_start 起点最多回退 min_speech_frame + pad_start_frame 帧
+        endpointer = vad_session.endpointer
+        self._keep_frames = endpointer.min_speech_frame + endpointer.pad_start_frame + 1
+
+    async def feed(self, samples: np.ndarray) -> List[Tuple[Dict[str, Any], Optional["asyncio.Task"]]]:
+        """
+        送入一段 int16 样本
+        Returns: [(语音起止事件, 该事件对应的识别任务), ...]；speech_end 事件对应该语音段的识别任务
+                 （结果为 result 事件），其余事件为 None
+        """
+        self._buffer.append(samples)
+        events = self._dispatch(await self._vad.feed(samples))
+        endpointer = self._vad.endpointer
+        if endpointer.in_speech:
+            self._buffer.trim(endpointer.start_frame * FRAME_SAMPLES)
+        else:
+            self._buffer.trim((endpointer.frames - self._keep_frames) * FRAME_SAMPLES)
+        return events
+
+    def finish(self) -> List[Tuple[Dict[str, Any], Optional["asyncio.Task"]]]:
+        """流结束：进行中的语音段在最后一帧处结束并提交识别，返回值同 feed"""
+        return self._dispatch(self._vad.finish())
+
+    def close(self) -> None:
+        self._vad.close()
+
+    @property
+    def duration_ms(self) -> int:
+        return self._vad.duration_ms
+
+    def _dispatch(self, events: List[Dict[str, Any]]) -> List[Tuple[Dict[str, Any], Optional["asyncio.Task"]]]:
+        paired = []
+        for event in events:
+            task = None
+            if event["event"] == "speech_end":
+                start_ms, end_ms = event["start_ms"], event["end_ms"]
+                samples = self._buffer.slice(start_ms * SAMPLE_RATE // 1000, end_ms * SAMPLE_RATE // 1000)
+                task = asyncio.create_task(self._transcribe(self.segments, start_ms, end_ms, samples))
+                self.segments += 1
+            paired.append((event, task))
+        return paired
+
+    async def _transcribe(self, index: int, start_ms: int, end_ms: int, samples: np.ndarray) -> Dict[str, Any]:
+        """识别单个语音段，返回 result 事件（时间相对流开始）"""
+        uttid = f"{self.uttid}_s{start_ms}_e{end_ms}"
+        event: Dict[str, Any] = {
+            "event": "result", "segment": index, "start_ms": start_ms, "end_ms": end_ms, "text": "",
+        }
+        if not len(samples):
+            return event
+        async with inference_executor.slot("asr", reject=False):
+            r = await self._scheduler.submit(((SAMPLE_RATE, samples), uttid, self.punc))
+        out = TranscribePipeline.empty_result(uttid, len(samples) / SAMPLE_RATE)
+        TranscribePipeline.append_segment(out, start_ms / 1000.0, end_ms / 1000.0, r)
+        if out["sentences"]:
+            sentence = out["sentences"][0]
+            sentence.pop("start_ms", None)
+            sentence.pop("end_ms", None)
+            event.update(sentence)
+        event["words"] = out["words"]
+        return event
+
+
+def open_transcribe_session(
+    vad_service: Any,
+    scheduler: Optional[Any],
+    uttid: str,
+    punc: bool = True,
+) -> StreamTranscribeSession:
+    """
+    创建流式识别会话
+    Raises:
+        RuntimeError: 流式 VAD 模型或分段调度器不可用
+        ExecutorBusyError: 连接数已达 stream_vad.max_connections
+    """
+    if scheduler is None:
+        raise RuntimeError("流式识别未启用，请检查 config 中 stream_asr.enabled")
+    return StreamTranscribeSession(vad_service.open_session(), scheduler, uttid, punc)
@@ -0,0 +1,246 @@
+"""
+流式 VAD - /modules/vad/stream WebSocket 的会话与端点检测
+- 模型：FireRedStreamVad（models.vad.stream_model_dir），启动时加载一次，各连接共享权重
+- 每个连接一个 StreamVadSession：独立的检测器状态、平滑窗口与端点状态机
+- 每段 PCM 在 inference 的 vad_stream 线程池中处理，连接数远多于线程数时在队列中等待，不独占线程
+- 端点以帧（10ms）为粒度：连续 min_speech_frame 帧为语音时发出 speech_start（起点回退 pad_start_frame 帧），
+  连续 min_silence_frame 帧为静音时发出 speech_end；语音段超过 max_speech_frame 帧时强制切分
+"""
+
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+import numpy as np
+
+from core.adapters import StreamVADAdapter
+from core.inference_executor import ExecutorBusyError, inference_executor
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+EXECUTOR_MODULE = "vad_stream"
+DEFAULT_MAX_CONNECTIONS = 256
+DEFAULT_ENDPOINT = {
+    "speech_threshold": 0.5,
+    "smooth_window_size": 5,
+    "min_speech_frame": 8,
+    "min_silence_frame": 20,
+    "pad_start_frame": 5,
+    "max_speech_frame": 2000,
+}
+
+
+class SpeechEndpointer:
+    """逐帧概率 → 语音起止事件（帧序号从流开始计）"""
+
+    def __init__(
+        self,
+        speech_threshold: float = 0.5,
+        smooth_window_size: int = 5,
+        min_speech_frame: int = 8,
+        min_silence_frame: int = 20,
+        pad_start_frame: int = 5,
+        max_speech_frame: int = 2000,
+    ):
+        self.speech_threshold = float(speech_threshold)
+        self.min_speech_frame = max(1, int(min_speech_frame))
+        self.min_silence_frame = max(1, int(min_silence_frame))
+        self.pad_start_frame = max(0, int(pad_start_frame))
+        self.max_speech_frame = max(self.min_speech_frame, int(max_speech_frame))
+        self._window: Deque[float] = deque(maxlen=max(1, int(smooth_window_size)))
+        self.frames = 0            # 已处理帧数
+        self.in_speech = False
+        self.start_frame = 0       # 当前语音段起点
+        self._run = 0              # 连续语音（静音状态下）或连续静音（语音状态下）帧数
+        self._last_end = 0         # 上一语音段终点，起点回退不越过该帧
+
+    def push(self, probs: List[float]) -> List[Dict[str, int]]:
+        """处理一段帧概率，返回 [{'type': 'start'|'end', 'start_frame', 'end_frame'}]"""
+        events = []
+        for prob in probs:
+            self._window.append(prob)
+            is_speech = sum(self._window) / len(self._window) >= self.speech_threshold
+            frame = self.frames
+            self.frames += 1
+            if not self.in_speech:
+                self._run = self._run + 1 if is_speech else 0
+                if self._run >= self.min_speech_frame:
+                    self.in_speech = True
+                    first = frame - self._run + 1
+                    self.start_frame = max(self._last_end, first - self.pad_start_frame)
+                    self._run = 0
+                    events.append({"type": "start", "start_frame": self.start_frame})
+                continue
+            self._run = 0 if is_speech else self._run + 1
+            if self._run >= self.min_silence_frame:
+                events.append(self._end(frame - self._run + 1))
+            elif self.frames - self.start_frame >= self.max_speech_frame:
+                # 超长语音段在当前帧切分，仍为语音时下一段立即开始
+                events.append(self._end(self.frames))
+                if is_speech:
+                    self.in_speech = True
+                    self.start_frame = self.frames
+                    events.append({"type": "start", "start_frame": self.start_frame})
+        return events
+
+    def flush(self) -> List[Dict[str, int]]:
+        """流结束：进行中的语音段在最后一帧处结束"""
+        if not self.in_speech:
+            return []
+        return [self._end(self.frames - self._run)]
+
+    def _end(self, end_frame: int) -> Dict[str, int]:
+        event = {"type": "end", "start_frame": self.start_frame, "end_frame": end_frame}
+        self.in_speech = False
+        self._run = 0
+        self._last_end = end_frame
+        return event
+
+
+class StreamVadSession:
+    """单个连接的流式 VAD 状态"""
+
+    def __init__(self, service: "StreamVadService", adapter: StreamVADAdapter, endpoint_config: Dict[str, Any]):
+        self._service = service
+        self._adapter = adapter
+        self._state = adapter.new_state()
+        self.endpointer = SpeechEndpointer(**endpoint_config)
+        self.samples = 0
+        self.closed = False
+
+    async def feed(self, samples: np.ndarray) -> List[Dict[str, Any]]:
+        """送入一段 int16 样本，返回本段产生的语音起止事件（时间为相对流开始的毫秒数）"""
+        if not len(samples):
+            return []
+        self.samples += len(samples)
+        async with inference_executor.slot(EXECUTOR_MODULE, reject=False):
+            events = await inference_executor.run(EXECUTOR_MODULE, self._process, samples)
+        return [self._format(event) for event in events]
+
+    def finish(self) -> List[Dict[str, Any]]:
+        return [self._format(event) for event in self.endpointer.flush()]
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._service.sessions -= 1
+
+    @property
+    def duration_ms(self) -> int:
+        return self.samples * 1000 // 16000
+
+    def _process(self, samples: np.ndarray) -> List[Dict[str, int]]:
+        """推理线程中执行：计算帧概率并更新端点状态"""
+        start = time.perf_counter()
+        probs = self._adapter.frame_probs(self._state, samples)
+        events = self.endpointer.push(probs)
+        self._service.record(len(probs), time.perf_counter() - start)
+        return events
+
+    @staticmethod
+    def _format(event: Dict[str, int]) -> Dict[str, Any]:
+        shift = StreamVADAdapter.FRAME_SHIFT_MS
+        if event["type"] == "start":
+            return {"event": "speech_start", "start_ms": event["start_frame"] * shift}
+        return {
+            "event": "speech_end",
+            "start_ms": event["start_frame"] * shift,
+            "end_ms": event["end_frame"] * shift,
+        }
+
+
+class StreamVadService:
+    """流式 VAD 模型与连接管理"""
+
+    def __init__(self):
+        self._adapter: Optional[StreamVADAdapter] = None
+        self.endpoint_config: Dict[str, Any] = dict(DEFAULT_ENDPOINT)
+        self.max_connections = DEFAULT_MAX_CONNECTIONS
+        self.sessions = 0
+        self.total_sessions = 0
+        self.rejected = 0
+        self.frames = 0
+        self.avg_frame_us = 0.0  # 单帧处理耗时（含特征与模型）的指数滑动平均
+        self._lock = threading.Lock()
+
+    async def start(self, config: Dict[str, Any]) -> None:
+        """加载 models.vad.stream_model_dir（未配置或加载失败时流式接口返回错误）"""
+        vad_cfg = (config.get("models") or {}).get("vad") or {}
+        stream_cfg = config.get("stream_vad") or {}
+        if not stream_cfg.get("enabled", True):
+            logger.info("流式 VAD 已禁用")
+            return
+        self.max_connections = max(1, int(stream_cfg.get("max_connections", DEFAULT_MAX_CONNECTIONS)))
+        self.endpoint_config = {
+            key: stream_cfg.get(key, vad_cfg.get(key, default)) for key, default in DEFAULT_ENDPOINT.items()
+        }
+        model_dir = vad_cfg.get("stream_model_dir")
+        if not model_dir or not os.path.isdir(model_dir):
+            logger.info(f"流式 VAD 模型目录不存在，/modules/vad/stream 不可用: {model_dir}")
+            return
+        try:
+            stream_vad = await asyncio.to_thread(self._load, model_dir, vad_cfg)
+        except Exception as e:
+            logger.exception(f"流式 VAD 模型加载失败: {e}")
+            return
+        self._adapter = StreamVADAdapter(stream_vad)
+        logger.info(f"流式 VAD 模型已加载: {model_dir}, endpoint={self.endpoint_config}")
+
+    @staticmethod
+    def _load(model_dir: str, vad_cfg: Dict[str, Any]) -> Any:
+        from fireredasr2s.fireredvad import FireRedStreamVad, FireRedStreamVadConfig
+        return FireRedStreamVad.from_pretrained(
+            model_dir,
+            FireRedStreamVadConfig(
+                use_gpu=vad_cfg.get("use_gpu", False),
+                speech_threshold=vad_cfg.get("speech_threshold", DEFAULT_ENDPOINT["speech_threshold"]),
+            ),
+        )
+
+    @property
+    def available(self) -> bool:
+        return self._adapter is not None
+
+    def open_session(self) -> StreamVadSession:
+        """
+        创建连接会话
+        Raises:
+            RuntimeError: 模型未加载
+            ExecutorBusyError: 连接数已达 max_connections
+        """
+        if self._adapter is None:
+            raise RuntimeError("流式 VAD 模型未加载，请检查 models.vad.stream_model_dir")
+        if self.sessions >= self.max_connections:
+            self.rejected += 1
+            raise ExecutorBusyError(EXECUTOR_MODULE, 1)
+        session = StreamVadSession(self, self._adapter, self.endpoint_config)
+        self.sessions += 1
+        self.total_sessions += 1
+        return session
+
+    def record(self, frames: int, elapsed_s: float) -> None:
+        if not frames:
+            return
+        per_frame_us = elapsed_s * 1e6 / frames
+        with self._lock:
+            self.avg_frame_us = per_frame_us if not self.frames else 0.9 * self.avg_frame_us + 0.1 * per_frame_us
+            self.frames += frames
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "sessions": self.sessions,
+            "max_connections": self.max_connections,
+            "total_sessions": self.total_sessions,
+            "rejected": self.rejected,
+            "frames": self.frames,
+            "avg_frame_us": round(self.avg_frame_us, 1),
+        }
+
+
+# 全局单例
+stream_vad_service = StreamVadService()
@@ -0,0 +1,161 @@
+"""
+音频转码进程池 - 预先启动的常驻转码工作进程 + 有界等待队列
+工作进程优先使用进程内解码器（soundfile / PyAV），不可用时回退 ffmpeg；
+转码并发（transcode.workers）与推理并发（inference.*.slots）相互独立配置
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from core.inference_executor import ExecutorBusyError
+from utils.logger import get_logger
+from utils.scratch import scratch_dir
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_QUEUE = 16
+DEFAULT_QUEUE_TIMEOUT_S = 30
+DEFAULT_RETRY_AFTER_S = 1
+
+
+def _init_worker(scratch: str) -> None:
+    """工作进程初始化：提前导入转码模块与可选解码器，避免首个任务承担导入开销；转码输出写入服务临时文件目录"""
+    import utils.audio_converter  # noqa: F401
+    from utils.scratch import configure_scratch
+    configure_scratch(scratch)
+    for name in ("soundfile", "av"):
+        try:
+            __import__(name)
+        except ImportError:
+            pass
+
+
+def _warmup() -> int:
+    import os
+    return os.getpid()
+
+
+class TranscodePool:
+    """
+    常驻转码进程池
+    workers 为 0 时不启动进程，转码在调用线程内执行（与未配置时行为一致）。
+    同时在途的任务数上限为 workers + max_queue，已满时等待至多 queue_timeout_s，
+    仍无空位则抛出 ExecutorBusyError（429）。
+    """
+
+    def __init__(self):
+        self.workers = 0
+        self.max_queue = DEFAULT_MAX_QUEUE
+        self.queue_timeout_s = DEFAULT_QUEUE_TIMEOUT_S
+        self.retry_after_s = DEFAULT_RETRY_AFTER_S
+        self.in_process_decoders = True
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._slots: Optional[threading.BoundedSemaphore] = None
+        self._lock = threading.Lock()
+        self.inflight = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.avg_latency_s = 0.0
+
+    def start(self, config: Dict[str, Any]) -> None:
+        """根据 config.yaml 的 transcode 节启动工作进程并预热"""
+        self.shutdown()
+        transcode_cfg = config.get("transcode") or {}
+        self.workers = max(0, int(transcode_cfg.get("workers", 0) or 0))
+        self.max_queue = max(0, int(transcode_cfg.get("max_queue", DEFAULT_MAX_QUEUE)))
+        self.queue_timeout_s = float(transcode_cfg.get("queue_timeout_s", DEFAULT_QUEUE_TIMEOUT_S))
+        self.retry_after_s = int(transcode_cfg.get("retry_after_s", DEFAULT_RETRY_AFTER_S))
+        self.in_process_decoders = bool(transcode_cfg.get("in_process_decoders", True))
+        if self.workers == 0:
+            logger.info("转码进程池未启用，转码在请求线程内执行")
+            return
+        # 主进程已加载模型与推理线程，不宜直接 fork；forkserver 从干净的服务进程派生工作进程
+        method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+        context = multiprocessing.get_context(method)
+        if method == "forkserver":
+            # 仅预加载转码模块，避免 forkserver 导入 __main__（torch、模型配置等）
+            context.set_forkserver_preload(["utils.audio_converter"])
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=context,
+            initializer=_init_worker,
+            initargs=(scratch_dir(),),
+        )
+        self._slots = threading.BoundedSemaphore(self.workers + self.max_queue)
+        pids = set(f.result() for f in [self._pool.submit(_warmup) for _ in range(self.workers)])
+        logger.info(
+            f"转码进程池已启动: workers={self.workers}, max_queue={self.max_queue}, "
+            f"start_method={method}, pids={sorted(pids)}"
+        )
+
+    def shutdown(self) -> None:
+        """关闭工作进程"""
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            logger.info("转码进程池已关闭")
+        self._pool = None
+        self._slots = None
+
+    def transcode(self, input_path: str, output_path: str = None, max_duration: float = None) -> str:
+        """转码为 16kHz 16-bit mono PCM WAV，返回输出路径（同步，供线程中调用）"""
+        from utils.audio_converter import transcode_file
+        return self._execute(transcode_file, input_path, output_path, max_duration, self.in_process_decoders)
+
+    def decode(self, content: bytes, max_duration: float = None):
+        """内存解码为 16kHz mono int16 样本（同步，供线程中调用）"""
+        from utils.audio_converter import decode_bytes
+        return self._execute(decode_bytes, content, max_duration, self.in_process_decoders)
+
+    def get_status(self) -> Dict[str, Any]:
+        """进程数、在途任务与累计统计"""
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "in_process_decoders": self.in_process_decoders,
+            "inflight": self.inflight,
+            "queue_depth": max(0, self.inflight - self.workers),
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_latency_ms": int(self.avg_latency_s * 1000),
+        }
+
+    def _execute(self, fn: Callable[..., Any], *args) -> Any:
+        pool, slots = self._pool, self._slots
+        if pool is None:
+            return self._timed(fn, *args)
+        if not slots.acquire(timeout=self.queue_timeout_s):
+            with self._lock:
+                self.rejected += 1
+            raise ExecutorBusyError("transcode", self.retry_after_s)
+        try:
+            return self._timed(lambda *a: pool.submit(fn, *a).result(), *args)
+        finally:
+            slots.release()
+
+    def _timed(self, fn: Callable[..., Any], *args) -> Any:
+        with self._lock:
+            self.inflight += 1
+        start = time.time()
+        ok = False
+        try:
+            result = fn(*args)
+            ok = True
+            return result
+        finally:
+            elapsed = time.time() - start
+            with self._lock:
+                self.inflight -= 1
+                if ok:
+                    self.completed += 1
+                    self.avg_latency_s = elapsed if self.completed == 1 else 0.8 * self.avg_latency_s + 0.2 * elapsed
+                else:
+                    self.failed += 1
+
+
+# 全局单例
+transcode_pool = TranscodePool()
@@ -1,10 +1,11 @@
 """VAD 检测处理器"""
 
-import os
+import asyncio
 from fastapi import UploadFile
 from typing import Dict, Any
+from core.inference_executor import inference_executor, ExecutorBusyError
 from utils.logger import get_logger
-from utils.audio_validator import prepare_audio_for_asr
+from utils.audio_validator import load_audio_for_inference, release_audio
 from utils.config_loader import get_config
 from utils.response_builder import error_response
 
@@ -22,26 +23,30 @@ class VADProcessor:
         audio_file: UploadFile,
         speech_threshold: float = 0.4
     ) -> Dict[str, Any]:
-        """VAD 检测"""
+        """VAD 检测（转码与推理均在线程池中执行，不阻塞事件循环）"""
         vad_model = self.model_manager.get_model('vad')
         if not vad_model:
             return error_response(500, "VAD 模型未加载")
         
-        wav_path = None
+        audio = None
         try:
-            audio_info, wav_path = prepare_audio_for_asr(audio_file, self.config)
-            result = vad_model.detect(wav_path, speech_threshold=speech_threshold)
+            # 转码不占用 vad 槽位：先做准入检查，解码完成后再进入推理队列
+            inference_executor.check_capacity('vad')
+            audio_info, audio = await asyncio.to_thread(load_audio_for_inference, audio_file, self.config)
+            async with inference_executor.slot('vad'):
+                result = await inference_executor.run(
+                    'vad', vad_model.detect, audio, speech_threshold=speech_threshold
+                )
             result['audio_info'] = audio_info
             return result
+        except ExecutorBusyError:
+            raise
         except Exception as e:
             logger.error(f"VAD 检测失败: {e}")
             return error_response(500, str(e))
         finally:
-            if wav_path and os.path.exists(wav_path):
-                try:
-                    os.unlink(wav_path)
-                except OSError:
-                    pass
+            if audio is not None:
+                release_audio(audio)
 
     async def aed_detect(self, audio_file: UploadFile) -> Dict[str, Any]:
         """音频事件检测。FireRedAsr2System 不包含 FireRedAed，统一加载时不可用"""
@@ -52,18 +57,19 @@ class VADProcessor:
         if getattr(vad_model, "supports_aed", lambda: True)() is False:
             return error_response(503, "AED 功能在使用 FireRedAsr2System 统一加载时不可用")
 
-        wav_path = None
+        audio = None
         try:
-            audio_info, wav_path = prepare_audio_for_asr(audio_file, self.config)
-            result = vad_model.aed_detect(wav_path)
+            inference_executor.check_capacity('vad')
+            audio_info, audio = await asyncio.to_thread(load_audio_for_inference, audio_file, self.config)
+            async with inference_executor.slot('vad'):
+                result = await inference_executor.run('vad', vad_model.aed_detect, audio)
             result['audio_info'] = audio_info
             return result
+        except ExecutorBusyError:
+            raise
         except Exception as e:
             logger.error(f"AED 检测失败: {e}")
             return error_response(500, str(e))
         finally:
-            if wav_path and os.path.exists(wav_path):
-                try:
-                    os.unlink(wav_path)
-                except OSError:
-                    pass
+            if audio is not None:
+                release_audio(audio)
@@ -0,0 +1,191 @@
+"""
+任务完成回调（webhook）
+异步任务提交时携带 callback_url，任务结束（completed/failed）后向该地址 POST 结果。
+所有投递共用一个带连接池的 httpx.AsyncClient，并发数有上限；
+失败按指数退避重试，重试耗尽后进入死信列表（管理接口可查看）。
+"""
+
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set
+from urllib.parse import urlparse
+
+from core.result_spool import ResultSpool
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
+
+DEFAULT_MAX_CONCURRENCY = 16
+DEFAULT_TIMEOUT_S = 10
+DEFAULT_MAX_RETRIES = 5
+DEFAULT_BACKOFF_BASE_S = 1.0
+DEFAULT_BACKOFF_MAX_S = 60.0
+DEFAULT_DEAD_LETTER_SIZE = 1000
+
+
+def validate_callback_url(url: str) -> str:
+    """校验回调地址（仅允许 http/https 绝对地址），返回去除首尾空白后的地址"""
+    url = (url or "").strip()
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        raise ValueError(f"无效的回调地址: {url}")
+    return url
+
+
+class WebhookDispatcher:
+    """回调投递器"""
+
+    def __init__(self):
+        self.enabled = False
+        self.max_concurrency = DEFAULT_MAX_CONCURRENCY
+        self.timeout_s = DEFAULT_TIMEOUT_S
+        self.max_retries = DEFAULT_MAX_RETRIES
+        self.backoff_base_s = DEFAULT_BACKOFF_BASE_S
+        self.backoff_max_s = DEFAULT_BACKOFF_MAX_S
+        self._client = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self._dead_letters: Deque[Dict[str, Any]] = deque(maxlen=DEFAULT_DEAD_LETTER_SIZE)
+        self.delivered = 0
+        self.retried = 0
+        self.dead = 0
+
+    async def start(self, config: Dict[str, Any]) -> None:
+        """根据 config.yaml 的 webhook 节创建共享 HTTP 客户端"""
+        webhook_cfg = config.get("webhook") or {}
+        if not webhook_cfg.get("enabled", True):
+            logger.info("任务回调已禁用")
+            return
+        try:
+            import httpx
+        except ImportError:
+            logger.warning("未安装 httpx，任务回调不可用（pip install httpx）")
+            return
+        self.max_concurrency = max(1, int(webhook_cfg.get("max_concurrency", DEFAULT_MAX_CONCURRENCY)))
+        self.timeout_s = float(webhook_cfg.get("timeout_s", DEFAULT_TIMEOUT_S))
+        self.max_retries = max(0, int(webhook_cfg.get("max_retries", DEFAULT_MAX_RETRIES)))
+        self.backoff_base_s = float(webhook_cfg.get("backoff_base_s", DEFAULT_BACKOFF_BASE_S))
+        self.backoff_max_s = float(webhook_cfg.get("backoff_max_s", DEFAULT_BACKOFF_MAX_S))
+        self._dead_letters = deque(
+            self._dead_letters, maxlen=max(1, int(webhook_cfg.get("dead_letter_size", DEFAULT_DEAD_LETTER_SIZE)))
+        )
+        self._client = httpx.AsyncClient(
+            timeout=self.timeout_s,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            headers={"User-Agent": "fireredasr2s-rest-api"},
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.enabled = True
+        logger.info(f"任务回调已启用: max_concurrency={self.max_concurrency}, max_retries={self.max_retries}")
+
+    async def stop(self) -> None:
+        """取消未完成的投递并关闭客户端（未送达的回调记入死信）"""
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+        self.enabled = False
+
+    def dispatch(self, url: str, payload: Dict[str, Any], result_ref: Optional[Dict[str, Any]] = None) -> None:
+        """
+        在后台投递回调，立即返回
+        result_ref 非空时结果已落盘：每次投递从文件流式读取并作为 payload 的 result 字段发送
+        """
+        if not self.enabled:
+            self._dead_letter(url, payload, "任务回调未启用", 0)
+            return
+        task = asyncio.create_task(self._deliver(url, payload, result_ref))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def dead_letters(self) -> List[Dict[str, Any]]:
+        """死信列表（最新的在前），不含回调正文"""
+        return list(reversed(self._dead_letters))
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "max_concurrency": self.max_concurrency,
+            "in_flight": len(self._tasks),
+            "delivered": self.delivered,
+            "retried": self.retried,
+            "dead": self.dead,
+            "dead_letters": len(self._dead_letters),
+        }
+
+    async def _deliver(self, url: str, payload: Dict[str, Any], result_ref: Optional[Dict[str, Any]]) -> None:
+        attempts = 0
+        error = None
+        try:
+            while True:
+                attempts += 1
+                async with self._semaphore:
+                    error = await self._post(url, payload, result_ref)
+                if error is None:
+                    self.delivered += 1
+                    logger.info(f"任务回调已送达: job_id={payload.get('job_id')}, attempts={attempts}")
+                    return
+                if attempts > self.max_retries:
+                    break
+                self.retried += 1
+                # 指数退避 + 随机抖动，避免接收方恢复时被集中重试压垮
+                delay = min(self.backoff_max_s, self.backoff_base_s * (2 ** (attempts - 1)))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+        except asyncio.CancelledError:
+            error = error or "服务关闭，投递中断"
+            self._dead_letter(url, payload, error, attempts)
+            raise
+        self._dead_letter(url, payload, error, attempts)
+
+    async def _post(self, url: str, payload: Dict[str, Any], result_ref: Optional[Dict[str, Any]]) -> Optional[str]:
+        """投递一次，成功返回 None，失败返回错误描述"""
+        try:
+            if result_ref:
+                response = await self._client.post(
+                    url,
+                    content=self._stream_body(payload, result_ref),
+                    headers={"Content-Type": "application/json"},
+                )
+            else:
+                response = await self._client.post(url, json=payload)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        if 200 <= response.status_code < 300:
+            return None
+        return f"HTTP {response.status_code}"
+
+    @staticmethod
+    async def _stream_body(payload: Dict[str, Any], result_ref: Dict[str, Any]):
+        """{...payload, "result": <落盘结果>}，结果逐块解压（文件读取在线程中执行）"""
+        yield json.dumps(payload, ensure_ascii=False)[:-1].encode("utf-8") + b',"result":'
+        chunks = ResultSpool.iter_bytes(result_ref)
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+        yield b"}"
+
+    def _dead_letter(self, url: str, payload: Dict[str, Any], error: str, attempts: int) -> None:
+        self.dead += 1
+        self._dead_letters.append({
+            "job_id": payload.get("job_id"),
+            "status": payload.get("status"),
+            "url": url,
+            "error": error,
+            "attempts": attempts,
+            "failed_at": time.time(),
+        })
+        logger.warning(f"任务回调投递失败: job_id={payload.get('job_id')}, url={url}, error={error}")
+
+
+# 全局单例
+webhook_dispatcher = WebhookDispatcher()
@@ -3,6 +3,7 @@ FireRedASR2S REST API - 主应用入口
 工业级语音识别服务
 """
 # 将 FireRedASR2S 子模块路径加入 sys.path，确保可正确导入 fireredasr2s
+import asyncio
 import sys
 from pathlib import Path
 _submodule_path = Path(__file__).resolve().parent / "FireRedASR2S"
@@ -22,7 +23,7 @@ import uvicorn
 
 # 导入路由
 from api.health import router as health_router
-from api.system import router as system_router
+from api.system import router as system_router, run_transcribe_job, notify_job
 from api.admin import router as admin_router
 from api.modules.asr import router as asr_router
 from api.modules.vad import router as vad_router
@@ -32,8 +33,19 @@ from api.modules.punc import router as punc_router
 # 导入核心模块
 from core.model_manager import ModelManager
 from core.asr_system_factory import create_asr_system, summarize_models_config
+from core.batch_scheduler import create_segment_scheduler, create_transcribe_scheduler
+from core.inference_executor import inference_executor
+from core.transcode_pool import transcode_pool
+from core.result_cache import result_cache
+from core.punc_service import create_punc_service
+from core.job_store import job_store
+from core.job_queue import job_queue
+from core.webhook import webhook_dispatcher
+from core.maintenance import maintenance
+from core.stream_vad import stream_vad_service
 from utils.config_loader import load_config
 from utils.logger import setup_logger
+from utils.scratch import configure_scratch
 
 # 创建应用
 app = FastAPI(
@@ -45,17 +57,30 @@ app = FastAPI(
 # 全局变量
 model_manager = None
 asr_system = None
+batch_scheduler = None
 config = None
 logger = None
 
 @app.on_event("startup")
 async def startup_event():
     """启动事件：先创建 FireRedAsr2System，再初始化 ModelManager（从 asr_system 提取独立模块）"""
-    global model_manager, asr_system, config, logger
+    global model_manager, asr_system, batch_scheduler, config, logger
     logger = setup_logger(__name__)
     logger.info("Starting FireRedASR2S REST API...")
     config = load_config("config.yaml")
     logger.info("Configuration loaded")
+
+    # 推理线程池：限制各模块并发，避免突发流量下 torch 线程超额订阅
+    inference_config = config.get("inference", {})
+    if inference_config.get("torch_num_threads"):
+        torch.set_num_threads(int(inference_config["torch_num_threads"]))
+    inference_executor.configure(config)
+    # 临时文件目录需在转码进程池启动前确定（工作进程初始化时传入）
+    configure_scratch(config)
+    # 转码进程池在加载模型前启动，工作进程不继承模型内存
+    await asyncio.to_thread(transcode_pool.start, config)
+    result_cache.configure(config)
+    job_store.configure(config)
     models_config = config.get("models", {})
     logger.info("Models configuration summary: %s", summarize_models_config(models_config))
 
@@ -93,12 +118,57 @@ async def startup_event():
     await model_manager.initialize()
     app.state.model_manager = model_manager
 
+    # 3. 启动微批调度器（batching.enabled 时），按调用时的 app.state.asr_system 执行，兼容热重载
+    batch_scheduler = create_transcribe_scheduler(config, lambda: app.state.asr_system)
+    if batch_scheduler:
+        await batch_scheduler.start()
+    app.state.batch_scheduler = batch_scheduler
+
+    # 4. 标点服务：/modules/punc/predict 的长度分桶、并发合批与文本缓存
+    punc_service = create_punc_service(config, lambda: app.state.model_manager.get_model('punc'))
+    await punc_service.start()
+    app.state.punc_service = punc_service
+
+    # 流式 VAD（/modules/vad/stream）：独立加载 Stream-VAD 模型，各连接共享权重
+    await stream_vad_service.start(config)
+    # 流式识别（/system/transcribe/stream）：各连接的语音段合并为批量推理
+    segment_scheduler = create_segment_scheduler(config, lambda: app.state.asr_system)
+    if segment_scheduler:
+        await segment_scheduler.start()
+    app.state.segment_scheduler = segment_scheduler
+
+    # 5. 任务完成回调（共享连接池的 HTTP 客户端）与异步任务队列；
+    #    持久化任务存储时重新入队重启前未完成的任务
+    await webhook_dispatcher.start(config)
+    await job_queue.start(config, lambda job_id: run_transcribe_job(job_id, app))
+    for job_id in job_store.recover():
+        job = job_store.get_full(job_id) or {}
+        await job_queue.put(job_id, (job.get("params") or {}).get("priority", 0), force=True)
+
+    # 6. 后台维护：按 TTL 清理任务，回收遗留的临时文件与结果文件
+    await maintenance.start(config, on_terminated=notify_job)
+
     logger.info("FireRedASR2S REST API started successfully")
 
 @app.on_event("shutdown")
 async def shutdown_event():
     """关闭事件：清理模型资源"""
-    global model_manager, asr_system, logger
+    global model_manager, asr_system, batch_scheduler, logger
+    if batch_scheduler:
+        await batch_scheduler.stop()
+        batch_scheduler = None
+    segment_scheduler = getattr(app.state, "segment_scheduler", None)
+    if segment_scheduler:
+        await segment_scheduler.stop()
+    await maintenance.stop()
+    await job_queue.stop()
+    await webhook_dispatcher.stop()
+    punc_service = getattr(app.state, "punc_service", None)
+    if punc_service:
+        await punc_service.stop()
+    inference_executor.shutdown()
+    transcode_pool.shutdown()
+    job_store.close()
     if model_manager:
         await model_manager.cleanup()
         logger.info("Model resources cleaned up")
@@ -135,6 +205,7 @@ if __name__ == "__main__":
     server_config = config_from_yaml.get('server', {})
     host = server_config.get('host', DEFAULT_HOST)
     port = server_config.get('port', DEFAULT_PORT)
+    workers = server_config.get('workers', 1)
 
     # 解析命令行参数（最高优先级）
     parser = argparse.ArgumentParser(description="FireRedASR2S REST API Server")
@@ -142,10 +213,19 @@ if __name__ == "__main__":
                         help=f"Host to bind to (default: {host} from config.yaml)")
     parser.add_argument("--port", type=int, default=port, 
                         help=f"Port to bind to (default: {port} from config.yaml)")
+    parser.add_argument("--workers", type=int, default=workers,
+                        help=f"Worker processes (default: {workers} from config.yaml); >1 requires jobs.shared")
     args = parser.parse_args()
 
     # 命令行参数优先级最高
     host = args.host
     port = args.port
 
-    uvicorn.run(app, host=host, port=port)
+    if args.workers > 1:
+        # 多进程：异步任务状态与调度须经共享的 SQLite 任务存储，否则轮询可能落到不知道该任务的进程
+        jobs_config = config_from_yaml.get('jobs', {})
+        if not jobs_config.get('shared') or jobs_config.get('backend') != 'sqlite':
+            parser.error("--workers > 1 需要在 config.yaml 中设置 jobs.backend: sqlite 与 jobs.shared: true")
+        uvicorn.run("main:app", host=host, port=port, workers=args.workers)
+    else:
+        uvicorn.run(app, host=host, port=port)
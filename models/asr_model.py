@@ -3,7 +3,7 @@ ASR 模型封装类
 """
 
 import time
-from typing import Dict, Any
+from typing import Dict, Any, List
 from utils.logger import get_logger
 
 # 导入 FireRedASR2S 相关模块
@@ -70,18 +70,27 @@ class ASRModel:
         
         # FireRedASR2 使用批量处理
         uttid = kwargs.get('uttid', 'tmp')
-        batch_uttid = [uttid]
-        batch_wav_path = [audio_path]
+        return self.transcribe_batch([audio_path], [uttid])[0]
+    
+    def transcribe_batch(self, audio_paths: List[str], uttids: List[str] = None, **kwargs) -> List[Dict[str, Any]]:
+        """批量语音识别，单次调用底层 transcribe"""
+        if not self._loaded:
+            raise RuntimeError("ASR模型未加载")
+        
+        if uttids is None:
+            uttids = [f"utt_{i}" for i in range(len(audio_paths))]
         
-        results = self._model.transcribe(batch_uttid, batch_wav_path)
-        result = results[0]
+        results = self._model.transcribe(list(uttids), list(audio_paths))
         
-        return {
-            'text': result.get('text', ''),
-            'confidence': result.get('confidence', 0.0),
-            'duration': result.get('dur_s', 0.0),
-            'timestamp': result.get('timestamp', [])
-        }
+        return [
+            {
+                'text': result.get('text', ''),
+                'confidence': result.get('confidence', 0.0),
+                'duration': result.get('dur_s', 0.0),
+                'timestamp': result.get('timestamp', [])
+            }
+            for result in results
+        ]
     
     def unload(self) -> None:
         """卸载模型，释放资源"""
@@ -0,0 +1,6 @@
+"""测试公共配置：将项目根目录加入 sys.path（测试不依赖 fireredasr2s / torch，模型以桩对象代替）"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,103 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.batch_scheduler import MicroBatchScheduler
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_batches_run_concurrently_up_to_limit():
+    active, peak = 0, 0
+    lock = threading.Lock()
+
+    def handler(items):
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.1)
+        with lock:
+            active -= 1
+        return [item * 2 for item in items]
+
+    async def main():
+        scheduler = MicroBatchScheduler(handler, max_batch_size=1, max_wait_ms=0, max_concurrent_batches=2)
+        await scheduler.start()
+        try:
+            start = time.perf_counter()
+            results = await asyncio.gather(*(scheduler.submit(i) for i in range(4)))
+            elapsed = time.perf_counter() - start
+        finally:
+            await scheduler.stop()
+        return results, elapsed
+
+    results, elapsed = run(main())
+    assert results == [0, 2, 4, 6]
+    assert peak == 2
+    assert elapsed < 0.35
+
+
+def test_requests_arriving_during_inference_form_next_batch():
+    sizes = []
+
+    def handler(items):
+        sizes.append(len(items))
+        time.sleep(0.05)
+        return items
+
+    async def main():
+        scheduler = MicroBatchScheduler(handler, max_batch_size=8, max_wait_ms=0, max_concurrent_batches=1)
+        await scheduler.start()
+        try:
+            first = asyncio.create_task(scheduler.submit(0))
+            await asyncio.sleep(0.01)
+            rest = [asyncio.create_task(scheduler.submit(i)) for i in range(1, 6)]
+            await asyncio.gather(first, *rest)
+        finally:
+            await scheduler.stop()
+
+    run(main())
+    assert sizes == [1, 5]
+
+
+def test_short_result_list_fails_leftover_futures():
+    async def main():
+        scheduler = MicroBatchScheduler(lambda items: items[:1], max_batch_size=3, max_wait_ms=50)
+        await scheduler.start()
+        try:
+            return await asyncio.gather(*(scheduler.submit(i) for i in range(3)), return_exceptions=True)
+        finally:
+            await scheduler.stop()
+
+    results = run(main())
+    assert results[0] == 0
+    assert all(isinstance(r, RuntimeError) for r in results[1:])
+
+
+def test_stop_waits_for_inflight_and_fails_queued():
+    def handler(items):
+        time.sleep(0.05)
+        return items
+
+    async def main():
+        scheduler = MicroBatchScheduler(handler, max_batch_size=1, max_wait_ms=0, max_concurrent_batches=1)
+        await scheduler.start()
+        tasks = [asyncio.create_task(scheduler.submit(i)) for i in range(3)]
+        await asyncio.sleep(0.01)
+        await scheduler.stop()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    results = run(main())
+    assert results[0] == 0
+    assert all(isinstance(r, RuntimeError) for r in results[1:])
+
+
+def test_submit_requires_start():
+    scheduler = MicroBatchScheduler(lambda items: items)
+    with pytest.raises(RuntimeError):
+        run(scheduler.submit(1))
@@ -0,0 +1,72 @@
+import threading
+import time
+from types import SimpleNamespace
+
+from core.adapters import ASRAdapter, beam_size_scope
+
+
+class RecordingModel:
+    """记录每次解码开始与结束时看到的 beam_size"""
+
+    def __init__(self, beam_size=3):
+        self.config = SimpleNamespace(beam_size=beam_size)
+        self.seen = []
+
+    def transcribe(self, uttids, wavs):
+        before = self.config.beam_size
+        time.sleep(0.02)
+        self.seen.append((uttids[0], before, self.config.beam_size))
+        return [{'text': '', 'confidence': 1.0} for _ in uttids]
+
+
+def test_default_decodes_never_see_override():
+    model = RecordingModel(beam_size=3)
+    adapter = ASRAdapter(model)
+
+    def decode(name, beam_size):
+        for _ in range(5):
+            adapter.transcribe_batch(['a.wav'], [name], beam_size=beam_size)
+
+    threads = [threading.Thread(target=decode, args=(f"default{i}", None)) for i in range(3)]
+    threads += [threading.Thread(target=decode, args=(f"override{i}", 7)) for i in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert model.config.beam_size == 3
+    for uttid, before, after in model.seen:
+        expected = 7 if uttid.startswith("override") else 3
+        assert before == after == expected, (uttid, before, after)
+
+
+def test_default_decodes_run_concurrently():
+    model = RecordingModel(beam_size=3)
+    barrier = threading.Barrier(2, timeout=1)
+
+    def decode():
+        with beam_size_scope(model):
+            barrier.wait()
+
+    threads = [threading.Thread(target=decode) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not barrier.broken
+
+
+def test_override_equal_to_default_is_shared():
+    model = RecordingModel(beam_size=3)
+    barrier = threading.Barrier(2, timeout=1)
+
+    def decode(beam_size):
+        with beam_size_scope(model, beam_size):
+            barrier.wait()
+
+    threads = [threading.Thread(target=decode, args=(b,)) for b in (None, 3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not barrier.broken
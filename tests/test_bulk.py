@@ -0,0 +1,162 @@
+import asyncio
+import io
+import json
+import os
+import random
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import api.system as system_api
+from core.bulk import BulkTranscriber, parse_manifest, read_results
+from core.job_queue import job_queue
+from core.job_store import job_store
+from utils import config_loader
+from utils.error_codes import ErrorCode
+
+
+def manifest(*entries):
+    return io.BytesIO(b"".join(
+        (e if isinstance(e, bytes) else json.dumps(e).encode()) + b"\n" for e in entries
+    ))
+
+
+def parse(root, src, max_items=100):
+    dst = io.BytesIO()
+    count = parse_manifest(src, dst, str(root), max_items)
+    return count, [json.loads(line) for line in dst.getvalue().splitlines()]
+
+
+def test_manifest_is_normalised(tmp_path):
+    count, entries = parse(tmp_path, manifest(
+        {"path": "a/1.wav"}, b"", {"path": str(tmp_path / "2.wav"), "uttid": "u2"},
+    ))
+    assert count == 2
+    assert entries == [
+        {"path": str(tmp_path / "a" / "1.wav"), "uttid": "1"},
+        {"path": str(tmp_path / "2.wav"), "uttid": "u2"},
+    ]
+
+
+@pytest.mark.parametrize("entries, message", [
+    ((b"{not json",), "第 1 行不是合法的 JSON"),
+    (({"path": "a.wav"}, {"uttid": "x"}), "第 2 行缺少 path"),
+    (({"path": "a.wav", "uttid": 1},), "第 1 行 uttid 必须为字符串"),
+    (({"path": str(i)} for i in range(3)), "超过上限 2"),
+    ((), "清单为空"),
+])
+def test_invalid_manifest_rejected(tmp_path, entries, message):
+    with pytest.raises(ValueError) as excinfo:
+        parse(tmp_path, manifest(*entries), max_items=2)
+    assert message in str(excinfo.value)
+    assert excinfo.value.error_code == ErrorCode.INVALID_PARAMS
+
+
+def test_paths_outside_root_rejected(tmp_path):
+    root = tmp_path / "root"
+    root.mkdir()
+    os.symlink(tmp_path, root / "link")
+    for path in ("../secret.wav", str(tmp_path / "secret.wav"), "link/secret.wav", "a/../../secret.wav"):
+        with pytest.raises(ValueError) as excinfo:
+            parse(root, manifest({"path": "ok.wav"}, {"path": path}))
+        assert "第 2 行" in str(excinfo.value)
+
+
+def test_results_paginate_and_skip_partial_line(tmp_path):
+    path = tmp_path / "r.jsonl"
+    path.write_text("".join(json.dumps({"index": i}) + "\n" for i in range(5)) + '{"index": 5')
+    pages, offset = [], 0
+    while offset is not None:
+        items, offset = read_results(str(path), offset, 2)
+        pages.append([item["index"] for item in items])
+    assert pages == [[0, 1], [2, 3], [4]]
+    assert read_results(str(path), 2, 3) == ([{"index": 2}, {"index": 3}, {"index": 4}], 5)
+    assert read_results(str(tmp_path / "missing.jsonl"), 0, 2) == ([], None)
+
+
+class StubProcessor:
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+
+    async def transcribe_local_file(self, path, asr_system, uttid=None, scheduler=None):
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(random.random() * 0.01)
+            if uttid.endswith("3"):
+                raise ValueError("坏文件")
+            return {"text": uttid}
+        finally:
+            self.running -= 1
+
+
+def test_bulk_results_written_in_manifest_order(tmp_path):
+    manifest_path = tmp_path / "m.jsonl"
+    manifest_path.write_text("".join(json.dumps({"path": f"/a/{i}.wav", "uttid": f"u{i}"}) + "\n" for i in range(20)))
+    output_path = tmp_path / "out" / "r.jsonl"
+    processor = StubProcessor()
+    progress = []
+
+    summary = asyncio.run(BulkTranscriber(processor, object(), read_ahead=4).run(
+        str(manifest_path), str(output_path), 20, on_progress=progress.append,
+    ))
+
+    records = [json.loads(line) for line in output_path.read_text().splitlines()]
+    assert [r["index"] for r in records] == list(range(20))
+    assert [r.get("result", {}).get("text") for r in records] == [None if i in (3, 13) else f"u{i}" for i in range(20)]
+    assert records[3]["error"] == "坏文件"
+    assert summary == {"total": 20, "succeeded": 18, "failed": 2}
+    assert progress[-1] == {"items_done": 20, "items_total": 20, "failed": 2}
+    assert [p["items_done"] for p in progress] == sorted(p["items_done"] for p in progress)
+    assert processor.peak <= 4
+
+
+@pytest.fixture
+def app(monkeypatch, tmp_path):
+    monkeypatch.setattr(config_loader, "_global_config", {
+        "bulk": {"root": str(tmp_path / "root"), "results_dir": str(tmp_path / "results")},
+    })
+    (tmp_path / "root").mkdir()
+    app = FastAPI()
+    app.include_router(system_api.router, prefix="/api/v1")
+    app.state.asr_system = object()
+    return app
+
+
+def post_manifest(app, content):
+    async def main():
+        await job_queue.start({}, lambda job_id: asyncio.sleep(0))
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                submit = await client.post("/api/v1/system/transcribe/batch", files={"manifest": ("m.jsonl", content)})
+                results = None
+                if submit.json()["code"] == 0:
+                    job_id = submit.json()["data"]["job_id"]
+                    results = await client.get(f"/api/v1/system/transcribe/batch/{job_id}/results")
+                return submit.json(), results and results.json()
+        finally:
+            await job_queue.stop()
+
+    return asyncio.run(main())
+
+
+def test_batch_endpoint_rejects_escaping_manifest(app):
+    submit, _ = post_manifest(app, b'{"path": "a.wav"}\n{"path": "../../etc/passwd"}\n')
+    assert submit["code"] == ErrorCode.INVALID_PARAMS
+    assert "第 2 行" in submit["details"]
+
+
+def test_batch_endpoint_disabled_without_root(app, monkeypatch):
+    monkeypatch.setattr(config_loader, "_global_config", {"bulk": {"root": ""}})
+    submit, _ = post_manifest(app, b'{"path": "a.wav"}\n')
+    assert submit["code"] == ErrorCode.INVALID_PARAMS
+
+
+def test_batch_endpoint_queues_job(app):
+    submit, results = post_manifest(app, b'{"path": "a.wav"}\n{"path": "b.wav"}\n')
+    assert submit["code"] == 0 and submit["data"]["total"] == 2
+    assert results["data"]["items"] == [] and results["data"]["next_offset"] is None
+    os.unlink(job_store.pop_tmp_path(submit["data"]["job_id"]))
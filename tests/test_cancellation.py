@@ -0,0 +1,124 @@
+import asyncio
+import os
+import threading
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import api.system as system_api
+from core import cancellation
+from core.batch_scheduler import MicroBatchScheduler
+from core.cancellation import ClientDisconnected, DeadlineExceeded, run_cancellable
+from core.job_queue import job_queue
+from core.job_store import STATUS_CANCELLED, job_store
+from utils.error_codes import ErrorCode
+
+
+async def sleeper(state):
+    try:
+        await asyncio.sleep(5)
+    except asyncio.CancelledError:
+        state["cancelled"] = True
+        raise
+
+
+def test_deadline_cancels_recognition():
+    state = {}
+
+    async def main():
+        await run_cancellable(sleeper(state), deadline_ms=30)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(main())
+    assert state == {"cancelled": True}
+
+
+def test_client_disconnect_cancels_recognition(monkeypatch):
+    monkeypatch.setattr(cancellation, "DISCONNECT_POLL_S", 0.01)
+    state = {}
+    polls = []
+
+    class Request:
+        async def is_disconnected(self):
+            polls.append(1)
+            return len(polls) >= 3
+
+    async def main():
+        await run_cancellable(sleeper(state), request=Request())
+
+    with pytest.raises(ClientDisconnected):
+        asyncio.run(main())
+    assert len(polls) == 3 and state == {"cancelled": True}
+
+
+def test_result_returned_before_deadline():
+    async def main():
+        return await run_cancellable(asyncio.sleep(0, "ok"), deadline_ms=1000)
+
+    assert asyncio.run(main()) == "ok"
+
+
+def test_scheduler_drops_requests_cancelled_while_queued():
+    seen = []
+    release = threading.Event()
+
+    def handler(items):
+        seen.extend(items)
+        release.wait(1)
+        return items
+
+    async def main():
+        scheduler = MicroBatchScheduler(handler, max_batch_size=1, max_wait_ms=0, max_concurrent_batches=1)
+        await scheduler.start()
+        try:
+            first = asyncio.create_task(scheduler.submit("a"))
+            await asyncio.sleep(0.02)
+            second = asyncio.create_task(scheduler.submit("b"))
+            third = asyncio.create_task(scheduler.submit("c"))
+            await asyncio.sleep(0.02)
+            second.cancel()
+            release.set()
+            return await first, await third
+        finally:
+            await scheduler.stop()
+
+    assert asyncio.run(main()) == ("a", "c")
+    assert seen == ["a", "c"]
+
+
+def test_delete_cancels_queued_job(tmp_path):
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"RIFF")
+    app = FastAPI()
+    app.include_router(system_api.router, prefix="/api/v1")
+    block = None
+
+    async def main():
+        nonlocal block
+        block = asyncio.Event()
+        await job_queue.start({"job_queue": {"workers": 1}}, lambda job_id: block.wait())
+        transport = httpx.ASGITransport(app=app)
+        try:
+            running = job_store.create(tmp_path="", filename="r.wav")
+            queued = job_store.create(tmp_path=str(audio), filename="a.wav")
+            await job_queue.put(running)
+            while not job_queue.running:
+                await asyncio.sleep(0.01)
+            await job_queue.put(queued)
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                first = await client.delete(f"/api/v1/system/transcribe/{queued}")
+                again = await client.delete(f"/api/v1/system/transcribe/{queued}")
+                missing = await client.delete("/api/v1/system/transcribe/nope")
+            return queued, first.json(), again.json(), missing.json()
+        finally:
+            block.set()
+            await job_queue.stop()
+
+    queued, first, again, missing = asyncio.run(main())
+    assert first["data"] == {"job_id": queued, "status": STATUS_CANCELLED, "previous_status": "pending"}
+    assert job_store.get(queued)["status"] == STATUS_CANCELLED
+    assert job_queue.position(queued) is None
+    assert not os.path.exists(audio)
+    assert again["code"] == ErrorCode.JOB_NOT_CANCELLABLE
+    assert missing["code"] == ErrorCode.JOB_NOT_FOUND
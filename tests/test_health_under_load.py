@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from api.health import router as health_router
+from api.modules.punc import router as punc_router
+from core.inference_executor import inference_executor
+
+PUNC_SLOTS = 2
+PREDICT_S = 0.3
+
+
+class SlowPunc:
+    """阻塞式标点模型桩：占用推理线程 PREDICT_S 秒"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def predict(self, texts, uttids):
+        with self._lock:
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(PREDICT_S)
+        with self._lock:
+            self.running -= 1
+        return [{'punc_text': t + '。', 'origin_text': t, 'uttid': u} for t, u in zip(texts, uttids)]
+
+
+class StubManager:
+    def __init__(self):
+        self.punc = SlowPunc()
+
+    def get_model(self, name):
+        return self.punc if name == 'punc' else None
+
+    def get_status(self):
+        return {'asr': 'unloaded', 'vad': 'unloaded', 'lid': 'unloaded', 'punc': 'loaded'}
+
+
+@pytest.fixture
+def app():
+    inference_executor.configure({'inference': {'punc': {'slots': PUNC_SLOTS, 'max_queue': 16}}})
+    app = FastAPI()
+    app.include_router(health_router, prefix="/api/v1")
+    app.include_router(punc_router, prefix="/api/v1/modules")
+    app.state.model_manager = StubManager()
+    yield app
+    inference_executor.configure({})
+
+
+def test_health_stays_responsive_while_punc_lane_is_saturated(app):
+    punc = app.state.model_manager.punc
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test", timeout=30) as client:
+            requests = [
+                asyncio.create_task(client.post("/api/v1/modules/punc/predict", json={"texts": ["你好"]}))
+                for _ in range(PUNC_SLOTS * 3)
+            ]
+            while punc.running < PUNC_SLOTS:
+                await asyncio.sleep(0.005)
+            latencies = []
+            for _ in range(20):
+                start = time.perf_counter()
+                response = await client.get("/api/v1/health")
+                latencies.append(time.perf_counter() - start)
+                assert response.status_code == 200
+                await asyncio.sleep(0.01)
+            queued = inference_executor.get_status()["punc"]
+            responses = await asyncio.gather(*requests)
+        return latencies, queued, responses
+
+    latencies, queued, responses = asyncio.run(main())
+    assert punc.peak == PUNC_SLOTS
+    assert all(r.json()["code"] == 0 for r in responses)
+    # 健康检查期间 punc 线程全部占用且仍有请求排队
+    assert queued["running"] == PUNC_SLOTS and queued["queue_depth"] > 0
+    assert max(latencies) < 0.05, latencies
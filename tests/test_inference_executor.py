@@ -0,0 +1,79 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from core.inference_executor import ExecutorBusyError, InferenceExecutor
+from utils.error_codes import ErrorCode
+from utils.response_builder import busy_response
+
+
+def make_executor(**asr):
+    executor = InferenceExecutor()
+    executor.configure({"inference": {"retry_after_s": 1, "asr": {"slots": 1, "max_queue": 1, **asr}}})
+    return executor
+
+
+def test_queue_full_is_rejected_with_429():
+    executor = make_executor()
+    release = threading.Event()
+
+    async def main():
+        first = asyncio.create_task(executor.call("asr", release.wait))
+        second = asyncio.create_task(executor.call("asr", release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(ExecutorBusyError) as excinfo:
+            executor.check_capacity("asr")
+        release.set()
+        await asyncio.gather(first, second)
+        executor.check_capacity("asr")
+        return excinfo.value
+
+    error = asyncio.run(main())
+    executor.shutdown()
+    assert error.status_code == 429 and error.module == "asr"
+    assert error.retry_after >= 1
+
+
+def test_retry_after_follows_average_latency():
+    executor = make_executor(max_queue=0)
+
+    async def main():
+        await executor.call("asr", time.sleep, 0.2)
+        blocker = asyncio.create_task(executor.call("asr", time.sleep, 0.2))
+        await asyncio.sleep(0.01)
+        try:
+            executor.check_capacity("asr")
+        except ExecutorBusyError as e:
+            return e
+        finally:
+            await blocker
+
+    error = asyncio.run(main())
+    executor.shutdown()
+    assert error.retry_after == 1
+    response = busy_response(error.retry_after, str(error), error.status_code)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert b'"code":%d' % ErrorCode.SERVICE_BUSY in response.body
+
+
+def test_no_new_pools_after_shutdown():
+    executor = make_executor()
+    executor.shutdown()
+    threads = threading.active_count()
+
+    async def main():
+        with pytest.raises(ExecutorBusyError) as excinfo:
+            await executor.run("vad", lambda: None)
+        assert excinfo.value.status_code == 503
+        with pytest.raises(ExecutorBusyError):
+            async with executor.slot("asr", reject=False):
+                pass
+        with pytest.raises(ExecutorBusyError):
+            executor.check_capacity("lid")
+
+    asyncio.run(main())
+    assert executor.get_status() == {}
+    assert threading.active_count() == threads
@@ -0,0 +1,94 @@
+import time
+
+from core.job_backends import SQLiteJobBackend
+
+
+def make_job(job_id, finished=False, priority=0, created_at=None):
+    now = created_at or time.time()
+    return {
+        "job_id": job_id, "status": "completed" if finished else "pending", "created_at": now, "updated_at": now,
+        "finished_at": now if finished else None, "fetched": False, "params": {}, "priority": priority,
+    }
+
+
+def trace_statements(backend):
+    statements = []
+    backend._conn.set_trace_callback(statements.append)
+    return statements
+
+
+def test_shared_eviction_does_not_scan_table(tmp_path):
+    backend = SQLiteJobBackend(str(tmp_path / "jobs.db"), max_jobs=3)
+    backend.shared = True
+    statements = trace_statements(backend)
+    for i in range(5):
+        backend.insert(make_job(f"job{i}", finished=True))
+        backend.update(f"job{i}", status="completed", finished_at=time.time())
+    assert not [s for s in statements if "COUNT(*)" in s.upper()]
+    assert backend.count_by_status() == {"completed": 3}
+    assert backend.evicted == 2
+    backend.close()
+
+
+def test_count_includes_other_process_writes(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first = SQLiteJobBackend(path, max_jobs=4)
+    second = SQLiteJobBackend(path, max_jobs=4)
+    first.shared = second.shared = True
+    for i in range(3):
+        first.insert(make_job(f"a{i}", finished=True))
+    for i in range(3):
+        second.insert(make_job(f"b{i}", finished=True))
+    assert sum(second.count_by_status().values()) == 4
+    assert first._stored_count() == 4
+    first.close()
+    second.close()
+
+
+def test_counter_initialized_for_existing_database(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    backend = SQLiteJobBackend(path, max_jobs=10)
+    for i in range(4):
+        backend.insert(make_job(f"job{i}"))
+    backend._conn.execute("DROP TRIGGER jobs_count_insert")
+    backend._conn.execute("DROP TRIGGER jobs_count_delete")
+    backend._conn.execute("DROP TABLE jobs_count")
+    backend.close()
+
+    reopened = SQLiteJobBackend(path, max_jobs=10)
+    assert reopened._stored_count() == 4
+    reopened.delete("job0")
+    assert reopened._stored_count() == 3
+    reopened.close()
+
+
+def test_claim_order_and_exclusivity(tmp_path):
+    path = str(tmp_path / "jobs.db")
+    first = SQLiteJobBackend(path, max_jobs=100)
+    second = SQLiteJobBackend(path, max_jobs=100)
+    for i, priority in enumerate([0, 5, 0, 5]):
+        first.insert(make_job(f"job{i}", priority=priority, created_at=1000 + i))
+    assert first.pending_ahead("job2") == 3
+    claimed = [first.claim("w1", 60), second.claim("w2", 60), first.claim("w1", 60), second.claim("w2", 60)]
+    assert claimed == ["job1", "job3", "job0", "job2"]
+    assert first.claim("w1", 60) is None and first.count_pending() == 0
+    assert second.get("job3")["worker_id"] == "w2"
+    first.close()
+    second.close()
+
+
+def test_expired_lease_is_taken_over_and_release_returns_job(tmp_path):
+    backend = SQLiteJobBackend(str(tmp_path / "jobs.db"), max_jobs=100)
+    backend.insert(make_job("a"))
+    backend.insert(make_job("b"))
+    assert backend.claim("dead", 0.01) == "a"
+    assert backend.claim("w1", 60) == "b"
+    time.sleep(0.02)
+    backend.renew(["b"], "w1", 60)
+    # a 的租约已过期（所属进程已退出），由其他进程接管；b 已续期，不被接管
+    assert backend.claim("w2", 60) == "a"
+    assert backend.claim("w3", 60) is None
+    assert not backend.release("a", "dead")
+    assert backend.release("a", "w2")
+    assert backend.get("a")["status"] == "pending" and backend.get("a")["worker_id"] is None
+    backend.close()
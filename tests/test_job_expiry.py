@@ -0,0 +1,82 @@
+import asyncio
+import os
+import time
+from types import SimpleNamespace
+
+import api.system as system_api
+from core.job_queue import job_queue
+from core.job_store import STATUS_EXPIRED, job_store
+
+
+def spooled_file(tmp_path, name):
+    path = tmp_path / name
+    path.write_bytes(b"RIFF")
+    return str(path)
+
+
+def test_job_expired_at_start_is_not_cancelled(tmp_path):
+    app = SimpleNamespace(state=SimpleNamespace())
+    outcomes = []
+
+    async def handler(job_id):
+        try:
+            await system_api.run_transcribe_job(job_id, app)
+            outcomes.append("returned")
+        except asyncio.CancelledError:
+            outcomes.append("cancelled")
+            raise
+
+    async def main():
+        await job_queue.start({}, handler)
+        try:
+            audio = spooled_file(tmp_path, "a.wav")
+            job_id = job_store.create(tmp_path=audio, filename="a.wav", params={"deadline_at": time.time() - 1})
+            await job_queue.put(job_id)
+            while not outcomes:
+                await asyncio.sleep(0.01)
+        finally:
+            await job_queue.stop()
+        return job_id, audio
+
+    job_id, audio = asyncio.run(main())
+    assert outcomes == ["returned"]
+    assert job_store.get(job_id)["status"] == STATUS_EXPIRED
+    assert not os.path.exists(audio)
+
+
+def test_queued_expiry_does_not_touch_running_job(tmp_path):
+    release = None
+    outcomes = []
+
+    async def handler(job_id):
+        try:
+            await release.wait()
+            outcomes.append(job_id)
+        except asyncio.CancelledError:
+            outcomes.append("cancelled")
+            raise
+
+    async def main():
+        nonlocal release
+        release = asyncio.Event()
+        await job_queue.start({"job_queue": {"workers": 1}}, handler)
+        try:
+            running = job_store.create(tmp_path="", filename="a.wav")
+            queued = job_store.create(tmp_path=spooled_file(tmp_path, "b.wav"), filename="b.wav")
+            await job_queue.put(running)
+            await job_queue.put(queued)
+            while not job_queue.running:
+                await asyncio.sleep(0.01)
+            system_api._expire_pending(queued)
+            assert job_queue.position(queued) is None
+            release.set()
+            while not outcomes:
+                await asyncio.sleep(0.01)
+            await asyncio.sleep(0.05)
+        finally:
+            await job_queue.stop()
+        return running, queued
+
+    running, queued = asyncio.run(main())
+    assert outcomes == [running]
+    assert job_store.get(queued)["status"] == STATUS_EXPIRED
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from core.inference_executor import ExecutorBusyError
+from core.job_queue import JobQueue
+
+
+def test_priority_then_fifo_order():
+    order = []
+
+    async def main():
+        queue = JobQueue()
+        gate = asyncio.Event()
+
+        async def handler(job_id):
+            if job_id == "blocker":
+                await gate.wait()
+            order.append(job_id)
+
+        await queue.start({"job_queue": {"workers": 1}}, handler)
+        await queue.put("blocker")
+        await asyncio.sleep(0)
+        for job_id, priority in [("low1", 0), ("high1", 5), ("low2", 0), ("mid", 1), ("high2", 5)]:
+            await queue.put(job_id, priority)
+        assert queue.position("high1")["queue_position"] == 1
+        assert queue.position("high2")["queue_position"] == 2
+        assert queue.position("low2")["queue_position"] == 5
+        gate.set()
+        while queue.completed < 6:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+
+    asyncio.run(main())
+    assert order == ["blocker", "high1", "high2", "mid", "low1", "low2"]
+
+
+def test_full_queue_rejects_with_429():
+    async def main():
+        queue = JobQueue()
+        gate = asyncio.Event()
+
+        async def handler(job_id):
+            await gate.wait()
+
+        await queue.start({"job_queue": {"workers": 1, "max_queue": 2, "retry_after_s": 7}}, handler)
+        await queue.put("running")
+        await asyncio.sleep(0)
+        await queue.put("a")
+        await queue.put("b")
+        with pytest.raises(ExecutorBusyError) as excinfo:
+            await queue.put("c", priority=10)
+        # 服务重启恢复的任务不受队列长度限制
+        await queue.put("recovered", force=True)
+        status = queue.get_status()
+        gate.set()
+        await queue.stop()
+        return excinfo.value, status
+
+    error, status = asyncio.run(main())
+    assert error.status_code == 429 and error.retry_after == 7
+    assert status["queued"] == 3 and status["rejected"] == 1 and status["running"] == 1
+
+
+def test_not_started_is_503():
+    queue = JobQueue()
+    with pytest.raises(ExecutorBusyError) as excinfo:
+        queue.check_capacity()
+    assert excinfo.value.status_code == 503
+
+
+def test_estimated_start_uses_average_job_time():
+    async def main():
+        queue = JobQueue()
+        gate = asyncio.Event()
+
+        async def handler(job_id):
+            await gate.wait()
+
+        await queue.start({"job_queue": {"workers": 2}}, handler)
+        queue.avg_job_s = 10.0
+        for job_id in ("r1", "r2", "q1", "q2", "q3"):
+            await queue.put(job_id)
+        await asyncio.sleep(0)
+        positions = [queue.position(job_id) for job_id in ("q1", "q2", "q3")]
+        gate.set()
+        await queue.stop()
+        return positions
+
+    positions = asyncio.run(main())
+    assert [p["queue_position"] for p in positions] == [1, 2, 3]
+    # 两个工作协程均在执行：前方 (ahead + running) / workers 轮，每轮 10 秒
+    assert [p["estimated_start_s"] for p in positions] == [10.0, 15.0, 20.0]
@@ -0,0 +1,50 @@
+import asyncio
+
+from core.job_store import JobStore
+
+
+def test_timed_out_waits_do_not_leak_events():
+    store = JobStore()
+    job_id = store.create(tmp_path="", filename="a.wav")
+
+    async def main():
+        for _ in range(3):
+            assert not await store.wait_for_change(job_id, 0.01)
+        waiters = [asyncio.create_task(store.wait_for_change(job_id, 0.05 * (i + 1))) for i in range(3)]
+        await asyncio.sleep(0.07)
+        # 第一个等待者已超时离开，其余仍共用同一个 Event
+        assert len(store._events) == 1
+        return await asyncio.gather(*waiters)
+
+    assert asyncio.run(main()) == [False, False, False]
+    assert store._events == {} and store._waiters == {}
+
+
+def test_waiters_are_woken_by_updates():
+    store = JobStore()
+    job_id = store.create(tmp_path="", filename="a.wav")
+
+    async def main():
+        waiter = asyncio.create_task(store.wait_for_change(job_id, 1))
+        await asyncio.sleep(0.01)
+        store.set_processing(job_id)
+        return await waiter
+
+    assert asyncio.run(main()) is True
+    assert store._events == {} and store._waiters == {}
+
+
+def test_eviction_wakes_waiters():
+    store = JobStore()
+    store.configure({"jobs": {"max_jobs": 1}})
+    job_id = store.create(tmp_path="", filename="a.wav")
+    store.set_failed(job_id, "x")
+
+    async def main():
+        waiter = asyncio.create_task(store.wait_for_change(job_id, 1))
+        await asyncio.sleep(0.01)
+        store.create(tmp_path="", filename="b.wav")
+        return await waiter
+
+    assert asyncio.run(main()) is True
+    assert store.get(job_id) is None and store._events == {}
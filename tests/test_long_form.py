@@ -0,0 +1,116 @@
+import asyncio
+import threading
+import time
+import wave
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from core.inference_executor import inference_executor
+from core.long_form import LongFormTranscriber
+from core.processor import RequestProcessor
+
+SEGMENTS = [(0.0, 1.0), (2.0, 2.5), (3.0, 5.0), (6.0, 6.2), (7.0, 9.0)]
+
+
+class StubVAD:
+    def detect(self, audio):
+        return {'timestamps': SEGMENTS}, None
+
+
+class StubASR:
+    """记录每批分段（uttid 与样本数），文本取分段起始毫秒"""
+
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, uttids, wavs):
+        with self._lock:
+            self.batches.append([(u, len(w[1])) for u, w in zip(uttids, wavs)])
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.delay)
+        with self._lock:
+            self.running -= 1
+        return [{'text': f"seg{u.split('_s')[1].split('_')[0]}", 'confidence': 0.9} for u in uttids]
+
+
+class StubPunc:
+    def process(self, texts, uttids):
+        return [{'punc_text': t + '。'} for t in texts]
+
+
+def make_system(asr, asr_batch_size=2):
+    return SimpleNamespace(
+        config=SimpleNamespace(asr_batch_size=asr_batch_size, punc_batch_size=8,
+                               enable_vad=True, enable_lid=False, enable_punc=True),
+        vad=StubVAD(), lid=None, asr=asr, punc=StubPunc(),
+    )
+
+
+@pytest.fixture
+def wav_path(tmp_path):
+    path = str(tmp_path / "long.wav")
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(np.zeros(16000 * 10, dtype=np.int16).tobytes())
+    return path
+
+
+@pytest.fixture(autouse=True)
+def executor():
+    inference_executor.configure({'inference': {'asr': {'slots': 2}}})
+    yield
+    inference_executor.configure({})
+
+
+def test_segments_batched_by_duration_and_joined_in_time_order(wav_path):
+    asr = StubASR()
+    progress = []
+    transcriber = LongFormTranscriber(make_system(asr), {'long_form': {'parallel_batches': 1}})
+    out = asyncio.run(transcriber.transcribe(wav_path, 'utt', on_progress=progress.append))
+
+    # 分段按时长排序后每 2 个一批：0.2s+0.5s、1s+2s、2s
+    assert [[n for _, n in batch] for batch in asr.batches] == [[3200, 8000], [16000, 32000], [32000]]
+    assert out['vad_segments_ms'] == [(int(s * 1000), int(e * 1000)) for s, e in SEGMENTS]
+    assert [s['text'] for s in out['sentences']] == ['seg0。', 'seg2000。', 'seg3000。', 'seg6000。', 'seg7000。']
+    assert out['text'] == 'seg0。seg2000。seg3000。seg6000。seg7000。'
+    assert out['dur_s'] == 10.0
+
+    assert [p['segments_done'] for p in progress] == [0, 2, 4, 5]
+    assert all(p['segments_total'] == 5 for p in progress)
+    assert progress[0]['rtf'] is None and progress[-1]['rtf'] is not None
+    assert progress[-1]['decoded_s'] == pytest.approx(progress[-1]['speech_s'])
+
+
+def test_batches_run_in_parallel_up_to_limit(wav_path):
+    asr = StubASR(delay=0.05)
+    transcriber = LongFormTranscriber(make_system(asr, asr_batch_size=1), {'long_form': {'parallel_batches': 2}})
+    out = asyncio.run(transcriber.transcribe(wav_path, 'utt'))
+    assert len(asr.batches) == 5 and asr.peak == 2
+    assert [s['start_ms'] for s in out['sentences']] == [0, 2000, 3000, 6000, 7000]
+
+
+def test_processor_keeps_callers_file(wav_path):
+    asr = StubASR()
+    processor = RequestProcessor(None, {'long_form': {'max_audio_duration': 60, 'parallel_batches': 1}})
+    out = asyncio.run(processor.transcribe_long_form(wav_path, 'long.wav', make_system(asr), uttid='u'))
+    assert out['uttid'] == 'u' and len(out['sentences']) == 5
+    assert 'processing_time_ms' in out
+    # 标准 WAV 就地识别，不复制也不删除调用方的文件
+    with wave.open(wav_path, 'rb') as w:
+        assert w.getnframes() == 160000
+
+
+def test_processor_rejects_over_long_audio(wav_path):
+    processor = RequestProcessor(None, {'long_form': {'max_audio_duration': 5}})
+    with pytest.raises(ValueError) as excinfo:
+        asyncio.run(processor.transcribe_long_form(wav_path, 'long.wav', make_system(StubASR())))
+    assert excinfo.value.error_code == 4003
@@ -0,0 +1,107 @@
+import asyncio
+import os
+import time
+import uuid
+
+import pytest
+
+from core import maintenance as maintenance_module
+from core.job_queue import job_queue
+from core.job_store import STATUS_FAILED, JobStore
+from core.maintenance import MaintenanceService
+from utils import scratch
+
+
+def age(path, seconds):
+    """将文件修改时间调到 seconds 秒之前"""
+    then = time.time() - seconds
+    os.utime(path, (then, then))
+    return str(path)
+
+
+@pytest.fixture
+def env(tmp_path, monkeypatch):
+    store = JobStore()
+    store.configure({"jobs": {
+        "results_dir": str(tmp_path / "results"), "spool_threshold_bytes": 0, "result_codec": "gzip",
+    }})
+    monkeypatch.setattr(maintenance_module, "job_store", store)
+    monkeypatch.setattr(scratch, "_scratch_dir", str(tmp_path / "scratch"))
+    (tmp_path / "scratch").mkdir()
+    (tmp_path / "bulk").mkdir()
+    config = {
+        "bulk": {"results_dir": str(tmp_path / "bulk")},
+        "maintenance": {"enabled": False, "tmp_max_age_s": 3600, "result_grace_s": 600},
+    }
+    terminated = []
+    service = MaintenanceService()
+    asyncio.run(service.start(config, on_terminated=terminated.append))
+    return store, service, tmp_path, terminated
+
+
+def test_finished_jobs_purged_after_ttl(env):
+    store, service, tmp_path, _ = env
+    old = store.create(tmp_path="", filename="a.wav")
+    store.set_completed(old, {"text": "旧"})
+    ref = store.get_full(old)["result_ref"]
+    store._backend.update(old, finished_at=time.time() - 90000)
+    fresh = store.create(tmp_path="", filename="b.wav")
+    store.set_completed(fresh, {"text": "新"})
+
+    report = asyncio.run(service.run_once())
+    assert report["jobs_removed"] == {"completed": 1}
+    assert store.get(old) is None and not os.path.exists(ref["path"])
+    assert store.get(fresh) is not None and os.path.exists(store.get_full(fresh)["result_ref"]["path"])
+
+
+def test_pending_job_without_audio_is_failed(env):
+    store, service, _, terminated = env
+    job_id = store.create(tmp_path="/nonexistent.wav", filename="a.wav")
+    report = asyncio.run(service.run_once())
+    assert report["orphaned_jobs"] == 1
+    assert store.get(job_id)["status"] == STATUS_FAILED
+    assert terminated == [job_id]
+    assert job_queue.position(job_id) is None
+
+
+def test_stale_scratch_files_reaped_except_live_job_audio(env):
+    store, service, tmp_path, _ = env
+    stale = tmp_path / "scratch" / "tmpa.wav"
+    stale.write_bytes(b"x" * 10)
+    age(stale, 7200)
+    live = tmp_path / "scratch" / "tmpb.wav"
+    live.write_bytes(b"x")
+    age(live, 7200)
+    store.create(tmp_path=str(live), filename="b.wav")
+    recent = tmp_path / "scratch" / "tmpc.wav"
+    recent.write_bytes(b"x")
+
+    report = asyncio.run(service.run_once())
+    assert report["tmp_files"] == 1 and report["bytes_reclaimed"] == 10
+    assert not stale.exists() and live.exists() and recent.exists()
+
+
+def test_only_orphaned_job_result_files_are_reaped(env):
+    store, service, tmp_path, _ = env
+    results, bulk = tmp_path / "results", tmp_path / "bulk"
+    results.mkdir(exist_ok=True)
+    kept_job = store.create(tmp_path="", filename="a.wav")
+    orphan_id = str(uuid.uuid4())
+    orphans = [results / f"{orphan_id}.json.gz", results / f"{uuid.uuid4()}.json.zst.tmp", bulk / f"{orphan_id}.jsonl"]
+    survivors = [
+        results / f"{kept_job}.json.gz",        # 所属任务仍存在
+        results / "notes.txt",                  # 非任务文件
+        results / "summary.json",
+        bulk / f"{orphan_id}-report.jsonl",
+        bulk / f"{orphan_id.upper()}.jsonl",
+    ]
+    for path in orphans + survivors:
+        path.write_bytes(b"{}")
+        age(path, 3600)
+    in_progress = bulk / f"{uuid.uuid4()}.jsonl.tmp"   # 保护期内（可能仍在写入）
+    in_progress.write_bytes(b"{}")
+
+    report = asyncio.run(service.run_once())
+    assert report["result_files"] == len(orphans)
+    assert not any(path.exists() for path in orphans)
+    assert all(path.exists() for path in survivors) and in_progress.exists()
@@ -0,0 +1,34 @@
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+from api.modules.asr import router as asr_router
+from api.modules.lid import router as lid_router
+from api.modules.punc import router as punc_router
+from api.modules.vad import router as vad_router
+
+
+def make_client():
+    # 与 main.py 的挂载方式一致
+    app = FastAPI()
+    for router in (asr_router, vad_router, lid_router, punc_router):
+        app.include_router(router, prefix="/api/v1/modules")
+    return TestClient(app)
+
+
+def test_module_paths_match_documentation():
+    client = make_client()
+    for path in (
+        "/api/v1/modules/asr/transcribe",
+        "/api/v1/modules/vad/detect",
+        "/api/v1/modules/vad/aed",
+        "/api/v1/modules/lid/detect",
+        "/api/v1/modules/punc/predict",
+    ):
+        assert client.post(path).status_code != 404, path
+    assert client.post("/api/v1/modules/api/v1/modules/vad/detect").status_code == 404
+
+
+def test_vad_stream_websocket_path():
+    with make_client().websocket_connect("/api/v1/modules/vad/stream") as ws:
+        # 测试环境未加载流式 VAD 模型，连接建立后返回 error 事件
+        assert ws.receive_json()["event"] == "error"
@@ -0,0 +1,130 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+
+import api.system as system_api
+import core.processor as processor_module
+from core.inference_executor import ExecutorBusyError, inference_executor
+from utils import config_loader
+from utils.audio_validator import parse_pcm_headers
+from utils.error_codes import ErrorCode
+
+SAMPLES = np.array([0, 1000, -1000, 32767, -32768], dtype=np.int16)
+
+
+@pytest.fixture(autouse=True)
+def setup(monkeypatch):
+    monkeypatch.setattr(config_loader, "_global_config", {
+        "processing": {"max_file_size": 4096, "max_audio_duration": 0.1},
+    })
+    inference_executor.configure({"inference": {"asr": {"slots": 1, "max_queue": 4}}})
+    seen = []
+
+    def transcribe_audio(asr_system, audio, uttid):
+        seen.append(audio)
+        return {"uttid": uttid, "text": "好"}
+
+    monkeypatch.setattr(processor_module, "transcribe_audio", transcribe_audio)
+    yield seen
+    inference_executor.configure({})
+
+
+def post_pcm(body, headers):
+    app = FastAPI()
+    app.include_router(system_api.router, prefix="/api/v1")
+    app.state.asr_system = object()
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.post("/api/v1/system/transcribe/pcm", content=body, headers=headers)
+            return response.json()
+
+    return asyncio.run(main())
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ({"content-type": "audio/L16;rate=16000;channels=1"}, "s16le"),
+    ({"content-type": "application/octet-stream", "x-sample-format": "f32le"}, "f32le"),
+    ({"content-type": "audio/pcm", "x-sample-rate": "16000", "x-channels": "1"}, "s16le"),
+])
+def test_parse_pcm_headers(headers, expected):
+    assert parse_pcm_headers(headers) == expected
+
+
+@pytest.mark.parametrize("headers", [
+    {"content-type": "audio/L16;rate=8000"},
+    {"content-type": "audio/L16;rate=16000;channels=2"},
+    {"content-type": "audio/L16;rate=16000", "x-sample-rate": "44100"},
+    {"content-type": "audio/L16;rate=16000;endianness=big-endian"},
+    {"content-type": "audio/wav"},
+    {"content-type": "application/octet-stream", "x-sample-format": "s24le"},
+])
+def test_unsupported_pcm_headers_rejected(headers):
+    with pytest.raises(ValueError) as e:
+        parse_pcm_headers(headers)
+    assert e.value.error_code == ErrorCode.INVALID_AUDIO_FORMAT
+
+
+def test_l16_body_goes_to_pipeline_as_samples(setup):
+    result = post_pcm(SAMPLES.tobytes(), {"content-type": "audio/L16;rate=16000;channels=1"})
+    assert result["data"]["text"] == "好"
+    sample_rate, samples = setup[0]
+    assert sample_rate == 16000 and samples.tolist() == SAMPLES.tolist()
+
+
+def test_f32le_body_converted_to_int16(setup):
+    body = np.array([0.0, 0.5, -2.0], dtype="<f4").tobytes()
+    post_pcm(body, {"content-type": "application/octet-stream", "x-sample-format": "f32le"})
+    assert setup[0][1].tolist() == [0, 16383, -32767]
+
+
+@pytest.mark.parametrize("body, code", [
+    (b"", ErrorCode.INVALID_AUDIO_FORMAT),
+    (b"\x00\x01\x02", ErrorCode.INVALID_AUDIO_FORMAT),                   # 非样本宽度整数倍
+    (np.zeros(2000, dtype=np.int16).tobytes(), ErrorCode.AUDIO_DURATION_EXCEEDED),
+    (np.zeros(4000, dtype=np.int16).tobytes(), ErrorCode.AUDIO_FILE_TOO_LARGE),
+])
+def test_bad_bodies_rejected(setup, body, code):
+    result = post_pcm(body, {"content-type": "audio/L16;rate=16000"})
+    assert result["code"] == code
+    assert setup == []
+
+
+def test_body_read_without_holding_asr_slot(setup):
+    held = []
+
+    async def chunks():
+        held.append(inference_executor._lane("asr").inflight)
+        yield SAMPLES.tobytes()
+
+    async def main():
+        processor = processor_module.RequestProcessor(None, {})
+        return await processor.transcribe_pcm(chunks(), "s16le", asr_system=object())
+
+    assert asyncio.run(main())["text"] == "好"
+    assert held == [0]
+
+
+def test_queue_full_rejected_before_reading_body(setup, monkeypatch):
+    read = []
+
+    async def chunks():
+        read.append(1)
+        yield SAMPLES.tobytes()
+
+    def full(module):
+        raise ExecutorBusyError(module, 1)
+
+    monkeypatch.setattr(inference_executor, "check_capacity", full)
+
+    async def main():
+        processor = processor_module.RequestProcessor(None, {})
+        await processor.transcribe_pcm(chunks(), "s16le", asr_system=object())
+
+    with pytest.raises(ExecutorBusyError):
+        asyncio.run(main())
+    assert read == []
@@ -0,0 +1,111 @@
+import asyncio
+import threading
+
+from core.inference_executor import inference_executor
+from core.punc_service import PuncService
+
+
+class RecordingPunc:
+    """记录每次 predict 收到的文本批"""
+
+    def __init__(self):
+        self.batches = []
+        self._lock = threading.Lock()
+
+    def predict(self, texts, uttids):
+        with self._lock:
+            self.batches.append(list(texts))
+        return [{'punc_text': t + '。', 'origin_text': t, 'uttid': u} for t, u in zip(texts, uttids)]
+
+
+def run(service, coro_factory):
+    async def main():
+        await service.start()
+        try:
+            return await coro_factory()
+        finally:
+            await service.stop()
+
+    return asyncio.run(main())
+
+
+def test_large_request_is_deduplicated_sorted_and_split():
+    model = RecordingPunc()
+    service = PuncService(lambda: model, batch_size=2, merge=False)
+    texts = ['aaaa', 'b', 'ccc', 'b', 'dd', '']
+    out = run(service, lambda: service.predict(texts, [f'u{i}' for i in range(len(texts))]))
+
+    assert model.batches == [['b', 'dd'], ['ccc', 'aaaa']]
+    assert [r['punc_text'] for r in out['results']] == ['aaaa。', 'b。', 'ccc。', 'b。', 'dd。', '']
+    assert [r['uttid'] for r in out['results']] == [f'u{i}' for i in range(len(texts))]
+    assert sorted((b['size'], b['max_chars'], b['merged']) for b in out['batches']) == [(2, 2, False), (2, 4, False)]
+
+
+def test_concurrent_small_requests_are_merged():
+    model = RecordingPunc()
+    service = PuncService(lambda: model, batch_size=8, max_wait_ms=50)
+
+    async def requests():
+        return await asyncio.gather(*[service.predict([f'text{i}'], [f'u{i}']) for i in range(3)])
+
+    outs = run(service, requests)
+    assert len(model.batches) == 1 and sorted(model.batches[0]) == ['text0', 'text1', 'text2']
+    for i, out in enumerate(outs):
+        assert out['results'][0]['punc_text'] == f'text{i}。'
+        assert out['batches'][0]['merged'] is True and out['batches'][0]['size'] == 3
+
+
+def test_cache_hits_skip_inference():
+    model = RecordingPunc()
+    service = PuncService(lambda: model, batch_size=4, merge=False)
+
+    async def twice():
+        first = await service.predict(['你好', '世界'], ['a', 'b'])
+        second = await service.predict(['世界', '再见'], ['c', 'd'])
+        return first, second
+
+    first, second = run(service, twice)
+    assert first['cache_hits'] == 0 and second['cache_hits'] == 1
+    assert model.batches == [['你好', '世界'], ['再见']]
+    assert [r['punc_text'] for r in second['results']] == ['世界。', '再见。']
+    status = service.get_status()
+    assert status['cache_hits'] == 1 and status['cache_misses'] == 3
+
+
+def test_cache_is_lru_bounded():
+    model = RecordingPunc()
+    service = PuncService(lambda: model, batch_size=4, cache_size=2, merge=False)
+
+    async def calls():
+        await service.predict(['a'], ['1'])
+        await service.predict(['b'], ['2'])
+        await service.predict(['a'], ['3'])  # a 变为最近使用
+        await service.predict(['c'], ['4'])  # 淘汰 b
+        await service.predict(['a'], ['5'])
+        await service.predict(['b'], ['6'])
+
+    run(service, calls)
+    assert model.batches == [['a'], ['b'], ['c'], ['b']]
+    assert service.get_status()['cache_entries'] == 2
+
+
+def test_cache_disabled_and_cleared():
+    model = RecordingPunc()
+    service = PuncService(lambda: model, batch_size=4, cache_size=0, merge=False)
+
+    async def calls():
+        await service.predict(['a'], ['1'])
+        await service.predict(['a'], ['2'])
+
+    run(service, calls)
+    assert model.batches == [['a'], ['a']]
+
+    cached = PuncService(lambda: model, batch_size=4, merge=False)
+    run(cached, lambda: cached.predict(['x'], ['1']))
+    cached.clear_cache()
+    run(cached, lambda: cached.predict(['x'], ['2']))
+    assert model.batches[-2:] == [['x'], ['x']]
+
+
+def teardown_module():
+    inference_executor.configure({})
@@ -0,0 +1,108 @@
+import json
+import os
+
+import pytest
+
+from core import result_cache as result_cache_module
+from core.result_cache import ResultCache
+
+KEY = ResultCache.make_key("a" * 64, "f" * 16)
+RESULT = {"uttid": "u1", "text": "你好", "sentences": [{"text": "你好", "start_ms": 0, "end_ms": 800}]}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache_module.time, "time", lambda: now[0])
+    return now
+
+
+def make_cache(tmp_path=None, **cfg):
+    cache = ResultCache()
+    cache_cfg = {"enabled": True, **cfg}
+    if tmp_path is not None:
+        cache_cfg["disk_dir"] = str(tmp_path)
+    cache.configure({"cache": cache_cfg})
+    return cache
+
+
+def test_hit_and_miss():
+    cache = make_cache()
+    assert cache.get(KEY) is None
+    cache.put(KEY, RESULT)
+    hit = cache.get(KEY)
+    assert hit == RESULT
+    # 命中返回副本，调用方修改不影响缓存内容
+    hit["uttid"] = "changed"
+    assert cache.get(KEY)["uttid"] == "u1"
+    status = cache.get_status()
+    assert status["hits"] == 2 and status["misses"] == 1
+
+
+def test_disabled_cache_stores_nothing():
+    cache = ResultCache()
+    cache.put(KEY, RESULT)
+    assert cache.get(KEY) is None
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = make_cache(ttl_s=10)
+    cache.put(KEY, RESULT)
+    clock[0] += 9
+    assert cache.get(KEY) == RESULT
+    clock[0] += 2
+    assert cache.get(KEY) is None
+    assert cache.get_status()["entries"] == 0
+
+
+def test_lru_evicts_beyond_byte_budget():
+    blob_size = len(json.dumps(RESULT, ensure_ascii=False).encode("utf-8"))
+    cache = make_cache(max_bytes=blob_size * 2)
+    keys = [ResultCache.make_key(str(i) * 64, "f" * 16) for i in range(3)]
+    cache.put(keys[0], RESULT)
+    cache.put(keys[1], RESULT)
+    cache.get(keys[0])
+    cache.put(keys[2], RESULT)
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) == RESULT and cache.get(keys[2]) == RESULT
+
+
+def test_put_from_before_invalidation_is_dropped(tmp_path):
+    cache = make_cache(tmp_path)
+    generation = cache.generation
+    cache.put(KEY, RESULT, generation)
+    assert cache.invalidate() == 2
+    assert cache.get(KEY) is None
+    # 失效前开始的推理结果不写回
+    cache.put(KEY, RESULT, generation)
+    assert cache.get(KEY) is None
+    assert os.listdir(tmp_path) == []
+    cache.put(KEY, RESULT, cache.generation)
+    assert cache.get(KEY) == RESULT
+
+
+def test_disk_tier_is_json_and_survives_restart(tmp_path):
+    make_cache(tmp_path).put(KEY, RESULT)
+    (name,) = os.listdir(tmp_path)
+    with open(tmp_path / name, encoding="utf-8") as f:
+        assert json.load(f) == RESULT
+    cache = make_cache(tmp_path)
+    assert cache.get(KEY) == RESULT
+    assert cache.get_status()["disk_hits"] == 1
+
+
+def test_corrupt_disk_entry_is_a_miss(tmp_path):
+    make_cache(tmp_path).put(KEY, RESULT)
+    (name,) = os.listdir(tmp_path)
+    (tmp_path / name).write_bytes(b"\x80\x04not json")
+    cache = make_cache(tmp_path)
+    assert cache.get(KEY) is None
+    assert os.listdir(tmp_path) == []
+
+
+def test_overwriting_disk_entry_keeps_byte_count(tmp_path):
+    cache = make_cache(tmp_path)
+    for _ in range(5):
+        cache.put(KEY, RESULT)
+    (name,) = os.listdir(tmp_path)
+    assert cache.get_status()["disk_bytes"] == os.path.getsize(tmp_path / name)
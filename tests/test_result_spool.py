@@ -0,0 +1,102 @@
+import asyncio
+import gzip
+import json
+import os
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import api.system as system_api
+from core import result_spool
+from core.job_store import JobStore
+from core.result_spool import ResultSpool, dump_result
+
+
+def big_result(words):
+    return {"text": "字" * words, "words": [{"word": "字", "start_ms": i, "end_ms": i + 1} for i in range(words)]}
+
+
+def make_store(tmp_path, **jobs_cfg):
+    store = JobStore()
+    store.configure({"jobs": {"results_dir": str(tmp_path / "results"), "result_codec": "gzip", **jobs_cfg}})
+    return store
+
+
+def complete(store, result):
+    job_id = store.create(tmp_path="", filename="a.wav")
+    assert store.set_completed(job_id, result)
+    return job_id, store.get_full(job_id)
+
+
+def test_results_over_threshold_are_spooled(tmp_path):
+    store = make_store(tmp_path, spool_threshold_bytes=1024)
+
+    _, small = complete(store, {"text": "短"})
+    assert small["result"] == {"text": "短"} and small["result_ref"] is None
+
+    result = big_result(200)
+    job_id, job = complete(store, result)
+    ref = job["result_ref"]
+    assert job["result"] is None
+    assert ref["path"] == str(tmp_path / "results" / f"{job_id}.json.gz")
+    assert ref["size"] == len(dump_result(result)) and ref["stored_size"] < ref["size"]
+    assert not os.path.exists(ref["path"] + ".tmp")
+    assert JobStore.load_result(job) == result
+    assert b"".join(JobStore.iter_result(job)) == dump_result(result)
+    assert store.spooled == 1
+
+
+def test_iter_bytes_streams_in_chunks(tmp_path):
+    payload = dump_result(big_result(2000))
+    ref = ResultSpool(str(tmp_path), codec="gzip").write("j", payload)
+    with gzip.open(ref["path"]) as f:
+        assert f.read() == payload
+    chunks = list(ResultSpool.iter_bytes(ref, chunk_size=4096))
+    assert len(chunks) > 1 and max(len(c) for c in chunks) <= 4096
+    assert b"".join(chunks) == payload
+
+
+def test_memory_budget_spools_results_under_threshold(tmp_path):
+    size = len(dump_result(big_result(20)))
+    store = make_store(tmp_path, spool_threshold_bytes=1 << 20, memory_budget_bytes=size * 2)
+    jobs = [complete(store, big_result(20))[1] for _ in range(3)]
+    assert [job["result_ref"] is not None for job in jobs] == [False, False, True]
+    assert store._inline_bytes == size * 2
+
+
+def test_eviction_deletes_spooled_file_and_releases_budget(tmp_path):
+    store = make_store(tmp_path, spool_threshold_bytes=1024, max_jobs=2)
+    _, spooled = complete(store, big_result(200))
+    inline_id, _ = complete(store, {"text": "短"})
+    assert store._inline_bytes > 0
+    complete(store, {"text": "新"})
+    complete(store, {"text": "新"})
+    assert not os.path.exists(spooled["result_ref"]["path"])
+    assert inline_id not in store._inline_sizes
+
+
+def test_codec_selection(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_spool, "zstandard", None)
+    assert ResultSpool(str(tmp_path), codec="auto").codec == "gzip"
+    assert ResultSpool(str(tmp_path), codec="zstd").codec == "gzip"
+    with pytest.raises(ValueError):
+        ResultSpool(str(tmp_path), codec="lz4")
+
+
+def test_spooled_result_streamed_by_result_endpoint(tmp_path, monkeypatch):
+    store = make_store(tmp_path, spool_threshold_bytes=1024)
+    monkeypatch.setattr(system_api, "job_store", store)
+    result = big_result(500)
+    job_id, job = complete(store, result)
+    assert job["result_ref"] is not None
+    app = FastAPI()
+    app.include_router(system_api.router, prefix="/api/v1")
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get(f"/api/v1/system/transcribe/result/{job_id}")
+
+    body = json.loads(asyncio.run(main()).content)
+    assert body["code"] == 0 and body["data"] == result
@@ -0,0 +1,113 @@
+"""共享前端：特征缓存只服务本请求的样本视图，并发请求之间互不串用"""
+
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+from core.adapters import FBANK_FRAME_LENGTH, FBANK_FRAME_SHIFT, SharedFrontend
+from core.pipeline import TranscribePipeline
+
+
+def frame_fbank(wav):
+    """逐帧特征桩（帧长 400、帧移 160，snip_edges），满足按帧切片与整段计算一致"""
+    _, samples = wav
+    samples = np.asarray(samples, dtype=np.float64)
+    n = 0 if len(samples) < FBANK_FRAME_LENGTH else 1 + (len(samples) - FBANK_FRAME_LENGTH) // FBANK_FRAME_SHIFT
+    frames = np.stack([samples[i * FBANK_FRAME_SHIFT:i * FBANK_FRAME_SHIFT + FBANK_FRAME_LENGTH] for i in range(n)]) \
+        if n else np.zeros((0, FBANK_FRAME_LENGTH))
+    return np.stack([frames.mean(axis=1), frames.std(axis=1), np.abs(frames).max(axis=1)], axis=1).astype(np.float32)
+
+
+class FeatExtractor:
+    def __init__(self, copy_samples=False):
+        self.fbank = frame_fbank
+        self.copy_samples = copy_samples
+
+    def __call__(self, wavs):
+        if self.copy_samples:
+            wavs = [(sr, samples.astype(np.float32)) for sr, samples in wavs]
+        return [self.fbank(wav) for wav in wavs]
+
+
+class VAD:
+    def __init__(self):
+        self.feat_extractor = FeatExtractor()
+
+    def detect(self, audio):
+        feats = self.feat_extractor([audio])[0]
+        dur = len(feats) * FBANK_FRAME_SHIFT / 16000.0
+        return {'timestamps': [(0.0, round(dur / 2, 2)), (round(dur / 2, 2), round(dur, 2))]}, None
+
+
+class ASR:
+    """以特征校验和作为识别文本，特征取错时文本不同"""
+
+    def __init__(self, copy_samples=False, barrier=None):
+        self.feat_extractor = FeatExtractor(copy_samples)
+        self.barrier = barrier
+
+    def transcribe(self, uttids, wavs):
+        if self.barrier is not None:
+            self.barrier.wait()
+        return [{'text': f"{float(feats.sum()):.3f}", 'confidence': 1.0} for feats in self.feat_extractor(wavs)]
+
+
+def make_system(copy_samples=False, barrier=None, shared=True):
+    system = SimpleNamespace(
+        config=SimpleNamespace(asr_batch_size=8, punc_batch_size=8, enable_vad=True, enable_lid=False, enable_punc=False),
+        vad=VAD(), lid=None, asr=ASR(copy_samples, barrier), punc=None,
+    )
+    if shared:
+        assert SharedFrontend.install(system) is not None
+    return system
+
+
+def same_edges_audio(seed):
+    """相同长度、相同首尾（数字静音填充），中间内容不同的音频"""
+    samples = np.zeros(16000 * 3, dtype=np.int16)
+    samples[8000:40000] = (np.random.RandomState(seed).randn(32000) * 3000).astype(np.int16)
+    return 16000, samples
+
+
+def transcribe(system, audio):
+    return TranscribePipeline(system).process_batch([(audio, 'u')])[0]['text']
+
+
+def run_concurrently(system, audios):
+    results = [None] * len(audios)
+
+    def worker(i):
+        results[i] = transcribe(system, audios[i])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(len(audios))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+    return results
+
+
+def test_shared_features_match_independent_computation():
+    audio = same_edges_audio(1)
+    shared = make_system()
+    assert transcribe(shared, audio) == transcribe(make_system(shared=False), audio)
+    status = shared.shared_frontend.get_status()
+    assert status['hits'] == 3 and status['misses'] == 0 and status['active'] == 0
+
+
+def test_concurrent_requests_with_identical_edges():
+    audios = [same_edges_audio(1), same_edges_audio(2)]
+    expected = [transcribe(make_system(shared=False), audio) for audio in audios]
+    assert expected[0] != expected[1]
+    # ASR 在两个请求都进入解码后才返回，保证两份缓存同时处于活动状态
+    assert run_concurrently(make_system(barrier=threading.Barrier(2)), audios) == expected
+
+
+def test_copied_samples_are_not_matched():
+    audios = [same_edges_audio(1), same_edges_audio(2)]
+    expected = [transcribe(make_system(shared=False), audio) for audio in audios]
+    system = make_system(copy_samples=True, barrier=threading.Barrier(2))
+    assert run_concurrently(system, audios) == expected
+    # 复制后的样本不再是视图，ASR 分段由模块自行计算
+    assert system.shared_frontend.get_status()['misses'] == 4
@@ -0,0 +1,63 @@
+import asyncio
+
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+
+import api.system as system_api
+
+
+class FakeSession:
+    """每收到一块 PCM 产生一个语音段：第 1 段成功，第 2 段被取消，第 3 段失败，第 4 段成功"""
+
+    def __init__(self):
+        self.uttid = "fake"
+        self.segments = 0
+        self.duration_ms = 0
+        self.closed = False
+
+    async def feed(self, samples):
+        index = self.segments
+        self.segments += 1
+        self.duration_ms += 100
+        event = {"event": "speech_end", "start_ms": index * 100, "end_ms": index * 100 + 100}
+        return [({"event": "speech_start", "start_ms": index * 100}, None), (event, asyncio.create_task(self._result(index)))]
+
+    def finish(self):
+        return [({"event": "speech_end", "start_ms": 0, "end_ms": 0}, None)]
+
+    def close(self):
+        self.closed = True
+
+    async def _result(self, index):
+        if index == 1:
+            asyncio.current_task().cancel()
+            await asyncio.sleep(1)
+        if index == 2:
+            raise RuntimeError("boom")
+        return {"event": "result", "segment": index}
+
+
+def test_cancelled_and_failed_segments_send_error_frames(monkeypatch):
+    session = FakeSession()
+    monkeypatch.setattr(system_api, "open_transcribe_session", lambda *args: session)
+    app = FastAPI()
+    app.include_router(system_api.router, prefix="/api/v1")
+
+    with TestClient(app) as client:
+        with client.websocket_connect("/api/v1/system/transcribe/stream") as ws:
+            for _ in range(4):
+                ws.send_bytes(b"\0\0" * 160)
+            ws.send_text("end")
+            messages = []
+            while True:
+                message = ws.receive_json()
+                messages.append(message)
+                if message["event"] == "end":
+                    break
+
+    outputs = [m for m in messages if m["event"] in ("result", "error")]
+    assert [m["event"] for m in outputs] == ["result", "error", "error", "result"]
+    assert outputs[0]["segment"] == 0 and outputs[3]["segment"] == 3
+    # finish() 的 speech_end 没有对应任务（不会因配对错位而中断）
+    assert messages[-2] == {"event": "speech_end", "start_ms": 0, "end_ms": 0}
+    assert session.closed
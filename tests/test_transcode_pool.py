@@ -0,0 +1,108 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import core.processor as processor_module
+from core.inference_executor import ExecutorBusyError, inference_executor
+from core.transcode_pool import TranscodePool
+from utils import audio_converter
+
+
+@pytest.fixture
+def pool():
+    pool = TranscodePool()
+    yield pool
+    pool.shutdown()
+
+
+@pytest.mark.skipif("forkserver" not in multiprocessing.get_all_start_methods(), reason="平台不支持 forkserver")
+def test_workers_start_from_forkserver(pool):
+    pool.start({"transcode": {"workers": 2}})
+    assert pool._pool._mp_context.get_start_method() == "forkserver"
+    pids = {pool._execute(os.getpid) for _ in range(4)}
+    assert os.getpid() not in pids
+    status = pool.get_status()
+    assert status["workers"] == 2 and status["completed"] == 4 and status["inflight"] == 0
+
+
+def test_disabled_pool_runs_in_calling_thread(pool):
+    pool.start({"transcode": {"workers": 0}})
+    assert pool._execute(threading.get_ident) == threading.get_ident()
+
+
+def test_queue_full_is_rejected_with_429(pool):
+    pool.start({"transcode": {"workers": 1, "max_queue": 0, "queue_timeout_s": 0.05, "retry_after_s": 2}})
+    blocker = threading.Thread(target=pool._execute, args=(time.sleep, 0.5))
+    blocker.start()
+    while pool.inflight == 0:
+        time.sleep(0.005)
+    with pytest.raises(ExecutorBusyError) as excinfo:
+        pool._execute(os.getpid)
+    blocker.join()
+    assert excinfo.value.status_code == 429 and excinfo.value.retry_after == 2
+    assert pool.get_status()["rejected"] == 1
+    # 占用结束后恢复接纳
+    assert pool._execute(os.getpid) != os.getpid()
+
+
+def test_falls_back_to_ffmpeg_when_in_process_decoders_fail(monkeypatch):
+    calls = []
+    monkeypatch.setattr(audio_converter, "decode_in_process", lambda source, max_duration=None: None)
+    monkeypatch.setattr(
+        audio_converter, "decode_to_pcm",
+        lambda content, max_duration=None: calls.append(("pipe", max_duration)) or np.zeros(10, dtype=np.int16),
+    )
+    monkeypatch.setattr(
+        audio_converter, "transcode_to_wav",
+        lambda path, output_path=None, max_duration=None: calls.append(("file", max_duration)) or "out.wav",
+    )
+    assert len(audio_converter.decode_bytes(b"mp3", max_duration=61)) == 10
+    assert audio_converter.transcode_file("in.mp3", max_duration=61) == "out.wav"
+    assert calls == [("pipe", 61), ("file", 61)]
+
+
+def test_in_process_decode_skips_ffmpeg(monkeypatch):
+    samples = np.ones(16000, dtype=np.int16)
+    monkeypatch.setattr(audio_converter, "decode_in_process", lambda source, max_duration=None: samples)
+    monkeypatch.setattr(audio_converter, "decode_to_pcm", lambda *a, **k: pytest.fail("不应调用 ffmpeg"))
+    assert audio_converter.decode_bytes(b"flac") is samples
+
+
+def test_in_process_disabled_uses_ffmpeg(monkeypatch):
+    monkeypatch.setattr(audio_converter, "decode_in_process", lambda *a, **k: pytest.fail("不应进程内解码"))
+    monkeypatch.setattr(audio_converter, "decode_to_pcm", lambda content, max_duration=None: np.zeros(1, dtype=np.int16))
+    assert len(audio_converter.decode_bytes(b"mp3", in_process=False)) == 1
+
+
+def test_decode_does_not_hold_asr_slot(monkeypatch):
+    inference_executor.configure({"inference": {"asr": {"slots": 1, "max_queue": 0}}})
+    decoding = threading.Event()
+    release = threading.Event()
+
+    def slow_decode(audio_file, config):
+        decoding.set()
+        release.wait(5)
+        return {"filename": "a.wav", "duration": 1.0}, (16000, np.zeros(16000, dtype=np.int16))
+
+    monkeypatch.setattr(processor_module, "load_audio_for_inference", slow_decode)
+    monkeypatch.setattr(processor_module, "transcribe_audio", lambda asr_system, audio, uttid: {"uttid": uttid})
+
+    async def main():
+        processor = processor_module.RequestProcessor(None, {"processing": {}})
+        task = asyncio.create_task(processor.transcribe(object(), asr_system=object(), uttid="u"))
+        while not decoding.is_set():
+            await asyncio.sleep(0.005)
+        # 解码（转码进程池排队）期间 asr 队列仍有空位，其他请求不被拒绝
+        inference_executor.check_capacity("asr")
+        release.set()
+        return await task
+
+    try:
+        assert asyncio.run(main())["uttid"] == "u"
+    finally:
+        inference_executor.configure({})
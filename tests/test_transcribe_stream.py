@@ -0,0 +1,146 @@
+import asyncio
+import json
+import time
+from types import SimpleNamespace
+
+import httpx
+import numpy as np
+import pytest
+from fastapi import FastAPI
+
+import api.system as system_api
+import core.processor as processor_module
+from core.cancellation import DeadlineExceeded
+from core.inference_executor import ExecutorBusyError, inference_executor
+from utils.error_codes import ErrorCode
+
+SEGMENTS = [(0.0, 1.0), (2.0, 2.5), (3.0, 5.0), (6.0, 6.2)]
+
+
+class StubVAD:
+    def detect(self, audio):
+        return {'timestamps': SEGMENTS}, None
+
+
+class StubASR:
+    """文本取分段起始毫秒；running 为正在推理的批次数"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.batches = []
+        self.running = 0
+
+    def transcribe(self, uttids, wavs):
+        self.running += 1
+        self.batches.append(len(uttids))
+        time.sleep(self.delay)
+        self.running -= 1
+        return [{'text': f"seg{u.split('_s')[1].split('_')[0]}", 'confidence': 0.9} for u in uttids]
+
+
+def make_system(asr):
+    return SimpleNamespace(
+        config=SimpleNamespace(asr_batch_size=2, punc_batch_size=8, enable_vad=True, enable_lid=False, enable_punc=False),
+        vad=StubVAD(), lid=None, asr=asr, punc=None,
+    )
+
+
+@pytest.fixture(autouse=True)
+def setup(monkeypatch):
+    inference_executor.configure({'inference': {'asr': {'slots': 1, 'max_queue': 4}}})
+    state = {'decoded_with_slot': None, 'released': []}
+
+    def decode(audio_file, config):
+        state['decoded_with_slot'] = inference_executor._lane('asr').inflight
+        return {'filename': 'a.wav', 'duration': 8.0}, (16000, np.zeros(16000 * 8, dtype=np.int16))
+
+    monkeypatch.setattr(processor_module, 'load_audio_for_inference', decode)
+    monkeypatch.setattr(processor_module, 'release_audio', lambda audio: state['released'].append(audio))
+    yield state
+    inference_executor.configure({})
+
+
+def collect(asr, deadline_ms=None):
+    async def main():
+        records = []
+        processor = processor_module.RequestProcessor(None, {'processing': {}})
+        async for record in processor.transcribe_stream(object(), make_system(asr), uttid='u', deadline_ms=deadline_ms):
+            records.append(record)
+        return records
+
+    return asyncio.run(main())
+
+
+def test_sentences_stream_in_time_order(setup):
+    asr = StubASR()
+    records = collect(asr)
+    assert [r['type'] for r in records] == ['start', 'sentence', 'sentence', 'sentence', 'sentence', 'result']
+    assert records[0]['vad_segments_ms'] == [(0, 1000), (2000, 2500), (3000, 5000), (6000, 6200)]
+    assert [r['start_ms'] for r in records[1:-1]] == [0, 2000, 3000, 6000]
+    assert records[-1]['text'] == 'seg0 seg2000 seg3000 seg6000'
+    assert asr.batches == [2, 2]
+    # 解码时尚未占用 asr 槽位；结束后释放音频
+    assert setup['decoded_with_slot'] == 0
+    assert len(setup['released']) == 1
+
+
+def test_deadline_waits_for_inflight_step_before_releasing_audio(setup, monkeypatch):
+    asr = StubASR(delay=0.2)
+    released_while_running = []
+    monkeypatch.setattr(processor_module, 'release_audio', lambda audio: released_while_running.append(asr.running))
+
+    with pytest.raises(DeadlineExceeded):
+        collect(asr, deadline_ms=100)
+    # 超时的那一步仍在推理线程中执行，释放音频前须等待其结束
+    assert released_while_running == [0]
+    assert inference_executor._lane('asr').inflight == 0
+
+
+def test_queue_full_rejected_before_decoding(setup, monkeypatch):
+    def full(module):
+        raise ExecutorBusyError(module, 1)
+
+    monkeypatch.setattr(inference_executor, 'check_capacity', full)
+    with pytest.raises(ExecutorBusyError):
+        collect(StubASR())
+    assert setup['decoded_with_slot'] is None
+
+
+def post_stream(accept=None, deadline_ms=None, asr=None):
+    app = FastAPI()
+    app.include_router(system_api.router, prefix='/api/v1')
+    app.state.asr_system = make_system(asr or StubASR())
+    data = {'stream': 'true'}
+    if deadline_ms:
+        data['deadline_ms'] = str(deadline_ms)
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+            return await client.post(
+                '/api/v1/system/transcribe', data=data, files={'audio': ('a.wav', b'RIFF')},
+                headers={'accept': accept} if accept else {},
+            )
+
+    return asyncio.run(main())
+
+
+def test_ndjson_response():
+    response = post_stream()
+    assert response.headers['content-type'].startswith('application/x-ndjson')
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [r['type'] for r in records] == ['start'] + ['sentence'] * 4 + ['result']
+
+
+def test_sse_response():
+    response = post_stream(accept='text/event-stream')
+    assert response.headers['content-type'].startswith('text/event-stream')
+    events = [line.split(': ', 1)[1] for line in response.text.splitlines() if line.startswith('event: ')]
+    assert events == ['start'] + ['sentence'] * 4 + ['result']
+
+
+def test_deadline_ends_stream_with_error_record():
+    response = post_stream(deadline_ms=150, asr=StubASR(delay=0.1))
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert records[0]['type'] == 'start'
+    assert records[-1]['type'] == 'error' and records[-1]['code'] == ErrorCode.DEADLINE_EXCEEDED
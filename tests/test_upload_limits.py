@@ -0,0 +1,170 @@
+import asyncio
+import os
+import json
+import struct
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+import api.system as system_api
+from core.job_queue import job_queue
+from core.job_store import job_store
+from utils import config_loader
+from utils.error_codes import ErrorCode
+from utils.upload_reader import MULTIPART_OVERHEAD, UploadGuard, probe_header_duration
+
+MAX_FILE_SIZE = 4096
+
+
+def wav_header(duration_s, sample_rate=16000):
+    """只含头部的 16-bit mono WAV，data 块声明 duration_s 秒"""
+    data_size = int(duration_s * sample_rate) * 2
+    fmt = struct.pack('<HHIIHH', 1, 1, sample_rate, sample_rate * 2, 2, 16)
+    return b'RIFF' + struct.pack('<I', 36 + data_size) + b'WAVE' + b'fmt ' + struct.pack('<I', 16) + fmt \
+        + b'data' + struct.pack('<I', data_size)
+
+
+@pytest.fixture
+def app(monkeypatch):
+    monkeypatch.setattr(config_loader, "_global_config", {
+        "processing": {"max_file_size": MAX_FILE_SIZE, "max_audio_duration": 60},
+    })
+    calls = []
+
+    class RecordingProcessor:
+        def __init__(self, *args):
+            pass
+
+        async def transcribe(self, **kwargs):
+            calls.append(kwargs)
+            return {"text": ""}
+
+    monkeypatch.setattr(system_api, "RequestProcessor", RecordingProcessor)
+    app = FastAPI()
+    app.include_router(system_api.router, prefix="/api/v1")
+    app.state.asr_system = object()
+    app.state.calls = calls
+    return app
+
+
+def call_asgi(app, headers, chunks):
+    """直接调用 ASGI 应用，返回 (状态码, 响应体, 已被读取的请求体块数)"""
+    body_messages = [{"type": "http.request", "body": c, "more_body": i < len(chunks) - 1} for i, c in enumerate(chunks)]
+    consumed = 0
+    sent = []
+
+    async def receive():
+        nonlocal consumed
+        if consumed < len(body_messages):
+            consumed += 1
+            return body_messages[consumed - 1]
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST",
+        "scheme": "http", "path": "/api/v1/system/transcribe", "raw_path": b"/api/v1/system/transcribe",
+        "root_path": "", "query_string": b"", "server": ("test", 80), "client": ("test", 1),
+        "headers": [(k.lower().encode(), v.encode()) for k, v in headers.items()],
+    }
+    asyncio.run(app(scope, receive, send))
+    status = next(m["status"] for m in sent if m["type"] == "http.response.start")
+    body = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    return status, json.loads(body), consumed
+
+
+def test_guard_rejects_oversized_stream():
+    guard = UploadGuard(max_file_size=10)
+    guard.feed(b"x" * 10)
+    with pytest.raises(ValueError) as excinfo:
+        guard.feed(b"x")
+    assert excinfo.value.error_code == ErrorCode.AUDIO_FILE_TOO_LARGE
+
+
+def test_guard_rejects_long_audio_from_header():
+    assert probe_header_duration(wav_header(120)) == pytest.approx(120)
+    guard = UploadGuard(max_file_size=1 << 30, max_duration=60)
+    guard.feed(wav_header(120))
+    with pytest.raises(ValueError) as excinfo:
+        guard.finish()
+    assert excinfo.value.error_code == ErrorCode.AUDIO_DURATION_EXCEEDED
+
+
+def test_declared_content_length_rejected_before_body_is_read(app):
+    length = MAX_FILE_SIZE + MULTIPART_OVERHEAD + 1
+    status, body, consumed = call_asgi(
+        app,
+        {"content-type": "multipart/form-data; boundary=x", "content-length": str(length)},
+        [b"x" * 1024],
+    )
+    assert status == 413
+    assert body["code"] == ErrorCode.AUDIO_FILE_TOO_LARGE
+    assert consumed == 0
+    assert app.state.calls == []
+
+
+def test_chunked_body_aborted_once_limit_is_passed(app):
+    chunk = b"x" * 16 * 1024
+    chunks = [b"--x\r\nContent-Disposition: form-data; name=\"audio\"; filename=\"a.wav\"\r\n\r\n"] + [chunk] * 100
+    status, body, consumed = call_asgi(app, {"content-type": "multipart/form-data; boundary=x"}, chunks)
+    assert status == 413
+    assert body["code"] == ErrorCode.AUDIO_FILE_TOO_LARGE
+    assert consumed < len(chunks)
+    assert app.state.calls == []
+
+
+def test_small_upload_reaches_handler(app):
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/system/transcribe", files={"audio": ("a.wav", b"x" * 100)})
+
+    response = asyncio.run(main())
+    assert response.status_code == 200 and response.json()["code"] == 0
+    assert len(app.state.calls) == 1
+
+
+def test_submit_rejects_long_audio_from_header(app):
+    # 声明 120 秒，实际只携带少量样本
+    audio = wav_header(120) + bytes(200)
+
+    async def main():
+        await job_queue.start({}, lambda job_id: asyncio.sleep(0))
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                return await client.post("/api/v1/system/transcribe/submit", files={"audio": ("a.wav", audio)})
+        finally:
+            await job_queue.stop()
+
+    response = asyncio.run(main())
+    assert response.json()["code"] == ErrorCode.AUDIO_DURATION_EXCEEDED
+
+
+def test_long_form_submit_uses_long_form_size_limit(app, monkeypatch):
+    monkeypatch.setattr(config_loader, "_global_config", {
+        "processing": {"max_file_size": MAX_FILE_SIZE, "max_audio_duration": 60},
+        "long_form": {"max_file_size": 1 << 20, "max_audio_duration": 3600},
+    })
+    audio = bytes(MAX_FILE_SIZE + MULTIPART_OVERHEAD + 1)
+
+    async def main():
+        await job_queue.start({}, lambda job_id: asyncio.sleep(0))
+        transport = httpx.ASGITransport(app=app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                sync = await client.post("/api/v1/system/transcribe", files={"audio": ("a.pcm", audio)})
+                submit = await client.post(
+                    "/api/v1/system/transcribe/submit", data={"long_form": "true"}, files={"audio": ("a.pcm", audio)},
+                )
+                return sync, submit
+        finally:
+            await job_queue.stop()
+
+    sync, submit = asyncio.run(main())
+    assert sync.status_code == 413
+    assert submit.status_code == 200 and submit.json()["code"] == 0
+    os.unlink(job_store.pop_tmp_path(submit.json()["data"]["job_id"]))
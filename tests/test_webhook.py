@@ -0,0 +1,131 @@
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+import api.system as system_api
+from core.job_store import job_store
+from core.webhook import WebhookDispatcher, validate_callback_url
+
+URL = "http://receiver.test/hook"
+
+
+def run_dispatcher(config, handler, payloads):
+    """启动投递器（HTTP 客户端换成 MockTransport），投递 payloads 并等待全部结束"""
+    dispatcher = WebhookDispatcher()
+
+    async def main():
+        await dispatcher.start({"webhook": config})
+        await dispatcher._client.aclose()
+        dispatcher._client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        for payload in payloads:
+            dispatcher.dispatch(URL, payload)
+        await asyncio.gather(*dispatcher._tasks)
+        await dispatcher.stop()
+
+    asyncio.run(main())
+    return dispatcher
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """记录退避等待的秒数，实际不等待"""
+    recorded = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay, *args):
+        recorded.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(asyncio, "sleep", fake_sleep)
+    return recorded
+
+
+def test_validate_callback_url():
+    assert validate_callback_url(" https://a.test/x ") == "https://a.test/x"
+    for url in ("ftp://a.test/x", "http://", "/relative", ""):
+        with pytest.raises(ValueError):
+            validate_callback_url(url)
+
+
+def test_retries_with_exponential_backoff_until_delivered(sleeps, monkeypatch):
+    monkeypatch.setattr("core.webhook.random.uniform", lambda a, b: b)
+    responses = iter([500, 503, 503, 200])
+    received = []
+
+    def handler(request):
+        received.append(request.read())
+        return httpx.Response(next(responses))
+
+    dispatcher = run_dispatcher(
+        {"max_retries": 5, "backoff_base_s": 1, "backoff_max_s": 3}, handler, [{"job_id": "j1", "status": "completed"}],
+    )
+    assert len(received) == 4 and b'"job_id":"j1"' in received[0]
+    assert sleeps == [1, 2, 3]
+    assert (dispatcher.delivered, dispatcher.retried, dispatcher.dead) == (1, 3, 0)
+
+
+def test_exhausted_retries_go_to_dead_letters(sleeps):
+    def handler(request):
+        if b"j2" in request.read():
+            raise httpx.ConnectError("refused")
+        return httpx.Response(500)
+
+    dispatcher = run_dispatcher(
+        {"max_retries": 2, "backoff_base_s": 0.01},
+        handler,
+        [{"job_id": "j1", "status": "failed"}, {"job_id": "j2", "status": "completed"}],
+    )
+    letters = {d["job_id"]: d for d in dispatcher.dead_letters()}
+    assert letters["j1"]["error"] == "HTTP 500" and letters["j1"]["attempts"] == 3
+    assert letters["j2"]["error"].startswith("ConnectError") and letters["j2"]["attempts"] == 3
+    assert letters["j1"]["status"] == "failed" and letters["j1"]["url"] == URL
+    assert (dispatcher.delivered, dispatcher.dead) == (0, 2)
+
+
+def test_dead_letter_list_is_bounded(sleeps):
+    dispatcher = run_dispatcher(
+        {"max_retries": 0, "dead_letter_size": 2},
+        lambda request: httpx.Response(404),
+        [{"job_id": f"j{i}"} for i in range(4)],
+    )
+    assert dispatcher.dead == 4
+    assert len(dispatcher.dead_letters()) == 2
+
+
+def test_concurrency_is_bounded():
+    state = {"running": 0, "peak": 0}
+
+    async def handler(request):
+        state["running"] += 1
+        state["peak"] = max(state["peak"], state["running"])
+        await asyncio.sleep(0.01)
+        state["running"] -= 1
+        return httpx.Response(204)
+
+    dispatcher = run_dispatcher({"max_concurrency": 2}, handler, [{"job_id": f"j{i}"} for i in range(6)])
+    assert dispatcher.delivered == 6
+    assert state["peak"] == 2
+
+
+def test_disabled_dispatcher_dead_letters_immediately():
+    dispatcher = WebhookDispatcher()
+
+    async def main():
+        await dispatcher.start({"webhook": {"enabled": False}})
+        dispatcher.dispatch(URL, {"job_id": "j1", "status": "completed"})
+
+    asyncio.run(main())
+    assert dispatcher.dead_letters()[0]["error"] == "任务回调未启用"
+    assert dispatcher.get_status()["enabled"] is False
+
+
+def test_finished_job_dispatches_callback(monkeypatch):
+    sent = []
+    monkeypatch.setattr(system_api.webhook_dispatcher, "dispatch", lambda url, payload, result_ref=None: sent.append((url, payload)))
+    job_id = job_store.create(
+        tmp_path="/nonexistent.wav", filename="a.wav", params={"callback_url": URL},
+    )
+    asyncio.run(system_api.run_transcribe_job(job_id, SimpleNamespace(state=SimpleNamespace())))
+    assert sent == [(URL, {"job_id": job_id, "status": "failed", "error": "临时文件丢失"})]
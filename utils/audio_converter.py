@@ -1,10 +1,14 @@
 """
 音频转码模块 - 使用 ffmpeg 将各类音频转为 16kHz 16-bit mono PCM WAV
+可用时优先使用进程内解码器（soundfile / PyAV），避免每次启动 ffmpeg 子进程
 """
 
 import os
-import tempfile
+import wave
+from io import BytesIO
+import numpy as np
 from .logger import get_logger
+from .scratch import temp_path
 
 logger = get_logger(__name__)
 
@@ -12,6 +16,11 @@ logger = get_logger(__name__)
 TARGET_SAMPLE_RATE = 16000
 TARGET_CHANNELS = 1
 TARGET_SAMPLE_WIDTH = 2  # 16-bit
+# 原始 PCM 样本格式（小端）：流式接口与原始 PCM 上传使用
+PCM_FORMATS = {
+    's16le': np.dtype('<i2'),
+    'f32le': np.dtype('<f4'),
+}
 
 # FFmpeg 支持解码的音频文件扩展名（硬编码，源自 ffmpeg -formats 输出）
 # 包含常见音频格式及 ffmpeg 可识别的扩展名
@@ -41,13 +50,14 @@ def get_audio_duration_ffprobe(file_path: str) -> float:
         raise ValueError(f"无法解析音频文件: {e}")
 
 
-def transcode_to_wav(input_path: str, output_path: str = None) -> str:
+def transcode_to_wav(input_path: str, output_path: str = None, max_duration: float = None) -> str:
     """
     将音频文件转码为 16kHz 16-bit mono PCM WAV
     
     Args:
         input_path: 输入文件路径
         output_path: 输出文件路径，若为 None 则创建临时文件
+        max_duration: 输出时长上限（秒），超出部分不解码；调用方可由输出时长判断原音频是否超限
         
     Returns:
         输出 WAV 文件路径
@@ -55,17 +65,20 @@ def transcode_to_wav(input_path: str, output_path: str = None) -> str:
     import ffmpeg
     
     if output_path is None:
-        fd, output_path = tempfile.mkstemp(suffix='.wav')
-        os.close(fd)
+        output_path = temp_path(suffix='.wav')
     
     try:
         stream = ffmpeg.input(input_path)
+        output_kwargs = {}
+        if max_duration is not None:
+            output_kwargs['t'] = max_duration
         stream = ffmpeg.output(
             stream,
             output_path,
             acodec='pcm_s16le',
             ac=TARGET_CHANNELS,
-            ar=TARGET_SAMPLE_RATE
+            ar=TARGET_SAMPLE_RATE,
+            **output_kwargs
         )
         ffmpeg.run(stream, overwrite_output=True, quiet=True)
         logger.info(f"音频转码完成: {input_path} -> {output_path}")
@@ -79,3 +92,149 @@ def transcode_to_wav(input_path: str, output_path: str = None) -> str:
             except OSError:
                 pass
         raise RuntimeError(f"音频转码失败: {stderr}")
+
+
+def decode_to_pcm(content: bytes, max_duration: float = None) -> np.ndarray:
+    """
+    通过管道将音频字节送入 ffmpeg（stdin），从 stdout 读取 16kHz 16-bit mono PCM，不落盘
+    
+    Args:
+        content: 原始音频字节
+        max_duration: 输出时长上限（秒），超出部分不解码
+    
+    Returns:
+        int16 样本数组
+    """
+    import ffmpeg
+    
+    output_kwargs = {}
+    if max_duration is not None:
+        output_kwargs['t'] = max_duration
+    try:
+        out, _ = (
+            ffmpeg
+            .input('pipe:0')
+            .output('pipe:1', format='s16le', acodec='pcm_s16le', ac=TARGET_CHANNELS, ar=TARGET_SAMPLE_RATE,
+                    **output_kwargs)
+            .run(input=content, capture_stdout=True, capture_stderr=True)
+        )
+    except ffmpeg.Error as e:
+        stderr = e.stderr.decode() if e.stderr else str(e)
+        logger.error(f"ffmpeg 管道解码失败: {stderr}")
+        raise RuntimeError(f"音频转码失败: {stderr}")
+    return np.frombuffer(out, dtype=np.int16)
+
+
+def transcode_file(
+    input_path: str,
+    output_path: str = None,
+    max_duration: float = None,
+    in_process: bool = True,
+) -> str:
+    """
+    转码为 16kHz 16-bit mono PCM WAV：优先进程内解码，失败或不可用时回退 ffmpeg
+    供转码进程池的工作进程调用；in_process=False 时直接使用 ffmpeg
+    """
+    samples = decode_in_process(input_path, max_duration) if in_process else None
+    if samples is None:
+        return transcode_to_wav(input_path, output_path, max_duration=max_duration)
+    return write_wav(samples, output_path)
+
+
+def decode_bytes(content: bytes, max_duration: float = None, in_process: bool = True) -> np.ndarray:
+    """内存解码为 int16 样本：优先进程内解码，失败或不可用时回退 ffmpeg 管道"""
+    samples = decode_in_process(content, max_duration) if in_process else None
+    if samples is None:
+        return decode_to_pcm(content, max_duration=max_duration)
+    return samples
+
+
+def decode_in_process(source, max_duration: float = None):
+    """
+    使用进程内解码器解码为 16kHz mono int16 样本
+    Args:
+        source: 文件路径或音频字节
+    Returns:
+        样本数组；无可用解码器或解码失败时返回 None
+    """
+    for decoder in (_decode_with_soundfile, _decode_with_pyav):
+        try:
+            samples = decoder(BytesIO(source) if isinstance(source, bytes) else source, max_duration)
+        except Exception as e:
+            logger.debug(f"进程内解码失败，尝试下一种解码器: decoder={decoder.__name__}, error={e}")
+            continue
+        if samples is not None:
+            return samples
+    return None
+
+
+def pcm_to_int16(data: bytes, sample_format: str = 's16le') -> np.ndarray:
+    """
+    原始 PCM 字节（16kHz mono）转为 int16 样本；f32le 取值范围 [-1, 1]，超出部分截断
+    Raises:
+        ValueError: 未知格式或字节数不是样本宽度的整数倍
+    """
+    dtype = PCM_FORMATS.get(sample_format)
+    if dtype is None:
+        raise ValueError(f"不支持的 PCM 格式: {sample_format}（可选 {', '.join(PCM_FORMATS)}）")
+    if len(data) % dtype.itemsize:
+        raise ValueError(f"PCM 数据长度 {len(data)} 不是 {sample_format} 样本宽度的整数倍")
+    samples = np.frombuffer(data, dtype=dtype)
+    if dtype.kind == 'f':
+        return (np.clip(samples, -1.0, 1.0) * 32767.0).astype(np.int16)
+    return samples.astype(np.int16, copy=False)
+
+
+def write_wav(samples: np.ndarray, output_path: str = None) -> str:
+    """将 int16 样本写为 16kHz mono WAV"""
+    if output_path is None:
+        output_path = temp_path(suffix='.wav')
+    with wave.open(output_path, 'wb') as wav:
+        wav.setnchannels(TARGET_CHANNELS)
+        wav.setsampwidth(TARGET_SAMPLE_WIDTH)
+        wav.setframerate(TARGET_SAMPLE_RATE)
+        wav.writeframes(samples.astype(np.int16, copy=False).tobytes())
+    return output_path
+
+
+def _decode_with_soundfile(source, max_duration: float = None):
+    """libsndfile 解码（wav/flac/ogg 等）；不做重采样，仅处理已是 16kHz 的音频"""
+    try:
+        import soundfile as sf
+    except ImportError:
+        return None
+    info = sf.info(source)
+    if info.samplerate != TARGET_SAMPLE_RATE:
+        return None
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    frames = int(max_duration * TARGET_SAMPLE_RATE) if max_duration is not None else -1
+    data, _ = sf.read(source, dtype='int16', frames=frames, always_2d=True)
+    if data.shape[1] == 1:
+        return data[:, 0]
+    return data.mean(axis=1).astype(np.int16)
+
+
+def _decode_with_pyav(source, max_duration: float = None):
+    """PyAV（libav）解码并重采样为 16kHz mono s16"""
+    try:
+        import av
+    except ImportError:
+        return None
+    max_samples = int(max_duration * TARGET_SAMPLE_RATE) if max_duration is not None else None
+    resampler = av.AudioResampler(format='s16', layout='mono', rate=TARGET_SAMPLE_RATE)
+    chunks = []
+    total = 0
+    with av.open(source) as container:
+        for frame in container.decode(audio=0):
+            for out in resampler.resample(frame):
+                chunk = out.to_ndarray().reshape(-1)
+                chunks.append(chunk)
+                total += len(chunk)
+            if max_samples is not None and total >= max_samples:
+                break
+        else:
+            for out in resampler.resample(None):
+                chunks.append(out.to_ndarray().reshape(-1))
+    samples = np.concatenate(chunks).astype(np.int16, copy=False) if chunks else np.zeros(0, dtype=np.int16)
+    return samples[:max_samples] if max_samples is not None else samples
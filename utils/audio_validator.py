@@ -5,22 +5,28 @@
 
 import wave
 import os
-import tempfile
+from io import BytesIO
+import numpy as np
 from fastapi import UploadFile
-from typing import Dict, Any, Tuple
+from typing import Any, AsyncIterator, Dict, Mapping, Tuple, Union
 from .logger import get_logger
+from .scratch import named_temp_file
 from .error_codes import ErrorCode, ERROR_MESSAGES
+from .upload_reader import UPLOAD_CHUNK_SIZE, UploadGuard, audio_error, copy_upload, read_upload, upload_limits
 from .audio_converter import (
-    transcode_to_wav,
-    get_audio_duration_ffprobe,
+    PCM_FORMATS,
     SUPPORTED_AUDIO_EXTENSIONS,
     TARGET_SAMPLE_RATE,
     TARGET_CHANNELS,
     TARGET_SAMPLE_WIDTH,
+    pcm_to_int16,
 )
 
 logger = get_logger(__name__)
 
+# 转码截断余量（秒）：输出时长超过 max_audio_duration 即判定超限
+DURATION_CAP_MARGIN = 0.5
+
 
 def validate_audio_file(
     file: UploadFile,
@@ -52,7 +58,7 @@ def validate_audio_file(
         raise error
     
     # 临时保存文件以读取音频信息
-    with tempfile.NamedTemporaryFile(delete=False, suffix='.wav') as tmp:
+    with named_temp_file(suffix='.wav') as tmp:
         tmp.write(content)
         tmp_path = tmp.name
     
@@ -99,11 +105,13 @@ def _read_wav_info(file_path: str) -> tuple:
 
 def prepare_audio_for_asr(
     file: UploadFile,
-    config: Dict[str, Any]
+    config: Dict[str, Any],
+    long_form: bool = False
 ) -> Tuple[Dict[str, Any], str]:
     """
     验证音频并准备为 ASR 可用的 16kHz 16-bit mono PCM WAV。
-    非 WAV 或格式不符合的音频将通过 ffmpeg 自动转码。
+    非 WAV 或格式不符合的音频将通过转码进程池自动转码。
+    long_form=True 时使用 long_form 节的大小与时长限制（长音频异步任务）。
     
     Returns:
         (audio_info, wav_path): 元信息字典和 WAV 文件路径
@@ -114,9 +122,7 @@ def prepare_audio_for_asr(
     """
     from .config_loader import get_config
     cfg = config if config else get_config()
-    processing_config = cfg.get('processing', {})
-    max_file_size = processing_config.get('max_file_size', 52428800)
-    max_duration = processing_config.get('max_audio_duration', 60)
+    max_file_size, max_duration = upload_limits(cfg, long_form=long_form)
     
     filename = file.filename or ""
     file_ext = os.path.splitext(filename)[1].lower().lstrip('.') or 'wav'
@@ -128,56 +134,63 @@ def prepare_audio_for_asr(
         error.error_code = ErrorCode.INVALID_AUDIO_FORMAT
         raise error
     
-    content = file.file.read()
-    file_size = len(content)
-    if file_size > max_file_size:
-        error = ValueError(ERROR_MESSAGES[ErrorCode.AUDIO_FILE_TOO_LARGE])
-        error.error_code = ErrorCode.AUDIO_FILE_TOO_LARGE
-        raise error
-    
-    # 保存到临时文件（保留原始扩展名以便 ffmpeg 识别）
+    # 分块写入临时文件（保留原始扩展名以便 ffmpeg 识别），超限时立即中止
+    guard = UploadGuard(max_file_size, max_duration)
     suffix = f'.{file_ext}' if file_ext else '.bin'
-    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
-        tmp.write(content)
+    with named_temp_file(suffix=suffix) as tmp:
         input_path = tmp.name
+        try:
+            copy_upload(file.file, tmp, guard)
+        except Exception:
+            tmp.close()
+            os.unlink(input_path)
+            raise
+    file_size = guard.size
     
     output_path = None
     try:
-        # 获取时长
-        if file_ext == 'wav':
+        # 标准 WAV 直接读取头部信息；其余格式（或 WAV 解析失败）交给 ffmpeg
+        wav_info = None
+        if file_ext in ('wav', 'wave'):
             try:
-                duration, sample_rate, channels, sample_width = _read_wav_info(input_path)
+                wav_info = _read_wav_info(input_path)
             except ValueError:
-                # WAV 解析失败，尝试 ffmpeg 转码
-                duration = get_audio_duration_ffprobe(input_path)
-                sample_rate, channels, sample_width = 0, 0, 0
-        else:
-            duration = get_audio_duration_ffprobe(input_path)
-            sample_rate, channels, sample_width = TARGET_SAMPLE_RATE, TARGET_CHANNELS, TARGET_SAMPLE_WIDTH
+                wav_info = None
         
-        if duration > max_duration:
-            os.unlink(input_path)
-            error = ValueError(ERROR_MESSAGES[ErrorCode.AUDIO_DURATION_EXCEEDED])
-            error.error_code = ErrorCode.AUDIO_DURATION_EXCEEDED
-            raise error
+        if wav_info is not None:
+            duration, sample_rate, channels, sample_width = wav_info
+            if duration > max_duration:
+                error = ValueError(ERROR_MESSAGES[ErrorCode.AUDIO_DURATION_EXCEEDED])
+                error.error_code = ErrorCode.AUDIO_DURATION_EXCEEDED
+                raise error
         
         # 判断是否需要转码：非标准 WAV 或 WAV 格式/采样率/声道不符合要求
         need_transcode = (
-            file_ext not in ('wav', 'wave') or
+            wav_info is None or
             (sample_rate != TARGET_SAMPLE_RATE or
              channels != TARGET_CHANNELS or
              sample_width != TARGET_SAMPLE_WIDTH)
         )
         
         if need_transcode:
+            # 单次转码完成解析与格式转换（转码进程池，进程内解码器优先、ffmpeg 兜底）：
+            # 输出截断在 max_audio_duration 之后一点，时长取自输出的 PCM，超出即说明原音频超限
+            from core.transcode_pool import ExecutorBusyError, transcode_pool
             try:
-                output_path = transcode_to_wav(input_path)
+                output_path = transcode_pool.transcode(input_path, max_duration=max_duration + DURATION_CAP_MARGIN)
+            except ExecutorBusyError:
+                raise
             except RuntimeError as e:
                 error = ValueError(ERROR_MESSAGES[ErrorCode.TRANSCODE_FAILED])
                 error.error_code = ErrorCode.TRANSCODE_FAILED
                 raise error from e
             finally:
                 os.unlink(input_path)
+            duration = get_audio_duration(output_path)
+            if duration > max_duration:
+                error = ValueError(ERROR_MESSAGES[ErrorCode.AUDIO_DURATION_EXCEEDED])
+                error.error_code = ErrorCode.AUDIO_DURATION_EXCEEDED
+                raise error
             final_path = output_path
             audio_info = {
                 'filename': filename,
@@ -187,7 +200,8 @@ def prepare_audio_for_asr(
                 'channels': TARGET_CHANNELS,
                 'sample_width': TARGET_SAMPLE_WIDTH,
                 'format': 'wav',
-                'transcoded': True
+                'transcoded': True,
+                'sha256': guard.sha256
             }
         else:
             final_path = input_path
@@ -199,7 +213,8 @@ def prepare_audio_for_asr(
                 'channels': channels,
                 'sample_width': sample_width,
                 'format': file_ext,
-                'transcoded': False
+                'transcoded': False,
+                'sha256': guard.sha256
             }
         
         return audio_info, final_path
@@ -215,3 +230,282 @@ def prepare_audio_for_asr(
             except OSError:
                 pass
         raise
+
+
+def prepare_local_audio(
+    file_path: str,
+    config: Dict[str, Any],
+    long_form: bool = False
+) -> Tuple[Dict[str, Any], str]:
+    """
+    准备服务器本地音频（异步任务已落盘的上传），校验规则同 prepare_audio_for_asr。
+    已是 16kHz 16-bit mono WAV 时直接返回原路径，不复制；否则转码为临时 WAV。
+    long_form=True 时使用 long_form 节的大小与时长限制。
+    
+    Returns:
+        (audio_info, wav_path): wav_path 与 file_path 不同时为临时文件，调用方需清理
+    
+    Raises:
+        ValueError with error_code
+    """
+    from .config_loader import get_config
+    cfg = config if config else get_config()
+    max_file_size, max_duration = upload_limits(cfg, long_form=long_form)
+    
+    filename = os.path.basename(file_path)
+    file_ext = os.path.splitext(filename)[1].lower().lstrip('.') or 'wav'
+    if file_ext not in SUPPORTED_AUDIO_EXTENSIONS:
+        raise audio_error(ErrorCode.INVALID_AUDIO_FORMAT)
+    if not os.path.isfile(file_path):
+        error = ValueError(f"音频文件不存在: {file_path}")
+        error.error_code = ErrorCode.INVALID_PARAMS
+        raise error
+    
+    # 分块计算 SHA-256（结果缓存键），同时完成大小与容器头时长校验
+    guard = UploadGuard(max_file_size, max_duration)
+    with open(file_path, 'rb') as f:
+        while True:
+            chunk = f.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            guard.feed(chunk)
+    guard.finish()
+    
+    wav_info = None
+    if file_ext in ('wav', 'wave'):
+        try:
+            wav_info = _read_wav_info(file_path)
+        except ValueError:
+            wav_info = None
+    if wav_info is not None and wav_info[1:] == (TARGET_SAMPLE_RATE, TARGET_CHANNELS, TARGET_SAMPLE_WIDTH):
+        if wav_info[0] > max_duration:
+            raise audio_error(ErrorCode.AUDIO_DURATION_EXCEEDED)
+        wav_path, duration, transcoded = file_path, wav_info[0], False
+    else:
+        from core.transcode_pool import ExecutorBusyError, transcode_pool
+        try:
+            wav_path = transcode_pool.transcode(file_path, max_duration=max_duration + DURATION_CAP_MARGIN)
+        except ExecutorBusyError:
+            raise
+        except RuntimeError as e:
+            raise audio_error(ErrorCode.TRANSCODE_FAILED) from e
+        duration, transcoded = get_audio_duration(wav_path), True
+        if duration > max_duration:
+            release_audio(wav_path)
+            raise audio_error(ErrorCode.AUDIO_DURATION_EXCEEDED)
+    
+    audio_info = {
+        'filename': filename,
+        'size': guard.size,
+        'duration': duration,
+        'sample_rate': TARGET_SAMPLE_RATE,
+        'channels': TARGET_CHANNELS,
+        'sample_width': TARGET_SAMPLE_WIDTH,
+        'format': 'wav' if transcoded else file_ext,
+        'transcoded': transcoded,
+        'sha256': guard.sha256
+    }
+    return audio_info, wav_path
+
+
+# 推理输入：WAV 文件路径，或内存中的 (sample_rate, int16 样本数组)
+AudioInput = Union[str, Tuple[int, np.ndarray]]
+
+
+def decode_audio_in_memory(
+    file: UploadFile,
+    config: Dict[str, Any]
+) -> Tuple[Dict[str, Any], Tuple[int, np.ndarray]]:
+    """
+    在内存中解码音频为 16kHz 16-bit mono PCM，全程不写临时文件。
+    标准 16kHz mono 16-bit WAV 直接解析；其余格式交给转码进程池（进程内解码器或 ffmpeg 管道）。
+    
+    Returns:
+        (audio_info, (sample_rate, samples))
+    
+    Raises:
+        ValueError with error_code
+    """
+    from .config_loader import get_config
+    cfg = config if config else get_config()
+    max_file_size, max_duration = upload_limits(cfg)
+    
+    filename = file.filename or ""
+    file_ext = os.path.splitext(filename)[1].lower().lstrip('.') or 'wav'
+    if file_ext not in SUPPORTED_AUDIO_EXTENSIONS:
+        logger.warning(f"不支持的音频格式: 文件={filename!r}, 扩展名={file_ext!r}")
+        raise audio_error(ErrorCode.INVALID_AUDIO_FORMAT)
+    
+    guard = UploadGuard(max_file_size, max_duration)
+    content = read_upload(file.file, guard)
+    file_size = guard.size
+    
+    samples = _parse_target_wav(content) if file_ext in ('wav', 'wave') else None
+    transcoded = samples is None
+    if transcoded:
+        from core.transcode_pool import ExecutorBusyError, transcode_pool
+        try:
+            samples = transcode_pool.decode(content, max_duration=max_duration + DURATION_CAP_MARGIN)
+        except ExecutorBusyError:
+            raise
+        except RuntimeError as e:
+            raise audio_error(ErrorCode.TRANSCODE_FAILED) from e
+    
+    duration = len(samples) / float(TARGET_SAMPLE_RATE)
+    if duration > max_duration:
+        raise audio_error(ErrorCode.AUDIO_DURATION_EXCEEDED)
+    
+    audio_info = {
+        'filename': filename,
+        'size': file_size,
+        'duration': duration,
+        'sample_rate': TARGET_SAMPLE_RATE,
+        'channels': TARGET_CHANNELS,
+        'sample_width': TARGET_SAMPLE_WIDTH,
+        'format': 'wav' if transcoded else file_ext,
+        'transcoded': transcoded,
+        'in_memory': True,
+        'sha256': guard.sha256
+    }
+    return audio_info, (TARGET_SAMPLE_RATE, samples)
+
+
+# 原始 PCM 请求体的 Content-Type：audio/L16 为 16-bit 整数，其余需以 X-Sample-Format 声明（默认 s16le）
+PCM_CONTENT_TYPES = {
+    'audio/l16': 's16le',
+    'audio/pcm': None,
+    'audio/x-raw': None,
+    'application/octet-stream': None,
+}
+
+
+def _format_error(message: str) -> ValueError:
+    error = ValueError(message)
+    error.error_code = ErrorCode.INVALID_AUDIO_FORMAT
+    return error
+
+
+def parse_pcm_headers(headers: Mapping[str, str]) -> str:
+    """
+    从请求头解析原始 PCM 的样本格式，返回 PCM_FORMATS 中的格式名。
+    Content-Type 形如 audio/L16;rate=16000;channels=1（小端字节序）；
+    X-Sample-Format（s16le / f32le）、X-Sample-Rate、X-Channels 头优先于 Content-Type 参数。
+    服务端不做重采样：采样率须为 16000、声道数须为 1
+
+    Raises:
+        ValueError with error_code（INVALID_AUDIO_FORMAT）
+    """
+    media_type, *params = (headers.get('content-type') or 'application/octet-stream').split(';')
+    media_type = media_type.strip().lower()
+    if media_type not in PCM_CONTENT_TYPES:
+        raise _format_error(f"不支持的 Content-Type: {media_type}（可选 {', '.join(PCM_CONTENT_TYPES)}）")
+    options = {}
+    for param in params:
+        key, _, value = param.partition('=')
+        options[key.strip().lower()] = value.strip().strip('"')
+    sample_format = (headers.get('x-sample-format') or PCM_CONTENT_TYPES[media_type] or 's16le').lower()
+    if sample_format not in PCM_FORMATS:
+        raise _format_error(f"不支持的 PCM 格式: {sample_format}（可选 {', '.join(PCM_FORMATS)}）")
+    if options.get('endianness', 'little-endian').lower() != 'little-endian':
+        raise _format_error("仅支持小端字节序（little-endian）PCM")
+    sample_rate = headers.get('x-sample-rate') or options.get('rate') or str(TARGET_SAMPLE_RATE)
+    channels = headers.get('x-channels') or options.get('channels') or str(TARGET_CHANNELS)
+    if sample_rate != str(TARGET_SAMPLE_RATE):
+        raise _format_error(f"原始 PCM 仅支持 {TARGET_SAMPLE_RATE}Hz，当前为 {sample_rate}（其他采样率请使用文件上传接口）")
+    if channels != str(TARGET_CHANNELS):
+        raise _format_error(f"原始 PCM 仅支持单声道，当前声道数为 {channels}")
+    return sample_format
+
+
+async def load_pcm_body(
+    chunks: AsyncIterator[bytes],
+    sample_format: str,
+    config: Dict[str, Any],
+) -> Tuple[Dict[str, Any], Tuple[int, np.ndarray]]:
+    """
+    读取原始 PCM 请求体为内存样本：不解析 multipart、不写临时文件、不经过 ffmpeg。
+    读取过程中按字节数换算时长，超过 max_audio_duration 或 max_file_size 时立即中止。
+
+    Returns:
+        (audio_info, (sample_rate, samples))
+
+    Raises:
+        ValueError with error_code
+    """
+    from .config_loader import get_config
+    cfg = config if config else get_config()
+    max_file_size, max_duration = upload_limits(cfg)
+    itemsize = PCM_FORMATS[sample_format].itemsize
+    max_bytes = int((max_duration + DURATION_CAP_MARGIN) * TARGET_SAMPLE_RATE) * itemsize
+
+    guard = UploadGuard(max_file_size)
+    buffer = bytearray()
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        guard.feed(chunk)
+        if guard.size > max_bytes:
+            raise audio_error(ErrorCode.AUDIO_DURATION_EXCEEDED)
+        buffer += chunk
+    if not buffer:
+        raise _format_error("请求体为空")
+    try:
+        samples = pcm_to_int16(buffer, sample_format)
+    except ValueError as e:
+        raise _format_error(str(e)) from e
+
+    duration = len(samples) / float(TARGET_SAMPLE_RATE)
+    if duration > max_duration:
+        raise audio_error(ErrorCode.AUDIO_DURATION_EXCEEDED)
+    audio_info = {
+        'filename': '',
+        'size': guard.size,
+        'duration': duration,
+        'sample_rate': TARGET_SAMPLE_RATE,
+        'channels': TARGET_CHANNELS,
+        'sample_width': TARGET_SAMPLE_WIDTH,
+        'format': sample_format,
+        'transcoded': False,
+        'in_memory': True,
+        'sha256': guard.sha256
+    }
+    return audio_info, (TARGET_SAMPLE_RATE, samples)
+
+
+def load_audio_for_inference(
+    file: UploadFile,
+    config: Dict[str, Any]
+) -> Tuple[Dict[str, Any], AudioInput]:
+    """
+    按 processing.in_memory_decode 选择解码方式：
+    开启时返回内存中的 (sample_rate, samples)，否则返回临时 WAV 路径（同 prepare_audio_for_asr）。
+    调用方完成后应调用 release_audio 清理。
+    """
+    from .config_loader import get_config
+    cfg = config if config else get_config()
+    if cfg.get('processing', {}).get('in_memory_decode', False):
+        return decode_audio_in_memory(file, cfg)
+    return prepare_audio_for_asr(file, cfg)
+
+
+def release_audio(audio: AudioInput) -> None:
+    """清理 load_audio_for_inference 返回的临时文件（内存音频无需清理）"""
+    if isinstance(audio, str) and os.path.exists(audio):
+        try:
+            os.unlink(audio)
+        except OSError:
+            pass
+
+
+def _parse_target_wav(content: bytes):
+    """解析内存中的 WAV；仅当已是 16kHz mono 16-bit 时返回样本数组，否则返回 None 交由 ffmpeg 处理"""
+    try:
+        with wave.open(BytesIO(content), 'rb') as wav:
+            if (wav.getframerate() != TARGET_SAMPLE_RATE or
+                    wav.getnchannels() != TARGET_CHANNELS or
+                    wav.getsampwidth() != TARGET_SAMPLE_WIDTH):
+                return None
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+    return np.frombuffer(frames, dtype=np.int16)
@@ -13,6 +13,10 @@ class ErrorCode:
     MODEL_NOT_LOADED = 4010
     TRANSCODE_FAILED = 4004
     JOB_NOT_FOUND = 4005
+    SERVICE_BUSY = 4006
+    DEADLINE_EXCEEDED = 4007
+    REQUEST_CANCELLED = 4008
+    JOB_NOT_CANCELLABLE = 4009
     INTERNAL_SERVER_ERROR = 5000
     MODEL_INFERENCE_ERROR = 5001
     GPU_OUT_OF_MEMORY = 5002
@@ -27,6 +31,10 @@ ERROR_MESSAGES = {
     ErrorCode.AUDIO_DURATION_EXCEEDED: "音频时长超过限制",
     ErrorCode.TRANSCODE_FAILED: "音频转码失败",
     ErrorCode.JOB_NOT_FOUND: "任务不存在或已过期",
+    ErrorCode.SERVICE_BUSY: "服务繁忙，请稍后重试",
+    ErrorCode.DEADLINE_EXCEEDED: "请求超过截止时间",
+    ErrorCode.REQUEST_CANCELLED: "请求已取消",
+    ErrorCode.JOB_NOT_CANCELLABLE: "任务已结束，无法取消",
     ErrorCode.MODEL_NOT_LOADED: "模型未加载",
     ErrorCode.INTERNAL_SERVER_ERROR: "内部服务器错误",
     ErrorCode.MODEL_INFERENCE_ERROR: "模型推理错误",
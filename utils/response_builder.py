@@ -1,6 +1,7 @@
 """统一响应构造器"""
 
 from typing import Any, Optional
+from fastapi.responses import JSONResponse
 from .error_codes import ErrorCode, ERROR_MESSAGES
 
 
@@ -20,3 +21,12 @@ def error_response(code: int, details: Optional[Any] = None) -> dict:
         "message": ERROR_MESSAGES.get(code, "未知错误"),
         "details": details,
     }
+
+
+def busy_response(retry_after: int, details: Optional[Any] = None, status_code: int = 429) -> JSONResponse:
+    """构造过载响应（429/503），带 Retry-After 头提示客户端退避"""
+    return JSONResponse(
+        status_code=status_code,
+        content=error_response(ErrorCode.SERVICE_BUSY, details),
+        headers={"Retry-After": str(retry_after)},
+    )
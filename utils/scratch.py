@@ -0,0 +1,46 @@
+"""
+服务临时文件目录（scratch）
+上传落盘、转码输出、批量清单等临时文件统一写入该目录（默认 <系统临时目录>/fireredasr2s），
+进程异常退出遗留的文件由后台维护任务（core.maintenance）按文件年龄回收，不影响系统临时目录中的其他文件。
+"""
+
+import os
+import tempfile
+from typing import Any, Optional
+
+DEFAULT_SCRATCH_SUBDIR = "fireredasr2s"
+
+_scratch_dir: Optional[str] = None
+
+
+def configure_scratch(config_or_dir: Any = None) -> str:
+    """
+    设置临时文件目录：传入 config 时读取 maintenance.scratch_dir，传入字符串时直接使用（转码工作进程初始化）
+    Returns: 目录的绝对路径（不存在时创建）
+    """
+    global _scratch_dir
+    if isinstance(config_or_dir, dict):
+        path = (config_or_dir.get("maintenance") or {}).get("scratch_dir") or ""
+    else:
+        path = config_or_dir or ""
+    path = os.path.abspath(path or os.path.join(tempfile.gettempdir(), DEFAULT_SCRATCH_SUBDIR))
+    os.makedirs(path, exist_ok=True)
+    _scratch_dir = path
+    return path
+
+
+def scratch_dir() -> str:
+    """当前临时文件目录（未配置时使用默认目录）"""
+    return _scratch_dir or configure_scratch()
+
+
+def named_temp_file(suffix: str = "", mode: str = "w+b"):
+    """在临时文件目录中创建不自动删除的 NamedTemporaryFile（由调用方负责清理）"""
+    return tempfile.NamedTemporaryFile(mode=mode, delete=False, suffix=suffix, dir=scratch_dir())
+
+
+def temp_path(suffix: str = "") -> str:
+    """在临时文件目录中创建空文件并返回路径"""
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=scratch_dir())
+    os.close(fd)
+    return path
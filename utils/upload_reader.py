@@ -0,0 +1,240 @@
+"""
+上传读取模块 - 分块读取上传内容，同一遍内计算 SHA-256，
+超过 max_file_size 或容器头声明的时长超过 max_audio_duration 时立即中止
+"""
+
+import hashlib
+import os
+import struct
+from typing import Any, BinaryIO, Callable, Coroutine, Dict, Optional, Tuple
+from fastapi import HTTPException
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Message, Receive
+from .logger import get_logger
+from .scratch import named_temp_file
+from .error_codes import ErrorCode, ERROR_MESSAGES
+from .config_loader import get_config
+from .response_builder import error_response
+
+logger = get_logger(__name__)
+
+# 每次读取的块大小
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# 累积到该长度后解析容器头（WAV/FLAC 头部信息均在文件开头）
+HEADER_PROBE_SIZE = 64 * 1024
+# 请求体上限在 max_file_size 之上为 multipart 边界、字段头与表单字段预留的余量
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+def audio_error(code: int) -> ValueError:
+    """构造带 error_code 的 ValueError"""
+    error = ValueError(ERROR_MESSAGES[code])
+    error.error_code = code
+    return error
+
+
+def upload_limits(config: Dict[str, Any], long_form: bool = False) -> Tuple[int, float]:
+    """
+    读取 (max_file_size, max_audio_duration)：默认取 processing 节，
+    long_form=True（长音频异步任务）时取 long_form 节
+    """
+    processing_config = config.get('processing', {})
+    limits = (
+        processing_config.get('max_file_size', 52428800),
+        processing_config.get('max_audio_duration', 60),
+    )
+    if not long_form:
+        return limits
+    long_form_config = config.get('long_form') or {}
+    return (
+        long_form_config.get('max_file_size', 1073741824),
+        long_form_config.get('max_audio_duration', 14400),
+    )
+
+
+class UploadGuard:
+    """逐块校验上传：累计大小、计算 SHA-256，并在读到容器头后检查声明时长"""
+
+    def __init__(self, max_file_size: int, max_duration: Optional[float] = None):
+        self.max_file_size = max_file_size
+        self.max_duration = max_duration
+        self.size = 0
+        self.header_duration: Optional[float] = None
+        self._hash = hashlib.sha256()
+        self._head = b''
+        self._header_checked = False
+
+    @property
+    def sha256(self) -> str:
+        return self._hash.hexdigest()
+
+    def feed(self, chunk: bytes) -> None:
+        """处理一个数据块，超限时抛出 ValueError（带 error_code）"""
+        self.size += len(chunk)
+        if self.size > self.max_file_size:
+            raise audio_error(ErrorCode.AUDIO_FILE_TOO_LARGE)
+        self._hash.update(chunk)
+        if not self._header_checked:
+            self._head += chunk[:HEADER_PROBE_SIZE - len(self._head)]
+            if len(self._head) >= HEADER_PROBE_SIZE:
+                self._check_header()
+
+    def finish(self) -> None:
+        """读取结束，文件小于探测长度时补做容器头检查"""
+        if not self._header_checked:
+            self._check_header()
+
+    def _check_header(self) -> None:
+        self._header_checked = True
+        self.header_duration = probe_header_duration(self._head)
+        self._head = b''
+        if self.max_duration is not None and self.header_duration is not None \
+                and self.header_duration > self.max_duration:
+            logger.warning(f"容器头声明时长 {self.header_duration:.2f}s 超过限制 {self.max_duration}s，中止读取")
+            raise audio_error(ErrorCode.AUDIO_DURATION_EXCEEDED)
+
+
+def probe_header_duration(head: bytes) -> Optional[float]:
+    """从文件头解析时长（秒），支持 WAV（RIFF）与 FLAC（STREAMINFO）；无法确定时返回 None"""
+    if len(head) >= 12 and head[:4] == b'RIFF' and head[8:12] == b'WAVE':
+        return _wav_header_duration(head)
+    if len(head) >= 26 and head[:4] == b'fLaC':
+        return _flac_header_duration(head)
+    return None
+
+
+def _wav_header_duration(head: bytes) -> Optional[float]:
+    offset = 12
+    byte_rate = 0
+    while offset + 8 <= len(head):
+        chunk_id = head[offset:offset + 4]
+        chunk_size = struct.unpack('<I', head[offset + 4:offset + 8])[0]
+        if chunk_id == b'fmt ' and offset + 20 <= len(head):
+            byte_rate = struct.unpack('<I', head[offset + 16:offset + 20])[0]
+        elif chunk_id == b'data':
+            # 流式写出的 WAV 常以 0 或 0xFFFFFFFF 占位，此时无法从头部得知时长
+            if not byte_rate or chunk_size in (0, 0xFFFFFFFF):
+                return None
+            return chunk_size / float(byte_rate)
+        offset += 8 + chunk_size + (chunk_size & 1)
+    return None
+
+
+def _flac_header_duration(head: bytes) -> Optional[float]:
+    # fLaC + 4 字节块头 + STREAMINFO；第 10~17 字节依次为采样率(20bit)、声道(3bit)、位深(5bit)、总样本数(36bit)
+    streaminfo = head[8:26]
+    packed = int.from_bytes(streaminfo[10:18], 'big')
+    sample_rate = packed >> 44
+    total_samples = packed & ((1 << 36) - 1)
+    if not sample_rate or not total_samples:
+        return None
+    return total_samples / float(sample_rate)
+
+
+def copy_upload(src: BinaryIO, dst: BinaryIO, guard: UploadGuard) -> None:
+    """分块将上传内容复制到 dst（同步，供线程中调用）"""
+    while True:
+        chunk = src.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        guard.feed(chunk)
+        dst.write(chunk)
+    guard.finish()
+
+
+def read_upload(src: BinaryIO, guard: UploadGuard) -> bytes:
+    """分块读入内存（内存解码路径），超限时在读完前中止"""
+    buffer = bytearray()
+    while True:
+        chunk = src.read(UPLOAD_CHUNK_SIZE)
+        if not chunk:
+            break
+        guard.feed(chunk)
+        buffer += chunk
+    guard.finish()
+    return bytes(buffer)
+
+
+async def spool_upload(upload: Any, guard: UploadGuard, suffix: str = '.wav') -> str:
+    """
+    异步分块读取 UploadFile 并落盘到临时文件，返回路径
+    校验失败时删除临时文件并抛出 ValueError（带 error_code）
+    """
+    with named_temp_file(suffix=suffix) as tmp:
+        tmp_path = tmp.name
+        try:
+            while True:
+                chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                guard.feed(chunk)
+                tmp.write(chunk)
+            guard.finish()
+        except Exception:
+            tmp.close()
+            os.unlink(tmp_path)
+            raise
+    return tmp_path
+
+
+class _BodyTooLarge(HTTPException):
+    """请求体超过上限（HTTPException 子类，表单解析时原样抛出而不被包装为 400）"""
+
+    def __init__(self):
+        super().__init__(status_code=413, detail=ERROR_MESSAGES[ErrorCode.AUDIO_FILE_TOO_LARGE])
+
+
+def _limited_receive(receive: Receive, limit: int) -> Receive:
+    """累计请求体字节数，超过 limit 时中止读取"""
+    received = 0
+
+    async def wrapped() -> Message:
+        nonlocal received
+        message = await receive()
+        if message["type"] == "http.request":
+            received += len(message.get("body", b""))
+            if received > limit:
+                raise _BodyTooLarge()
+        return message
+
+    return wrapped
+
+
+class UploadLimitRoute(APIRoute):
+    """
+    上传请求体限长路由：在 FastAPI 解析 multipart 表单（落盘 spool）之前检查请求体大小。
+    Content-Length 超过 max_file_size + MULTIPART_OVERHEAD 时直接返回 413，不读取请求体；
+    未声明长度（chunked）时边接收边计数，超限即中止解析。
+    表单含 long_form 字段的接口在解析前无法得知取值，按 long_form 节与 processing 节中较大的上限放行，
+    精确的大小与时长限制在解析后由 UploadGuard 执行
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        handler = super().get_route_handler()
+        accepts_long_form = any(field.name == "long_form" for field in self.dependant.body_params)
+
+        async def limited_handler(request: Request) -> Response:
+            config = get_config()
+            max_file_size, _ = upload_limits(config)
+            if accepts_long_form:
+                max_file_size = max(max_file_size, upload_limits(config, long_form=True)[0])
+            limit = max_file_size + MULTIPART_OVERHEAD
+            content_length = request.headers.get("content-length", "")
+            if content_length.isdigit() and int(content_length) > limit:
+                logger.warning(f"请求体声明长度 {content_length} 超过限制 {limit}，未读取即拒绝")
+                return _too_large_response(int(content_length))
+            try:
+                return await handler(Request(request.scope, _limited_receive(request.receive, limit)))
+            except _BodyTooLarge:
+                logger.warning(f"请求体超过限制 {limit}，中止读取")
+                return _too_large_response(None)
+
+        return limited_handler
+
+
+def _too_large_response(size: Optional[int]) -> JSONResponse:
+    details = {"content_length": size} if size is not None else None
+    return JSONResponse(status_code=413, content=error_response(ErrorCode.AUDIO_FILE_TOO_LARGE, details))